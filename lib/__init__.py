@@ -1,4 +1,16 @@
 # plg-ide Library
-from .firebolt import FireboltRunner, BenchmarkResult
+#
+# Exports are resolved on first access so that importing one module (e.g.
+# `python -m lib.firebolt`) does not pull in the others.
 
-__all__ = ["FireboltRunner", "BenchmarkResult"]
+__all__ = ["FireboltRunner", "BenchmarkResult", "AsyncFireboltRunner"]
+
+
+def __getattr__(name):
+    if name in ("FireboltRunner", "BenchmarkResult"):
+        from . import firebolt
+        return getattr(firebolt, name)
+    if name == "AsyncFireboltRunner":
+        from .firebolt_async import AsyncFireboltRunner
+        return AsyncFireboltRunner
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
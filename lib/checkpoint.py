@@ -0,0 +1,226 @@
+"""
+Resumable Sample-Data Loads
+
+Every generated row carries the tag of the deterministic chunk it came
+from (lib.scale.chunk_tag, e.g. "sf1-seed42-2024-03-31/137") in a text
+column such as source_file_name. A chunk is always inserted whole by one
+statement, so the tags in a table are its load progress, committed
+atomically with the rows themselves. One scan fingerprints a table per
+chunk:
+
+  SELECT source_file_name AS tag, COUNT(*) AS row_count, CHECKSUM(*) AS checksum
+  FROM playstats GROUP BY source_file_name
+
+Before loading, resume_plan compares that fingerprint with the chunks the
+requested DataSpec needs:
+
+  - chunks present with the right row count are kept, provided their
+    checksum matches the one recorded when they were loaded (if any);
+  - chunks with a wrong row count or checksum are deleted and reloaded;
+  - only the missing chunks are generated and loaded.
+
+Rows of another scale factor, seed or as-of date, and untagged rows, are
+never deleted implicitly: resume_plan refuses to load until the run asks
+for --fresh (or for the spec the table holds). Without --as-of, loaders
+reuse the as-of date recorded for the tables (resume_spec), so a load
+resumed on a later day continues instead of starting over.
+
+A table that already matches is skipped after that one query, so rerunning
+a loader is cheap and never inserts duplicates, and a load that died part
+way resumes where it stopped. The spec and per-chunk checksums are saved
+under .plg-ide/loads/ when a load starts and when it finishes, so later
+runs also notice rows that were changed after loading.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+from .scale import Chunk, DataSpec, table_chunks
+
+if TYPE_CHECKING:
+    from .firebolt import FireboltRunner
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_CHECKPOINT_DIR = REPO_ROOT / ".plg-ide" / "loads"
+
+# Tags listed per DELETE ... WHERE tag IN (...) statement
+_DELETE_TAGS_PER_STATEMENT = 500
+
+
+@dataclass
+class ResumePlan:
+    """What a load still has to do for one table."""
+    table: str
+    spec: DataSpec
+    # Chunks to generate and load
+    chunks: list[Chunk] = field(default_factory=list)
+    # Chunks already loaded and verified
+    kept: int = 0
+    # Rows deleted: the spec's chunks that did not verify
+    deleted_rows: int = 0
+
+    @property
+    def up_to_date(self) -> bool:
+        return not self.chunks
+
+    @property
+    def rows(self) -> int:
+        return sum(chunk.rows for chunk in self.chunks)
+
+
+def checkpoint_path(runner: "FireboltRunner", table: str) -> Path:
+    """Where a table's recorded chunk checksums live, per runtime and database."""
+    directory = Path(os.getenv("PLG_CHECKPOINT_DIR", DEFAULT_CHECKPOINT_DIR))
+    database = os.getenv("FIREBOLT_DATABASE", "plg_demo")
+    return directory / f"{runner.runtime}-{database}" / f"{table}.json"
+
+
+def fingerprint(runner: "FireboltRunner", table: str, tag_column: str) -> dict[Optional[str], tuple[int, int]]:
+    """Row count and engine-side checksum of every chunk tag in a table (None: untagged rows)."""
+    result = runner.execute(
+        f"SELECT {tag_column} AS tag, COUNT(*) AS row_count, CHECKSUM(*) AS checksum "
+        f"FROM {table} GROUP BY {tag_column}"
+    )
+    return {row["tag"]: (int(row["row_count"]), int(row["checksum"])) for row in result.data}
+
+
+def _read_checkpoint(runner: "FireboltRunner", table: str) -> dict:
+    try:
+        return json.loads(checkpoint_path(runner, table).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _load_checksums(runner: "FireboltRunner", table: str, spec: DataSpec) -> dict[int, int]:
+    """Checksums recorded for the spec's chunks of a table (empty if none or another spec)."""
+    recorded = _read_checkpoint(runner, table)
+    if recorded.get("spec") != spec.tag:
+        return {}
+    return {int(index): checksum for index, checksum in recorded.get("chunks", {}).items()}
+
+
+def _save_checkpoint(runner: "FireboltRunner", table: str, spec: DataSpec, chunks: dict[str, int]) -> Path:
+    path = checkpoint_path(runner, table)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({
+        "spec": spec.tag, "label": spec.label, "scale_factor": spec.scale_factor,
+        "seed": spec.seed, "as_of": spec.as_of, "chunks": chunks
+    }, sort_keys=True))
+    return path
+
+
+def resume_spec(runner: "FireboltRunner", spec: DataSpec, tables: list[str]) -> DataSpec:
+    """
+    The spec with the as-of date recorded for these tables at the same
+    scale factor and seed, if any; for runs that did not pass --as-of.
+    """
+    for table in tables:
+        recorded = _read_checkpoint(runner, table)
+        if recorded.get("as_of") and (recorded.get("scale_factor"), recorded.get("seed")) == (spec.scale_factor, spec.seed):
+            if recorded["as_of"] != spec.as_of:
+                print(f"Resuming with as-of date {recorded['as_of']} recorded for {table} (pass --as-of to change it)")
+            return replace(spec, as_of=recorded["as_of"])
+    return spec
+
+
+def _chunk_index(tag: Optional[str], spec: DataSpec) -> Optional[int]:
+    """Chunk index of one of the spec's tags; None for other specs and untagged rows."""
+    prefix = f"{spec.tag}/"
+    if not tag or not tag.startswith(prefix) or not tag[len(prefix):].isdigit():
+        return None
+    return int(tag[len(prefix):])
+
+
+def resume_plan(
+    runner: "FireboltRunner",
+    table: str,
+    spec: DataSpec,
+    rows: int,
+    tag_column: str,
+    fresh: bool = False
+) -> ResumePlan:
+    """
+    Compare a table with the chunks `spec` needs, delete the spec's chunks
+    that do not verify, and return the chunks still to load.
+
+    With `fresh`, the table is emptied and every chunk is loaded again.
+
+    Raises:
+        RuntimeError: The table holds rows of another spec (or untagged
+            rows) and `fresh` is not set, or a query failed
+    """
+    expected = table_chunks(table, rows)
+    plan = ResumePlan(table=table, spec=spec)
+    if fresh:
+        runner.execute(f"TRUNCATE TABLE {table}")
+        _save_checkpoint(runner, table, spec, {})
+        plan.chunks = expected
+        return plan
+
+    recorded = _load_checksums(runner, table, spec)
+    kept: set[int] = set()
+    stale_tags: list[str] = []
+    checksums: dict[str, int] = {}
+    foreign: dict[str, int] = {}
+    for tag, (row_count, checksum) in fingerprint(runner, table, tag_column).items():
+        index = _chunk_index(tag, spec)
+        if index is None:
+            label = tag.rpartition("/")[0] if tag and "/" in tag else "untagged"
+            foreign[label] = foreign.get(label, 0) + row_count
+        elif index < len(expected) and row_count == expected[index].rows and recorded.get(index, checksum) == checksum:
+            kept.add(index)
+            checksums[str(index)] = checksum
+        else:
+            # Duplicated, or changed since it was loaded
+            stale_tags.append(tag)
+            plan.deleted_rows += row_count
+
+    if foreign:
+        held = ", ".join(f"{count:,} rows {label}" for label, count in sorted(foreign.items()))
+        raise RuntimeError(
+            f"{table} holds data of another spec ({held}), not {spec.tag}. Rerun with --fresh to replace it, "
+            f"or with that spec's --scale-factor/--seed/--as-of to resume it."
+        )
+
+    if stale_tags and not kept:
+        runner.execute(f"TRUNCATE TABLE {table}")
+    else:
+        for i in range(0, len(stale_tags), _DELETE_TAGS_PER_STATEMENT):
+            tags = ", ".join(f"'{t}'" for t in stale_tags[i:i + _DELETE_TAGS_PER_STATEMENT])
+            runner.execute(f"DELETE FROM {table} WHERE {tag_column} IN ({tags})")
+
+    # Record the spec before loading, so an interrupted load resumes with it
+    _save_checkpoint(runner, table, spec, checksums)
+    plan.kept = len(kept)
+    plan.chunks = [chunk for chunk in expected if chunk.index not in kept]
+    return plan
+
+
+def record_checkpoint(runner: "FireboltRunner", table: str, spec: DataSpec, tag_column: str) -> Path:
+    """Save the checksums of a table's chunks for `spec`, as loaded now."""
+    chunks = {}
+    for tag, (_, checksum) in fingerprint(runner, table, tag_column).items():
+        index = _chunk_index(tag, spec)
+        if index is not None:
+            chunks[str(index)] = checksum
+    return _save_checkpoint(runner, table, spec, chunks)
+
+
+def print_resume_plan(plan: ResumePlan):
+    """One line on what a resumed load will do."""
+    if plan.up_to_date:
+        print(f"{plan.table}: up to date ({plan.spec.label}, {plan.kept:,} chunks verified), skipping")
+        return
+    notes = []
+    if plan.kept:
+        notes.append(f"{plan.kept:,} chunks already loaded")
+    if plan.deleted_rows:
+        notes.append(f"{plan.deleted_rows:,} stale rows deleted")
+    print(f"{plan.table}: loading {len(plan.chunks):,} chunks ({plan.rows:,} rows)"
+          + (f"; {', '.join(notes)}" if notes else ""))
@@ -0,0 +1,177 @@
+"""
+Columnar Result Storage
+
+Query results are kept as one array per column instead of one dict per row.
+Numeric columns are packed into NumPy arrays (or `array.array` when NumPy
+is not installed); everything else stays a plain list. Row dicts are only
+built when a caller asks for them, through `RowView`.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Sequence
+from typing import Any, Iterable, Iterator
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; fall back to the stdlib array module
+    np = None
+
+
+# Rows materialized per step when iterating a RowView
+_ROW_CHUNK = 4096
+
+
+def compact_column(values: list) -> Sequence:
+    """
+    Pack a list of Python values into the most compact column type.
+
+    Columns holding only ints become int64 arrays, ints/floats become
+    float64 arrays, bools become bool arrays. Anything else (strings,
+    NULLs, nested values) is returned unchanged.
+    """
+    if not values:
+        return values
+
+    kinds = {type(v) for v in values}
+    try:
+        if kinds == {bool}:
+            return np.array(values, dtype=np.bool_) if np is not None else values
+        if kinds == {int}:
+            return np.array(values, dtype=np.int64) if np is not None else array("q", values)
+        if kinds <= {int, float}:
+            return np.array(values, dtype=np.float64) if np is not None else array("d", values)
+    except OverflowError:
+        # Values outside int64 range stay as Python ints
+        pass
+    return values
+
+
+def concat_columns(parts: list[Sequence]) -> Sequence:
+    """Concatenate column parts produced batch by batch into one column."""
+    if len(parts) == 1:
+        return parts[0]
+    if np is not None and all(hasattr(part, "dtype") for part in parts):
+        if any(isinstance(part, np.ma.MaskedArray) for part in parts):
+            return np.ma.concatenate(parts)
+        return np.concatenate(parts)
+    if all(isinstance(part, array) for part in parts):
+        combined = array(parts[0].typecode)
+        for part in parts:
+            combined.extend(part)
+        return combined
+    combined = []
+    for part in parts:
+        combined.extend(part.tolist() if hasattr(part, "tolist") else part)
+    return combined
+
+
+def column_slice(column: Sequence, start: int, stop: int) -> list:
+    """Return column[start:stop] as a list of plain Python values."""
+    part = column[start:stop]
+    if hasattr(part, "tolist"):
+        return part.tolist()
+    return list(part)
+
+
+class ColumnBuilder:
+    """
+    Accumulate result batches column by column.
+
+    Batches arrive either as rows of Python values (`add_rows`, compacted
+    when the result is built) or as already-typed columns from a decoder
+    (`add_columns`, concatenated when the result is built). Both can be
+    mixed; rows are kept in the order they were added.
+    """
+
+    def __init__(self, columns: list[str]):
+        self.columns = list(columns)
+        self._values: list[list] = [[] for _ in self.columns]
+        self._parts: list[list[Sequence]] = [[] for _ in self.columns]
+        self.row_count = 0
+
+    def add_rows(self, rows: Iterable[Sequence]):
+        """Append a batch of rows given as value sequences in column order."""
+        rows = list(rows)
+        if not rows:
+            return
+        # Transpose the batch in C rather than appending cell by cell
+        for values, column_values in zip(self._values, zip(*rows)):
+            values.extend(column_values)
+        self.row_count += len(rows)
+
+    def add_columns(self, columns: list[Sequence], row_count: int):
+        """Append a batch given as typed columns in column order."""
+        if not row_count:
+            return
+        self._flush_rows()
+        for parts, column in zip(self._parts, columns):
+            parts.append(column)
+        self.row_count += row_count
+
+    def _flush_rows(self):
+        """Move rows added so far into the column parts, ahead of what follows."""
+        if not self._values or not self._values[0]:
+            return
+        for parts, values in zip(self._parts, self._values):
+            parts.append(compact_column(values))
+        self._values = [[] for _ in self.columns]
+
+    def build(self) -> dict[str, Sequence]:
+        """Return {column name: compact column}."""
+        if any(self._parts):
+            self._flush_rows()
+        column_data = {
+            name: concat_columns(parts) if parts else compact_column(values)
+            for name, values, parts in zip(self.columns, self._values, self._parts)
+        }
+        self._values = [[] for _ in self.columns]
+        self._parts = [[] for _ in self.columns]
+        return column_data
+
+
+class RowView(Sequence):
+    """
+    Read-only sequence of row dicts backed by columnar storage.
+
+    Dicts are created on access and not cached, so holding a RowView costs
+    nothing beyond the columns themselves.
+    """
+
+    __slots__ = ("_columns", "_column_data", "_length")
+
+    def __init__(self, columns: list[str], column_data: dict[str, Sequence], length: int):
+        self._columns = columns
+        self._column_data = column_data
+        self._length = length
+
+    def __len__(self) -> int:
+        return self._length
+
+    def _rows(self, start: int, stop: int) -> list[dict]:
+        if stop <= start:
+            return []
+        names = self._columns
+        value_lists = [column_slice(self._column_data[name], start, stop) for name in names]
+        return [dict(zip(names, values)) for values in zip(*value_lists)]
+
+    def __getitem__(self, index: Any):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
+            if step == 1:
+                return self._rows(start, stop)
+            return [self[i] for i in range(start, stop, step)]
+
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("row index out of range")
+        return self._rows(index, index + 1)[0]
+
+    def __iter__(self) -> Iterator[dict]:
+        for start in range(0, self._length, _ROW_CHUNK):
+            yield from self._rows(start, min(start + _ROW_CHUNK, self._length))
+
+    def __repr__(self):
+        return f"RowView(rows={self._length}, columns={self._columns})"
@@ -0,0 +1,201 @@
+"""
+HTTP Compression for Firebolt Core
+
+Request bodies -- mostly large INSERT ... VALUES statements from the
+sample-data generators -- can be sent gzip- or zstd-compressed with a
+Content-Encoding header. Responses are negotiated with Accept-Encoding
+and decompressed by httpx while streaming, so a compressed result is never
+held in memory whole.
+
+TransferStats counts bytes before and after compression in both
+directions, plus the time spent compressing, so the trade-off can be
+measured: over loopback compression usually costs more CPU than it saves,
+while against a remote Core node it cuts transfer time.
+
+zstd needs the optional `zstandard` package; without it only gzip is
+offered. zstd responses are only asked for when the installed httpx can
+decode them (0.27 and later, with zstandard), since older releases pass
+unknown encodings through undecoded. Otherwise responses come gzipped.
+
+Usage:
+  python -m lib.compression --rows 50000
+"""
+
+from __future__ import annotations
+
+import gzip
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+from urllib.parse import urlparse
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; gzip is always available
+    zstandard = None
+
+try:
+    from httpx._decoders import SUPPORTED_DECODERS as _HTTPX_DECODERS
+except ImportError:  # Private module; assume no zstd if it moved
+    _HTTPX_DECODERS = {}
+
+
+CODECS = ("none", "gzip", "zstd")
+
+# Bodies smaller than this are sent uncompressed; the header costs more
+MIN_COMPRESS_BYTES = 4096
+
+# Fast levels: generated SQL compresses well even at low effort
+GZIP_LEVEL = 1
+ZSTD_LEVEL = 3
+
+LOOPBACK_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+
+def available_codecs() -> list[str]:
+    return [c for c in CODECS if c != "zstd" or zstandard is not None]
+
+
+def resolve_codec(codec: Optional[str], base_url: str) -> str:
+    """
+    Turn "auto" (or None) into a concrete codec for an endpoint.
+
+    Auto compresses only for remote hosts; loopback gains nothing from it.
+    """
+    codec = (codec or "auto").lower()
+    if codec == "auto":
+        host = urlparse(base_url).hostname or ""
+        if host in LOOPBACK_HOSTS:
+            return "none"
+        return "zstd" if zstandard is not None else "gzip"
+    if codec not in CODECS:
+        raise ValueError(f"Unknown compression {codec!r}; expected one of {', '.join(CODECS)} or auto")
+    if codec == "zstd" and zstandard is None:
+        raise RuntimeError("zstd compression needs the zstandard package. Run: pip install zstandard")
+    return codec
+
+
+def accept_encoding(codec: str) -> str:
+    """Accept-Encoding header for a resolved codec: only that codec, if httpx can decode it."""
+    if codec == "none":
+        return "identity"
+    if codec == "zstd" and "zstd" in _HTTPX_DECODERS:
+        return "zstd"
+    return "gzip"
+
+
+def compress_body(body: bytes, codec: str) -> tuple[bytes, Optional[str]]:
+    """Return (payload, Content-Encoding or None) for a request body."""
+    if codec == "none" or len(body) < MIN_COMPRESS_BYTES:
+        return body, None
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body), "zstd"
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0), "gzip"
+
+
+@dataclass
+class TransferStats:
+    """Bytes and time for Core HTTP traffic, before and after compression."""
+    requests: int = 0
+    compressed_requests: int = 0
+    request_bytes: int = 0
+    request_wire_bytes: int = 0
+    response_bytes: int = 0
+    response_wire_bytes: int = 0
+    compress_s: float = 0.0
+    # Wall time of requests, from send to the last response byte
+    transfer_s: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(
+        self,
+        request_bytes: int,
+        request_wire_bytes: int,
+        response_bytes: int,
+        response_wire_bytes: int,
+        compress_s: float,
+        transfer_s: float
+    ):
+        with self._lock:
+            self.requests += 1
+            self.compressed_requests += request_wire_bytes != request_bytes
+            self.request_bytes += request_bytes
+            self.request_wire_bytes += request_wire_bytes
+            self.response_bytes += response_bytes
+            self.response_wire_bytes += response_wire_bytes
+            self.compress_s += compress_s
+            self.transfer_s += transfer_s
+
+    @property
+    def request_ratio(self) -> float:
+        return self.request_bytes / self.request_wire_bytes if self.request_wire_bytes else 1.0
+
+    @property
+    def response_ratio(self) -> float:
+        return self.response_bytes / self.response_wire_bytes if self.response_wire_bytes else 1.0
+
+
+def _mb(n: int) -> str:
+    return f"{n / 1e6:,.1f} MB"
+
+
+def print_transfer_stats(stats: TransferStats, codec: str = ""):
+    """Summary of bytes sent and received, with compression ratios."""
+    prefix = f"[{codec}] " if codec else ""
+    print(f"{prefix}{stats.requests} requests in {stats.transfer_s:.2f}s "
+          f"(compressing {stats.compress_s:.2f}s)")
+    print(f"  sent     {_mb(stats.request_bytes):>10} -> {_mb(stats.request_wire_bytes):>10} on the wire "
+          f"({stats.request_ratio:.1f}X, {stats.compressed_requests} compressed)")
+    print(f"  received {_mb(stats.response_bytes):>10} <- {_mb(stats.response_wire_bytes):>10} on the wire "
+          f"({stats.response_ratio:.1f}X)")
+
+
+# CLI support
+if __name__ == "__main__":
+    import argparse
+    import random
+
+    from .firebolt import FireboltRunner
+
+    parser = argparse.ArgumentParser(description="Measure Core HTTP compression on an insert and a scan")
+    parser.add_argument("--rows", type=int, default=50_000, help="Rows inserted and read back (default: 50000)")
+    parser.add_argument("--batch-rows", type=int, default=10_000, help="Rows per INSERT (default: 10000)")
+    parser.add_argument("--codec", action="append", choices=CODECS,
+                        help="Codec to measure (repeatable; default: all available)")
+    args = parser.parse_args()
+
+    table = "plg_compression_probe"
+    rng = random.Random(42)
+    # Same shape as the gaming playstats inserts
+    batches = []
+    for start in range(0, args.rows, args.batch_rows):
+        values = ", ".join(
+            f"({rng.randint(1, 100)}, {rng.randint(1, 10_000)}, '2024-01-{rng.randint(1, 28):02d} "
+            f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00', 'car_{rng.randint(1, 10)}', "
+            f"{rng.randint(1, 100)}, {rng.uniform(0, 200):.1f}, {rng.randint(60, 7200)})"
+            for _ in range(min(args.batch_rows, args.rows - start))
+        )
+        batches.append(f"INSERT INTO {table} VALUES {values}")
+
+    for codec in args.codec or available_codecs():
+        runner = FireboltRunner(runtime="core", label_queries=False, compression=codec)
+        try:
+            runner.execute(f"DROP TABLE IF EXISTS {table}")
+            runner.execute(
+                f"CREATE TABLE {table} (gameid INT, playerid INT, stattime TIMESTAMP, selectedcar TEXT, "
+                f"currentlevel INT, currentspeed REAL, currentplaytime INT)"
+            )
+            runner.transfer_stats = TransferStats()
+            t0 = time.perf_counter()
+            for sql in batches:
+                runner.execute(sql)
+            insert_s = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            runner.execute(f"SELECT * FROM {table}", disable_cache=True)
+            scan_s = time.perf_counter() - t0
+            print(f"\ninsert {insert_s:.2f}s, scan {scan_s:.2f}s")
+            print_transfer_stats(runner.transfer_stats, codec)
+            runner.execute(f"DROP TABLE IF EXISTS {table}")
+        finally:
+            runner.close()
@@ -0,0 +1,227 @@
+"""
+Streaming Result Export
+
+Writes a query result to CSV, Parquet or Arrow IPC without holding it in
+memory: batches are streamed from the engine and each one is written out
+(one Parquet row group or Arrow record batch per batch) before the next is
+read. Memory stays at about one batch regardless of result size, so tens
+of millions of rows can be exported on a laptop.
+
+Parquet and Arrow need the optional `pyarrow` package; CSV uses only the
+standard library.
+
+Usage:
+  python -m lib.firebolt export "SELECT * FROM playstats" --out playstats.parquet
+  python -m lib.firebolt export queries/daily.sql --format csv --out daily.csv
+"""
+
+from __future__ import annotations
+
+import csv
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Sequence
+
+from .columnar import column_slice
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; columns may be array.array or lists
+    np = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # Only needed for Parquet and Arrow output
+    pa = None
+
+if TYPE_CHECKING:
+    from .firebolt import FireboltRunner
+
+
+EXPORT_FORMATS = ("csv", "parquet", "arrow")
+
+# Rows per streamed batch: one Parquet row group / Arrow record batch
+DEFAULT_EXPORT_BATCH_ROWS = 100_000
+
+# Seconds between progress lines
+PROGRESS_INTERVAL_S = 2.0
+
+
+@dataclass
+class ExportSummary:
+    path: Path
+    format: str
+    rows: int
+    bytes_written: int
+    elapsed_s: float
+
+    @property
+    def rows_per_s(self) -> float:
+        return self.rows / self.elapsed_s if self.elapsed_s else 0.0
+
+    @property
+    def mb_per_s(self) -> float:
+        return self.bytes_written / 1e6 / self.elapsed_s if self.elapsed_s else 0.0
+
+
+def format_for_path(path: str | Path) -> str:
+    """Export format implied by a file extension (CSV if unknown)."""
+    suffix = Path(path).suffix.lower()
+    if suffix in (".parquet", ".pq"):
+        return "parquet"
+    if suffix in (".arrow", ".feather", ".ipc"):
+        return "arrow"
+    return "csv"
+
+
+def _arrow_array(column: Sequence, field_type=None):
+    """Convert one typed column to a pyarrow array, without copying NumPy data where possible."""
+    if np is not None and isinstance(column, np.ma.MaskedArray):
+        array = pa.array(column.data, mask=np.ma.getmaskarray(column))
+    elif np is not None and isinstance(column, np.ndarray):
+        array = pa.array(column)
+    else:
+        array = pa.array(list(column))
+    if field_type is not None and array.type != field_type:
+        array = array.cast(field_type)
+    return array
+
+
+class _CSVWriter:
+    def __init__(self, path: Path):
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._header_written = False
+
+    def write(self, columns: list[str], batch: list[Sequence], row_count: int):
+        if not self._header_written:
+            self._writer.writerow(columns)
+            self._header_written = True
+        if row_count:
+            self._writer.writerows(zip(*(column_slice(c, 0, row_count) for c in batch)))
+
+    def close(self):
+        self._file.close()
+
+
+class _ArrowWriter:
+    """Parquet (one row group per batch) or Arrow IPC file (one record batch per batch)."""
+
+    def __init__(self, path: Path, format: str):
+        self.path = path
+        self.format = format
+        self._writer = None
+        self._schema = None
+        # The header batch, kept to write a valid empty file if no rows follow
+        self._header: Optional[tuple[list[str], list[Sequence]]] = None
+
+    def _open(self, columns: list[str], batch: list[Sequence]):
+        arrays = [_arrow_array(c) for c in batch]
+        # Columns that are all NULL (or empty) in the first batch have no type yet
+        self._schema = pa.schema([
+            pa.field(name, pa.string() if a.type == pa.null() else a.type)
+            for name, a in zip(columns, arrays)
+        ])
+        if self.format == "parquet":
+            self._writer = pa.parquet.ParquetWriter(str(self.path), self._schema)
+        else:
+            self._writer = pa.ipc.new_file(str(self.path), self._schema)
+
+    def write(self, columns: list[str], batch: list[Sequence], row_count: int):
+        if not row_count:
+            # Types are taken from the first batch with rows, when there is one
+            if self._header is None:
+                self._header = (columns, batch)
+            return
+        if self._schema is None:
+            self._open(columns, batch)
+        arrays = [_arrow_array(c, field.type) for c, field in zip(batch, self._schema)]
+        table = pa.Table.from_arrays(arrays, schema=self._schema)
+        if self.format == "parquet":
+            self._writer.write_table(table)
+        else:
+            for record_batch in table.to_batches():
+                self._writer.write_batch(record_batch)
+
+    def close(self):
+        if self._writer is None:
+            # No rows: write the header's columns (or none) with no data
+            self._open(*(self._header or ([], [])))
+        self._writer.close()
+
+
+def export_query(
+    runner: "FireboltRunner",
+    sql: str,
+    out: str | Path,
+    format: Optional[str] = None,
+    batch_rows: int = DEFAULT_EXPORT_BATCH_ROWS,
+    progress: bool = False
+) -> ExportSummary:
+    """
+    Stream a query result into a file.
+
+    Args:
+        runner: Runner to execute the query with
+        sql: A single SELECT (or other statement returning rows)
+        out: Output file path
+        format: "csv", "parquet" or "arrow"; taken from the extension if None
+        batch_rows: Rows per streamed batch / row group
+        progress: Print rows, bytes and throughput while exporting
+
+    Returns:
+        ExportSummary with rows and bytes written
+
+    The file is written under a temporary name next to `out` and renamed
+    into place once the export succeeds, so a failed export never leaves
+    a partial file at `out`.
+    """
+    path = Path(out)
+    format = (format or format_for_path(path)).lower()
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {format!r}; expected one of {', '.join(EXPORT_FORMATS)}")
+    if format != "csv" and pa is None:
+        raise RuntimeError(f"{format} export needs pyarrow. Run: pip install pyarrow")
+
+    partial = path.with_name(f".{path.name}.partial")
+    writer = _CSVWriter(partial) if format == "csv" else _ArrowWriter(partial, format)
+    start = time.perf_counter()
+    last_report = start
+    rows = 0
+    batches = runner._stream_batches(sql, batch_size=batch_rows)
+    try:
+        try:
+            for columns, batch, row_count in batches:
+                writer.write(columns, batch, row_count)
+                rows += row_count
+                now = time.perf_counter()
+                if progress and now - last_report >= PROGRESS_INTERVAL_S:
+                    last_report = now
+                    size = partial.stat().st_size if partial.exists() else 0
+                    print(f"  {rows:>14,} rows  {size / 1e6:>10,.1f} MB  {rows / (now - start):>10,.0f} rows/s",
+                          flush=True)
+        finally:
+            batches.close()
+            writer.close()
+        os.replace(partial, path)
+    finally:
+        if partial.exists():
+            partial.unlink()
+
+    return ExportSummary(
+        path=path,
+        format=format,
+        rows=rows,
+        bytes_written=os.path.getsize(path),
+        elapsed_s=time.perf_counter() - start
+    )
+
+
+def print_export_summary(summary: ExportSummary):
+    print(f"Exported {summary.rows:,} rows to {summary.path} ({summary.format}, "
+          f"{summary.bytes_written / 1e6:,.1f} MB) in {summary.elapsed_s:.1f}s: "
+          f"{summary.rows_per_s:,.0f} rows/s, {summary.mb_per_s:,.1f} MB/s")
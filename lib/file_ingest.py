@@ -0,0 +1,237 @@
+"""
+File-Based Bulk Ingest
+
+Instead of rendering generated rows as multi-megabyte INSERT ... VALUES
+text that the engine has to parse as SQL, batches are written to local
+Parquet or CSV files and loaded with COPY:
+
+  COPY INTO playstats (gameid, playerid, ...) FROM 'file:///.../playstats-<id>.parquet'
+  WITH TYPE = PARQUET
+
+Values are never formatted or escaped as SQL literals, Parquet keeps
+numbers and timestamps binary, and each file can hold several row groups.
+This is the path production loads take (with S3 in place of the local
+directory).
+
+The engine must be able to read the staging directory. With Core in
+Docker, mount it into the container and point FIREBOLT_CORE_INGEST_URL at
+the mount:
+
+  docker run -d -p 3473:3473 \\
+      -v "$PWD/.plg-ide/ingest:/firebolt-core/volume/ingest" \\
+      ghcr.io/firebolt-db/firebolt-core:latest
+
+Parquet needs the optional `pyarrow` package; CSV uses only the standard
+library.
+
+Usage:
+  python -m lib.file_ingest --rows 1000000
+  python -m lib.file_ingest --rows 1000000 --mode sql --mode parquet --file-rows 250000
+"""
+
+from __future__ import annotations
+
+import csv
+import os
+import uuid
+from pathlib import Path
+from typing import Callable, Sequence
+
+import numpy as np
+
+from .scale import Chunk, DataSpec, chunk_rng, chunk_tasks, task_columns
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet
+except ImportError:  # Only needed for Parquet files
+    pa = None
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+FILE_FORMATS = ("parquet", "csv")
+
+# Where files are staged on this machine, and the URL the engine reads them from
+DEFAULT_STAGING_DIR = REPO_ROOT / ".plg-ide" / "ingest"
+DEFAULT_STAGING_URL = "file:///firebolt-core/volume/ingest"
+
+# Rows per file (one COPY each) and per Parquet row group
+DEFAULT_FILE_ROWS = 250_000
+DEFAULT_ROW_GROUP_ROWS = 50_000
+
+
+def staging_location() -> tuple[Path, str]:
+    """
+    Local staging directory and the URL prefix the engine reads it through.
+
+    Set FIREBOLT_CORE_INGEST_DIR / FIREBOLT_CORE_INGEST_URL when Core runs
+    with a different mount, or natively (URL file:// plus the same directory).
+    """
+    directory = Path(os.getenv("FIREBOLT_CORE_INGEST_DIR", DEFAULT_STAGING_DIR))
+    url = os.getenv("FIREBOLT_CORE_INGEST_URL", DEFAULT_STAGING_URL).rstrip("/")
+    return directory, url
+
+
+def check_format(format: str) -> str:
+    format = format.lower()
+    if format not in FILE_FORMATS:
+        raise ValueError(f"Unknown file format {format!r}; expected one of {', '.join(FILE_FORMATS)}")
+    if format == "parquet" and pa is None:
+        raise RuntimeError("Parquet ingest needs pyarrow. Run: pip install pyarrow")
+    return format
+
+
+def _is_timestamp(column) -> bool:
+    return isinstance(column, np.ndarray) and column.dtype.kind == "M"
+
+
+def text_column(column: Sequence) -> list:
+    """
+    Column values as CSV fields / SQL literal text: dates as YYYY-MM-DD,
+    timestamps as YYYY-MM-DD HH:MM:SS, booleans as true/false.
+    """
+    if _is_timestamp(column):
+        if np.datetime_data(column.dtype)[0] == "D":
+            return np.datetime_as_string(column).tolist()
+        return [s.replace("T", " ") for s in np.datetime_as_string(column, unit="s").tolist()]
+    if isinstance(column, np.ndarray):
+        if column.dtype.kind == "b":
+            return np.where(column, "true", "false").tolist()
+        return column.tolist()
+    return list(column)
+
+
+def write_file(
+    path: Path,
+    columns: dict[str, Sequence],
+    format: str,
+    row_group_rows: int = DEFAULT_ROW_GROUP_ROWS
+) -> int:
+    """Write named columns to a Parquet or CSV file (with header); returns rows written."""
+    names = list(columns)
+    rows = len(columns[names[0]]) if names else 0
+    if format == "parquet":
+        table = pa.table({name: pa.array(values) for name, values in columns.items()})
+        pa.parquet.write_table(table, str(path), row_group_size=row_group_rows, compression="snappy")
+    else:
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(names)
+            # NULLs are empty fields
+            writer.writerows(zip(*(text_column(c) for c in columns.values())))
+    return rows
+
+
+def copy_sql(table: str, columns: Sequence[str], url: str, format: str) -> str:
+    """COPY statement loading one staged file into the named columns of a table."""
+    options = "TYPE = PARQUET" if format == "parquet" else "TYPE = CSV HEADER = TRUE"
+    return f"COPY INTO {table} ({', '.join(columns)}) FROM '{url}' WITH {options}"
+
+
+def stage_batch(
+    make_columns: Callable[[tuple], dict[str, Sequence]],
+    table: str,
+    format: str,
+    row_group_rows: int,
+    task: tuple
+) -> tuple[str, int, str]:
+    """
+    Batch builder for lib.ingest.run_pipeline: write one file, return its COPY.
+
+    `make_columns(task)` generates the batch as named columns. Bind the
+    leading arguments with functools.partial so the builder stays picklable.
+    """
+    directory, url = staging_location()
+    directory.mkdir(parents=True, exist_ok=True)
+    columns = make_columns(task)
+    name = f"{table}-{uuid.uuid4().hex}.{format}"
+    path = directory / name
+    rows = write_file(path, columns, format, row_group_rows)
+    return copy_sql(table, list(columns), f"{url}/{name}", format), rows, str(path)
+
+
+# Benchmark table: the shape of the gaming playstats inserts
+_PROBE_TABLE = "plg_ingest_probe"
+_PROBE_COLUMNS = [
+    ("gameid", "INT"), ("playerid", "INT"), ("stattime", "TIMESTAMP"), ("selectedcar", "TEXT"),
+    ("currentlevel", "INT"), ("currentspeed", "REAL"), ("currentplaytime", "INT"), ("tournamentid", "INT"),
+]
+_PROBE_SPEC = DataSpec(seed=42, as_of="2024-03-31")
+
+
+def _probe_chunk(spec: DataSpec, chunk: Chunk) -> dict[str, np.ndarray]:
+    rng = chunk_rng(spec, chunk)
+    n = chunk.rows
+    minutes = rng.integers(0, 90 * 1440, n).astype("timedelta64[m]")
+    return {
+        "gameid": rng.integers(1, 101, n).astype(np.int32),
+        "playerid": rng.integers(1, 10_001, n).astype(np.int32),
+        "stattime": spec.anchor - minutes,
+        "selectedcar": np.char.add("car_", rng.integers(1, 11, n).astype(str)),
+        "currentlevel": rng.integers(1, 101, n).astype(np.int32),
+        "currentspeed": np.round(rng.uniform(0, 200, n), 1),
+        "currentplaytime": rng.integers(60, 7201, n).astype(np.int32),
+        "tournamentid": rng.integers(1, 501, n).astype(np.int32),
+    }
+
+
+def _probe_values_batch(task: tuple) -> tuple[str, int]:
+    """The probe rows of a (spec, chunks) task as one INSERT ... VALUES statement."""
+    columns = task_columns(_probe_chunk, task)
+    values = ", ".join(map(
+        "({}, {}, '{}', '{}', {}, {}, {}, {})".format,
+        *(text_column(c) for c in columns.values())
+    ))
+    return f"INSERT INTO {_PROBE_TABLE} ({', '.join(columns)}) VALUES {values}", sum(c.rows for c in task[1])
+
+
+# CLI support
+if __name__ == "__main__":
+    import argparse
+    from functools import partial
+
+    from .firebolt import FireboltRunner
+    from .ingest import DEFAULT_UPLOADERS, DEFAULT_WORKERS, print_pipeline_stats, run_pipeline
+
+    parser = argparse.ArgumentParser(description="Compare INSERT ... VALUES against file-based COPY on the same rows")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows loaded per mode (default: 1000000)")
+    parser.add_argument("--mode", action="append", choices=("sql",) + FILE_FORMATS,
+                        help="Load path to measure (repeatable; default: all)")
+    parser.add_argument("--batch-rows", type=int, default=10_000,
+                        help="Rows per INSERT in sql mode (default: 10000)")
+    parser.add_argument("--file-rows", type=int, default=DEFAULT_FILE_ROWS,
+                        help=f"Rows per staged file / COPY (default: {DEFAULT_FILE_ROWS})")
+    parser.add_argument("--row-group-rows", type=int, default=DEFAULT_ROW_GROUP_ROWS,
+                        help=f"Rows per Parquet row group (default: {DEFAULT_ROW_GROUP_ROWS})")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--uploaders", type=int, default=DEFAULT_UPLOADERS)
+    args = parser.parse_args()
+
+    results = []
+    for mode in args.mode or ["sql"] + [f for f in FILE_FORMATS if f != "parquet" or pa is not None]:
+        runner = FireboltRunner(runtime="core", label_queries=False)
+        try:
+            runner.execute(f"DROP TABLE IF EXISTS {_PROBE_TABLE}")
+            runner.execute(f"CREATE TABLE {_PROBE_TABLE} ({', '.join(f'{c} {t}' for c, t in _PROBE_COLUMNS)})")
+            # Chunks are seeded independently of the batch or file size, so every mode loads the same rows
+            size = args.batch_rows if mode == "sql" else args.file_rows
+            tasks = chunk_tasks(_PROBE_SPEC, _PROBE_TABLE, args.rows, size)
+            if mode == "sql":
+                build = _probe_values_batch
+            else:
+                build = partial(stage_batch, partial(task_columns, _probe_chunk), _PROBE_TABLE, check_format(mode), args.row_group_rows)
+            print(f"\n[{mode}]")
+            stats = run_pipeline(runner, build, tasks, name=f"{_PROBE_TABLE} ({mode})",
+                                 workers=args.workers, uploaders=args.uploaders)
+            print_pipeline_stats(stats)
+            results.append((mode, stats))
+            runner.execute(f"DROP TABLE IF EXISTS {_PROBE_TABLE}")
+        finally:
+            runner.close()
+
+    print("\nmode         rows/s        MB  payload bytes/row")
+    for mode, stats in results:
+        rate = stats.upload.rows / stats.wall_s if stats.wall_s else 0.0
+        per_row = stats.upload.bytes / stats.upload.rows if stats.upload.rows else 0.0
+        print(f"{mode:<8} {rate:>12,.0f} {stats.upload.bytes / 1e6:>9,.1f} {per_row:>10,.1f}")
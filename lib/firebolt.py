@@ -8,26 +8,265 @@ with benchmarking capabilities for feature demonstrations.
 from __future__ import annotations
 
 import os
+import threading
 import time
 import json
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from typing import Literal, Optional, Any
+from functools import cached_property, wraps
+from typing import Literal, Optional, Any, Callable, Iterator, Sequence
 from pathlib import Path
 
 import httpx
-from dotenv import load_dotenv
-from tabulate import tabulate
 
+from .columnar import ColumnBuilder, RowView
+from .compression import TransferStats, accept_encoding, compress_body, resolve_codec
+from .decoder import (
+    CORE_OUTPUT_FORMAT, FORMAT_NAMES, JSON_COMPACT_FORMAT, SMALL_RESULT_ROWS, TSV_FORMAT,
+    TSVDecoder, decode_json_compact, iter_line_batches,
+)
+from .hedging import Hedger, is_hedgeable
+from .result_cache import ResultCache
+from .sql import normalize, session_setting, split_statements, statement_kind, statement_summary
+from .stats import AdaptiveSampler, TimingStats, bootstrap_ratio_ci
+from . import query_metrics
 
+
+# Rows yielded per batch by execute_stream
+DEFAULT_STREAM_BATCH_ROWS = 10_000
+
+# How long (seconds) an auto-detected runtime is reused by later processes
+RUNTIME_CACHE_TTL_S = 300.0
+
+# Timeout for the Core availability probe in auto mode
+CORE_PROBE_TIMEOUT_S = 2.0
+
+# Extra time the HTTP client waits past a deadline for the server-side
+# cancel to take effect before giving up on the response
+CANCEL_GRACE_S = 5.0
+
+# Lookups of a query in engine_running_queries before giving up on
+# cancelling it (a query that was just sent may not be listed yet)
+CANCEL_LOOKUP_ATTEMPTS = 3
+
+# Defaults for run_full_benchmark in the verticals
+DEFAULT_QUERY_TIMEOUT_S = 120.0
+DEFAULT_SUITE_BUDGET_S = 900.0
+
+
+class QueryTimeout(RuntimeError):
+    """A query or time budget ran past its deadline; the query was cancelled on the server."""
+
+
+def core_connection_settings() -> tuple[str, dict]:
+    """Return (base URL, default query parameters) for the Core HTTP endpoint."""
+    host = os.getenv("FIREBOLT_CORE_HOST", "localhost")
+    port = os.getenv("FIREBOLT_CORE_PORT", "3473")
+    database = os.getenv("FIREBOLT_DATABASE", "plg_demo")
+    
+    # Build query parameters for advanced mode; ask for a type line
+    # after the header so results can be decoded into typed columns
+    params = {
+        "database": database,
+        "advanced_mode": "1",
+        "output_format": CORE_OUTPUT_FORMAT
+    }
+    return f"http://{host}:{port}", params
+
+
+def cloud_connection_settings() -> dict:
+    """Return keyword arguments for the Firebolt SDK connect() call."""
+    from firebolt.client.auth import ClientCredentials
+    
+    client_id = os.getenv("FIREBOLT_CLIENT_ID")
+    client_secret = os.getenv("FIREBOLT_CLIENT_SECRET")
+    
+    return {
+        "auth": ClientCredentials(client_id, client_secret),
+        "account_name": os.getenv("FIREBOLT_ACCOUNT"),
+        "database": os.getenv("FIREBOLT_DATABASE", "plg_demo"),
+        "engine_name": os.getenv("FIREBOLT_ENGINE"),
+        "api_endpoint": os.getenv("FIREBOLT_API_ENDPOINT", "api.app.firebolt.io")
+    }
+
+
+def _runtime_cache_path() -> Path:
+    base = os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "plg-ide" / "runtime.json"
+
+
+def _runtime_cache_key() -> str:
+    """Everything auto-detection depends on; a change invalidates the cache."""
+    core_host = os.getenv("FIREBOLT_CORE_HOST", "localhost")
+    core_port = os.getenv("FIREBOLT_CORE_PORT", "3473")
+    has_credentials = bool(os.getenv("FIREBOLT_CLIENT_ID") and os.getenv("FIREBOLT_CLIENT_SECRET"))
+    return f"{core_host}:{core_port}|cloud_credentials={has_credentials}"
+
+
+def read_cached_runtime() -> Optional[str]:
+    """Runtime detected by a recent process with the same settings, if any."""
+    ttl = float(os.getenv("PLG_RUNTIME_CACHE_TTL", RUNTIME_CACHE_TTL_S))
+    try:
+        entry = json.loads(_runtime_cache_path().read_text())
+    except (OSError, ValueError):
+        return None
+    if entry.get("key") != _runtime_cache_key() or time.time() - entry.get("detected_at", 0) > ttl:
+        return None
+    return entry.get("runtime")
+
+
+def write_cached_runtime(runtime: str):
+    path = _runtime_cache_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({
+            "key": _runtime_cache_key(),
+            "runtime": runtime,
+            "detected_at": time.time()
+        }))
+    except OSError:
+        pass  # Caching is best effort
+
+
+def forget_cached_runtime():
+    """Drop the cached runtime, e.g. after Core stopped answering."""
+    try:
+        _runtime_cache_path().unlink()
+    except OSError:
+        pass
+
+
+def known_runtime(requested: str) -> Optional[str]:
+    """Runtime that can be decided without probing: explicit, env or cached."""
+    if requested != "auto":
+        return requested
+    
+    env_runtime = os.getenv("FIREBOLT_RUNTIME", "").lower()
+    if env_runtime in ("cloud", "core"):
+        return env_runtime
+    
+    return read_cached_runtime()
+
+
+def probe_runtime() -> str:
+    """Detect the runtime by probing Core, falling back to Cloud credentials."""
+    core_host = os.getenv("FIREBOLT_CORE_HOST", "localhost")
+    core_port = os.getenv("FIREBOLT_CORE_PORT", "3473")
+    
+    try:
+        response = httpx.get(
+            f"http://{core_host}:{core_port}/",
+            timeout=CORE_PROBE_TIMEOUT_S
+        )
+        if response.status_code == 200:
+            return "core"
+    except:
+        pass
+    
+    # Check for Cloud credentials
+    if os.getenv("FIREBOLT_CLIENT_ID") and os.getenv("FIREBOLT_CLIENT_SECRET"):
+        return "cloud"
+    
+    # Default to core
+    return "core"
+
+
+def detect_runtime(requested: str) -> str:
+    """Detect which runtime to use, probing only when nothing is cached."""
+    runtime = known_runtime(requested)
+    if runtime is None:
+        runtime = probe_runtime()
+        write_cached_runtime(runtime)
+    return runtime
+
+
+def _accepts_row_dicts(cls):
+    """
+    Keep the row-based constructor, QueryResult(data=[row dicts], ...),
+    working: the rows are converted to `column_data`, and `columns` and
+    `row_count` default to what the rows hold.
+    """
+    init = cls.__init__
+    
+    @wraps(init)
+    def __init__(self, *args, data: Optional[Sequence[dict]] = None, **kwargs):
+        if data is not None:
+            rows = list(data)
+            columns = kwargs.setdefault("columns", list(rows[0]) if rows else [])
+            kwargs.setdefault("row_count", len(rows))
+            builder = ColumnBuilder(columns)
+            builder.add_rows([row.get(name) for name in columns] for row in rows)
+            kwargs["column_data"] = builder.build()
+        init(self, *args, **kwargs)
+    
+    cls.__init__ = __init__
+    return cls
+
+
+@_accepts_row_dicts
 @dataclass
 class QueryResult:
-    """Result from a single query execution."""
-    data: list[dict]
+    """
+    Result from a single query execution.
+    
+    Values are stored column by column in `column_data` (NumPy arrays for
+    numeric columns where available). `data` is a lazy view that builds
+    row dicts only when they are accessed. For compatibility, `data=` is
+    still accepted by the constructor in place of `column_data`.
+    """
+    column_data: dict[str, Sequence]
     row_count: int
     columns: list[str]
     execution_time_ms: float
     rows_scanned: Optional[int] = None
     bytes_read: Optional[int] = None
+    # Server-side metrics, filled from engine query history by label
+    query_label: Optional[str] = None
+    query_id: Optional[str] = None
+    cache_bytes_read: Optional[int] = None
+    cpu_time_us: Optional[int] = None
+    peak_memory_bytes: Optional[int] = None
+    server_time_ms: Optional[float] = None
+    # SQL text as sent, used to identify the query in stored results
+    sql: Optional[str] = None
+    # True when served from the client-side result cache
+    cached: bool = False
+    # Individual run times (ms) when produced by benchmark()
+    samples: list[float] = field(default_factory=list)
+    warmup_samples: list[float] = field(default_factory=list)
+    
+    @classmethod
+    def from_rows(
+        cls,
+        columns: list[str],
+        rows: list[Sequence],
+        execution_time_ms: float,
+        **metrics
+    ) -> "QueryResult":
+        """Build a result from value sequences given in column order."""
+        builder = ColumnBuilder(columns)
+        builder.add_rows(rows)
+        return cls(
+            column_data=builder.build(),
+            row_count=builder.row_count,
+            columns=list(columns),
+            execution_time_ms=execution_time_ms,
+            **metrics
+        )
+    
+    @property
+    def data(self) -> RowView:
+        """Rows as dicts, materialized on access."""
+        return RowView(self.columns, self.column_data, self.row_count)
+    
+    def column(self, name: str) -> Sequence:
+        """Return the array holding all values of one column."""
+        return self.column_data[name]
+    
+    @property
+    def timing(self) -> Optional[TimingStats]:
+        """Summary statistics over benchmark samples (None for single runs)."""
+        return TimingStats.from_samples(self.samples) if self.samples else None
     
     def __repr__(self):
         return f"QueryResult(rows={self.row_count}, time={self.execution_time_ms:.1f}ms)"
@@ -54,6 +293,11 @@ class BenchmarkResult:
             return 0
         return (1 - self.optimized.execution_time_ms / self.baseline.execution_time_ms) * 100
     
+    @property
+    def time_improvement_ci(self) -> Optional[tuple[float, float]]:
+        """95% bootstrap confidence interval for the speedup (needs samples)."""
+        return bootstrap_ratio_ci(self.baseline.samples, self.optimized.samples)
+    
     @property
     def rows_savings_pct(self) -> float:
         """Calculate rows scanned savings percentage."""
@@ -109,13 +353,108 @@ class BenchmarkResult:
              f"{self.bytes_savings_pct:.1f}%"],
         ]
         
+        def format_cpu(us: Optional[int]) -> str:
+            return "N/A" if us is None else f"{us / 1000:.0f} ms"
+        
+        def savings_pct(before: Optional[int], after: Optional[int]) -> str:
+            if not before or after is None:
+                return ""
+            return f"{(1 - after / before) * 100:.1f}%"
+        
+        # Extra server-side metrics, shown when query history provided them
+        for label, attribute, fmt in (
+            ("Cache Bytes Read", "cache_bytes_read", format_bytes),
+            ("CPU Time", "cpu_time_us", format_cpu),
+            ("Peak Memory", "peak_memory_bytes", format_bytes),
+        ):
+            before = getattr(self.baseline, attribute)
+            after = getattr(self.optimized, attribute)
+            if before is not None or after is not None:
+                table_data.append([label, fmt(before), fmt(after), savings_pct(before, after)])
+        
+        baseline_timing = self.baseline.timing
+        optimized_timing = self.optimized.timing
+        if baseline_timing and optimized_timing:
+            table_data[1:1] = [
+                ["  min / p95",
+                 f"{baseline_timing.min:.0f} / {baseline_timing.p95:.0f} ms",
+                 f"{optimized_timing.min:.0f} / {optimized_timing.p95:.0f} ms",
+                 ""],
+                ["  stddev",
+                 f"{baseline_timing.stddev:.1f} ms",
+                 f"{optimized_timing.stddev:.1f} ms",
+                 ""],
+                ["  runs (warm-up)",
+                 f"{baseline_timing.n} ({len(self.baseline.warmup_samples)})",
+                 f"{optimized_timing.n} ({len(self.optimized.warmup_samples)})",
+                 ""],
+            ]
+        
+        from tabulate import tabulate
+        
         print(tabulate(
             table_data,
             headers=["Metric", "Without", "With", "Savings"],
             tablefmt="rounded_grid"
         ))
         
-        print(f"\nImprovement: {self.time_improvement:.0f}X faster\n")
+        def format_factor(x: float) -> str:
+            return f"{x:.1f}X" if x < 10 else f"{x:.0f}X"
+        
+        interval = self.time_improvement_ci
+        if interval:
+            print(f"\nImprovement: {format_factor(self.time_improvement)} faster "
+                  f"(95% CI {format_factor(interval[0])} - {format_factor(interval[1])}, median of runs)\n")
+        else:
+            print(f"\nImprovement: {self.time_improvement:.0f}X faster\n")
+
+
+# Values that restore the engine default for settings the runner changes
+CLOUD_SETTING_DEFAULTS = {
+    "enable_result_cache": "TRUE",
+    "query_label": "''",
+}
+
+
+class CloudSession:
+    """
+    A Firebolt SDK cursor plus the session settings already applied to it.
+    
+    SET statements are only sent when a value differs from what the cursor
+    already has, so repeated benchmark runs with the same settings cost no
+    extra round trips.
+    """
+    
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.settings: dict[str, str] = {}
+    
+    def apply(self, settings: dict[str, Optional[str]]):
+        """Bring the cursor to `settings`; None means the engine default."""
+        for name, value in settings.items():
+            current = self.settings.get(name)
+            if value is None:
+                if current is None:
+                    continue
+                value = CLOUD_SETTING_DEFAULTS[name]
+            if current == value:
+                continue
+            self.cursor.execute(f"SET {name} = {value}")
+            self.settings[name] = value
+    
+    def close(self):
+        try:
+            self.cursor.close()
+        except Exception:
+            pass
+
+
+def cloud_settings(disable_cache: bool, label: Optional[str]) -> dict[str, Optional[str]]:
+    """Session settings a Cloud query needs."""
+    return {
+        "enable_result_cache": "FALSE" if disable_cache else None,
+        "query_label": f"'{label}'" if label else None,
+    }
 
 
 class FireboltRunner:
@@ -125,239 +464,882 @@ class FireboltRunner:
     Auto-detects runtime based on environment configuration.
     """
     
-    def __init__(self, runtime: Literal["cloud", "core", "auto"] = "auto"):
+    def __init__(
+        self,
+        runtime: Literal["cloud", "core", "auto"] = "auto",
+        label_queries: bool = True,
+        result_cache: bool | ResultCache = False,
+        hedging: bool | Hedger = False,
+        compression: Optional[str] = None,
+        output_format: Optional[str] = None
+    ):
         """
         Initialize the Firebolt runner.
         
         Args:
             runtime: Which runtime to use. "auto" will detect based on env.
+            label_queries: Tag each query with a unique query label so
+                server-side metrics can be looked up afterwards. Free on
+                Core (a URL parameter); on Cloud each label is a SET round
+                trip on the cursor, sent before execution_time_ms starts
+            result_cache: Serve repeated read-only queries from a client-side
+                cache. True uses a default ResultCache; pass an instance to
+                size it or share it between runners. Never used when
+                disable_cache=True.
+            hedging: Send a duplicate of a read-only query that is slower
+                than usual and take whichever answers first. True uses a
+                default Hedger; pass an instance to tune or share it.
+            compression: Core HTTP compression: "none", "gzip", "zstd" or
+                "auto" (compress only for remote hosts). Defaults to
+                FIREBOLT_CORE_COMPRESSION, else auto. Bytes and time are
+                counted in `transfer_stats`.
+            output_format: Core result format: "tsv", "json" (JSON_Compact)
+                or "auto", which uses JSON_Compact in execute() for a
+                statement (same text, literals and LIMIT included) that
+                returned few rows last time and streamed TSV otherwise.
+                execute_stream() and export() always stream TSV in auto
+                mode. Defaults to FIREBOLT_CORE_OUTPUT_FORMAT, else auto.
         """
         # Load environment variables
+        from dotenv import load_dotenv
         load_dotenv()
         
-        self.runtime = self._detect_runtime(runtime)
+        self.label_queries = label_queries
         self._connection = None
         self._core_client = None
+        # Clients are created lazily; the lock keeps threads (e.g. the load
+        # scheduler) from racing to create two
+        self._connect_lock = threading.Lock()
+        # One reusable Cloud cursor per thread (cursors are not thread-safe)
+        self._cloud_local = threading.local()
+        self._cloud_sessions: list[CloudSession] = []
+        self._metrics_unavailable = False
+        # perf_counter() deadline set by time_budget()
+        self._deadline: Optional[float] = None
+        self.result_cache = ResultCache() if result_cache is True else (result_cache or None)
+        self.hedger = Hedger() if hedging is True else (hedging or None)
+        self._compression_setting = compression or os.getenv("FIREBOLT_CORE_COMPRESSION")
+        self.compression: Optional[str] = None  # Resolved with the Core client
+        self.transfer_stats = TransferStats()
+        self.output_format = (output_format or os.getenv("FIREBOLT_CORE_OUTPUT_FORMAT") or "auto").lower()
+        if self.output_format != "auto" and self.output_format not in FORMAT_NAMES:
+            raise ValueError(f"Unknown output format {self.output_format!r}; expected tsv, json or auto")
+        # Row count of the last result per normalized statement, for auto format choice
+        self._result_rows: dict[str, int] = {}
         
-        print(f"Firebolt Runner initialized: {self.runtime}")
+        # In auto mode without a cached answer, probe Core in the background
+        # and build the Core client meanwhile; the first use of `runtime`
+        # waits for the probe
+        self._runtime = known_runtime(runtime)
+        self._probe_result: list[str] = []
+        self._probe = None
+        if self._runtime is None:
+            self._probe = threading.Thread(
+                target=lambda: self._probe_result.append(probe_runtime()),
+                name="runtime-probe",
+                daemon=True
+            )
+            self._probe.start()
+            self._get_core_client()
+        else:
+            print(f"Firebolt Runner initialized: {self._runtime}")
+    
+    @property
+    def runtime(self) -> str:
+        """Runtime in use ("core" or "cloud"); waits for a pending probe."""
+        if self._runtime is None:
+            self._probe.join()
+            runtime = self._probe_result[0] if self._probe_result else "core"
+            write_cached_runtime(runtime)
+            self._runtime = runtime
+            print(f"Firebolt Runner initialized: {runtime}")
+        return self._runtime
+    
+    @runtime.setter
+    def runtime(self, value: str):
+        self._runtime = value
     
     def _detect_runtime(self, requested: str) -> str:
         """Detect which runtime to use."""
-        if requested != "auto":
-            return requested
-        
-        env_runtime = os.getenv("FIREBOLT_RUNTIME", "").lower()
-        if env_runtime in ("cloud", "core"):
-            return env_runtime
-        
-        # Try to detect Core availability
-        core_host = os.getenv("FIREBOLT_CORE_HOST", "localhost")
-        core_port = os.getenv("FIREBOLT_CORE_PORT", "3473")
-        
-        try:
-            response = httpx.get(
-                f"http://{core_host}:{core_port}/",
-                timeout=2.0
-            )
-            if response.status_code == 200:
-                return "core"
-        except:
-            pass
-        
-        # Check for Cloud credentials
-        if os.getenv("FIREBOLT_CLIENT_ID") and os.getenv("FIREBOLT_CLIENT_SECRET"):
-            return "cloud"
+        return detect_runtime(requested)
+    
+    @cached_property
+    def _cache_scope(self) -> tuple:
+        return self._connection_scope()
+    
+    def _cache_key_scope(self) -> tuple:
+        """
+        Connection scope plus the session settings this thread's queries run
+        with, so the same SQL under different settings is cached apart.
         
-        # Default to core
-        return "core"
+        Core requests each start a fresh session (scripts carry their SETs
+        inside the request, which makes them uncacheable), so only Cloud
+        cursors hold settings: those issued with SET/USE through execute().
+        Settings the runner manages per query (result cache, query label)
+        are left out.
+        """
+        if self.runtime == "core":
+            return self._cache_scope
+        session = getattr(self._cloud_local, "session", None)
+        settings = tuple(sorted(
+            (name, value) for name, value in (session.settings.items() if session else ())
+            if name not in CLOUD_SETTING_DEFAULTS
+        ))
+        return (self._cache_scope, settings)
+    
+    def _connection_scope(self) -> tuple:
+        """Identify the endpoint, database and settings results depend on."""
+        if self.runtime == "core":
+            base_url, params = core_connection_settings()
+            return ("core", base_url, tuple(sorted(params.items())))
+        return (
+            "cloud",
+            os.getenv("FIREBOLT_ACCOUNT"),
+            os.getenv("FIREBOLT_DATABASE", "plg_demo"),
+            os.getenv("FIREBOLT_ENGINE"),
+        )
     
     def _get_core_client(self) -> httpx.Client:
         """Get or create Core HTTP client."""
-        if self._core_client is None:
-            host = os.getenv("FIREBOLT_CORE_HOST", "localhost")
-            port = os.getenv("FIREBOLT_CORE_PORT", "3473")
-            database = os.getenv("FIREBOLT_DATABASE", "plg_demo")
-            
-            # Build query parameters for advanced mode
-            params = {
-                "database": database,
-                "advanced_mode": "1"
-            }
-            
-            base_url = f"http://{host}:{port}"
-            self._core_client = httpx.Client(base_url=base_url, timeout=300.0)
-            self._core_params = params
+        with self._connect_lock:
+            if self._core_client is None:
+                base_url, params = core_connection_settings()
+                self._core_params = params
+                self.compression = resolve_codec(self._compression_setting, base_url)
+                self._core_client = httpx.Client(base_url=base_url, timeout=300.0)
         
         return self._core_client
     
     def _get_cloud_connection(self):
         """Get or create Cloud SDK connection."""
-        if self._connection is None:
-            try:
-                from firebolt.db import connect
-                from firebolt.client.auth import ClientCredentials
-                
-                client_id = os.getenv("FIREBOLT_CLIENT_ID")
-                client_secret = os.getenv("FIREBOLT_CLIENT_SECRET")
-                account = os.getenv("FIREBOLT_ACCOUNT")
-                database = os.getenv("FIREBOLT_DATABASE", "plg_demo")
-                engine = os.getenv("FIREBOLT_ENGINE")
-                api_endpoint = os.getenv("FIREBOLT_API_ENDPOINT", "api.app.firebolt.io")
-                
-                self._connection = connect(
-                    auth=ClientCredentials(client_id, client_secret),
-                    account_name=account,
-                    database=database,
-                    engine_name=engine,
-                    api_endpoint=api_endpoint
-                )
-            except ImportError:
-                raise RuntimeError(
-                    "firebolt-sdk not installed. Run: pip install firebolt-sdk"
-                )
-            except Exception as e:
-                raise RuntimeError(f"Failed to connect to Firebolt Cloud: {e}")
+        with self._connect_lock:
+            if self._connection is None:
+                try:
+                    from firebolt.db import connect
+                    
+                    self._connection = connect(**cloud_connection_settings())
+                except ImportError:
+                    raise RuntimeError(
+                        "firebolt-sdk not installed. Run: pip install firebolt-sdk"
+                    )
+                except Exception as e:
+                    raise RuntimeError(f"Failed to connect to Firebolt Cloud: {e}")
         
         return self._connection
     
-    def execute(self, sql: str, disable_cache: bool = False) -> QueryResult:
+    def _cloud_session(self) -> CloudSession:
+        """This thread's reusable Cloud cursor and its settings."""
+        session = getattr(self._cloud_local, "session", None)
+        if session is None:
+            session = CloudSession(self._get_cloud_connection().cursor())
+            self._cloud_local.session = session
+            with self._connect_lock:
+                self._cloud_sessions.append(session)
+        return session
+    
+    def _drop_cloud_session(self):
+        """Discard this thread's cursor, e.g. after an error left it unusable."""
+        session = getattr(self._cloud_local, "session", None)
+        if session is None:
+            return
+        self._cloud_local.session = None
+        session.close()
+        with self._connect_lock:
+            if session in self._cloud_sessions:
+                self._cloud_sessions.remove(session)
+    
+    def execute(
+        self,
+        sql: str,
+        disable_cache: bool = False,
+        timeout_s: Optional[float] = None
+    ) -> QueryResult:
         """
         Execute a SQL statement.
         
         Args:
             sql: SQL statement to execute
-            disable_cache: If True, disable result caching for accurate benchmarks
+            disable_cache: If True, disable result caching (engine and
+                client-side) for accurate benchmarks
+            timeout_s: Deadline for this call. When it passes, a watchdog
+                thread cancels the query on the server and QueryTimeout is
+                raised. On Core the response is also abandoned if it is
+                still arriving CANCEL_GRACE_S later. On Cloud the cancel
+                runs from the watchdog thread on a new cursor of the
+                runner's shared connection, while the timed-out cursor is
+                still waiting on it. Inside time_budget() the remaining
+                budget also applies. Queries with a deadline are not hedged.
             
         Returns:
             QueryResult with data and metrics
         """
+        cache = self.result_cache
+        if cache is not None and not disable_cache:
+            cached = cache.get(sql, self._cache_key_scope())
+            if cached is not None:
+                return cached
+        
+        timeout_s = self._call_timeout(timeout_s)
+        # A label is needed to find the query again for cancellation
+        label = query_metrics.new_query_label() if self.label_queries or timeout_s is not None else None
+        expired = threading.Event()
+        watchdog = None
+        if timeout_s is not None:
+            watchdog = threading.Timer(timeout_s, self._expire, args=(label, expired))
+            watchdog.daemon = True
+            watchdog.start()
+        try:
+            if self.hedger is not None and timeout_s is None and is_hedgeable(sql):
+                result = self.hedger.execute(self, sql, disable_cache, label)
+            elif self.runtime == "core":
+                result = self._execute_core(sql, disable_cache, label, timeout_s)
+            else:
+                result = self._execute_cloud(sql, disable_cache, label)
+        except RuntimeError as e:
+            if expired.is_set():
+                raise QueryTimeout(
+                    f"Query exceeded its {timeout_s:.1f}s deadline ({statement_summary(sql, 50)})"
+                ) from e
+            raise
+        finally:
+            if watchdog is not None:
+                watchdog.cancel()
+            # A failed script may still have written part of its changes
+            if cache is not None:
+                cache.observe(sql)
+        # A hedged query reports the label of whichever attempt answered
+        result.query_label = result.query_label or (label if self.label_queries else None)
+        result.sql = sql
+        if cache is not None and not disable_cache:
+            cache.put(sql, self._cache_key_scope(), result)
+        return result
+    
+    @contextmanager
+    def time_budget(self, seconds: Optional[float]):
+        """
+        Bound all queries inside the block by one shared deadline.
+        
+        Each execute() gets at most the remaining budget as its deadline,
+        benchmark() stops sampling when the budget is used up, and once it
+        is gone further calls raise QueryTimeout without running. Budgets
+        nest; the earlier deadline wins. None means no budget.
+        """
+        previous = self._deadline
+        if seconds is not None:
+            deadline = time.perf_counter() + seconds
+            self._deadline = deadline if previous is None else min(previous, deadline)
+        try:
+            yield
+        finally:
+            self._deadline = previous
+    
+    def remaining_budget_s(self) -> Optional[float]:
+        """Seconds left in the current time_budget(), or None outside one."""
+        if self._deadline is None:
+            return None
+        return max(0.0, self._deadline - time.perf_counter())
+    
+    def _call_timeout(self, timeout_s: Optional[float]) -> Optional[float]:
+        """The tighter of a call's own timeout and the remaining budget."""
+        remaining = self.remaining_budget_s()
+        if remaining is None:
+            return timeout_s
+        if remaining <= 0:
+            raise QueryTimeout("Time budget exhausted")
+        return remaining if timeout_s is None else min(timeout_s, remaining)
+    
+    def _expire(self, label: str, expired: threading.Event):
+        """Watchdog for execute(): mark the call expired and cancel it on the server."""
+        expired.set()
+        self.cancel_query(label)
+    
+    def cancel_query(self, label: str, verbose: bool = True) -> bool:
+        """
+        Cancel a running query on the server by its query label.
+        
+        The query is looked up in engine_running_queries and cancelled with
+        CANCEL QUERY on a separate request: a pooled connection on Core, a
+        new cursor of the shared connection on Cloud (so from a watchdog
+        thread it runs alongside the cursor being cancelled). Failures are
+        printed rather than raised, since this usually runs on a watchdog
+        thread.
+        
+        Returns:
+            True if a running query was found and cancelled
+        """
+        try:
+            for attempt in range(CANCEL_LOOKUP_ATTEMPTS):
+                running = self._collect(query_metrics.running_query_sql(label))
+                query_ids = [row.get("query_id") for row in running.data if row.get("query_id")] if running else []
+                for query_id in query_ids:
+                    self._collect(query_metrics.cancel_sql(query_id))
+                if query_ids:
+                    return True
+                time.sleep(0.2 * (attempt + 1))
+        except RuntimeError as e:
+            if verbose:
+                print(f"  Could not cancel query {label}: {e}")
+        return False
+    
+    def execute_stream(
+        self,
+        sql: str,
+        disable_cache: bool = False,
+        limit: Optional[int] = None,
+        batch_size: int = DEFAULT_STREAM_BATCH_ROWS
+    ) -> Iterator[list[dict]]:
+        """
+        Execute a SQL statement and yield rows in batches as they arrive.
+        
+        Only one batch is held in memory at a time. When `limit` rows have
+        been yielded the response is closed, so the rest of the result is
+        never pulled over the wire.
+        
+        Args:
+            sql: SQL statement to execute
+            disable_cache: If True, disable result caching for accurate benchmarks
+            limit: Stop after this many rows (None = all rows)
+            batch_size: Maximum number of rows per yielded batch
+            
+        Yields:
+            Lists of row dicts, each at most `batch_size` long
+        """
+        batches = self._stream_batches(sql, disable_cache, batch_size)
+        remaining = limit
+        try:
+            for columns, batch, row_count in batches:
+                rows = RowView(columns, dict(zip(columns, batch)), row_count)
+                if remaining is not None:
+                    rows = rows[:remaining]
+                    remaining -= len(rows)
+                if rows:
+                    yield list(rows)
+                if remaining is not None and remaining <= 0:
+                    return
+        finally:
+            batches.close()
+    
+    def export(
+        self,
+        sql: str,
+        out: str | Path,
+        format: Optional[str] = None,
+        batch_rows: Optional[int] = None,
+        progress: bool = False
+    ):
+        """
+        Stream a query result into a CSV, Parquet or Arrow file with bounded
+        memory; see lib.export.export_query.
+        
+        Returns:
+            ExportSummary with rows and bytes written
+        """
+        from .export import DEFAULT_EXPORT_BATCH_ROWS, export_query
+        
+        return export_query(self, sql, out, format=format, batch_rows=batch_rows or DEFAULT_EXPORT_BATCH_ROWS,
+                            progress=progress)
+    
+    def _stream_batches(
+        self,
+        sql: str,
+        disable_cache: bool = False,
+        batch_size: int = DEFAULT_STREAM_BATCH_ROWS,
+        label: Optional[str] = None
+    ) -> Iterator[tuple[list[str], list[Sequence], int]]:
+        """Stream (columns, column batch, row count) from the active runtime."""
         if self.runtime == "core":
-            return self._execute_core(sql, disable_cache)
-        else:
-            return self._execute_cloud(sql, disable_cache)
+            return self._stream_core(sql, disable_cache, batch_size, label)
+        return self._stream_cloud(sql, disable_cache, batch_size, label)
     
-    def _execute_core(self, sql: str, disable_cache: bool = False) -> QueryResult:
-        """Execute SQL on Firebolt Core."""
+    def _collect(
+        self,
+        sql: str,
+        disable_cache: bool = False,
+        label: Optional[str] = None,
+        cancel: Optional[threading.Event] = None
+    ) -> Optional[QueryResult]:
+        """
+        Run a statement on its own stream (a pooled connection on Core, a
+        new cursor on Cloud) and collect the result.
+        
+        Safe to call from any thread. Returns None if `cancel` is set before
+        the result is complete; the stream is closed at the next batch.
+        """
+        start_time = time.perf_counter()
+        builder = None
+        batches = self._stream_batches(sql, disable_cache, label=label)
+        try:
+            for columns, batch, row_count in batches:
+                if cancel is not None and cancel.is_set():
+                    return None
+                if builder is None:
+                    builder = ColumnBuilder(columns)
+                builder.add_columns(batch, row_count)
+        finally:
+            batches.close()
+        
+        return QueryResult(
+            column_data=builder.build() if builder else {},
+            row_count=builder.row_count if builder else 0,
+            columns=builder.columns if builder else [],
+            execution_time_ms=(time.perf_counter() - start_time) * 1000
+        )
+    
+    def _core_format(self, sql: str, materialized: bool = False) -> str:
+        """
+        Output format to request for a statement.
+        
+        In auto mode JSON_Compact, which is read whole, is only used for
+        results collected whole anyway (`materialized`), and only when the
+        same statement returned few rows last time. The key keeps literals,
+        so "LIMIT 5" says nothing about "LIMIT 10000000".
+        """
+        if self.output_format != "auto":
+            return FORMAT_NAMES[self.output_format]
+        if not materialized:
+            return TSV_FORMAT
+        rows = self._result_rows.get(normalize(sql))
+        if rows is not None and rows <= SMALL_RESULT_ROWS:
+            return JSON_COMPACT_FORMAT
+        return TSV_FORMAT
+    
+    def _note_result_rows(self, sql: str, rows: int):
+        if self.output_format != "auto":
+            return
+        if len(self._result_rows) >= 4096:
+            self._result_rows.clear()
+        self._result_rows[normalize(sql)] = rows
+    
+    def _stream_core(
+        self,
+        sql: str,
+        disable_cache: bool = False,
+        batch_size: int = DEFAULT_STREAM_BATCH_ROWS,
+        label: Optional[str] = None,
+        timeout_s: Optional[float] = None,
+        materialized: bool = False
+    ) -> Iterator[tuple[list[str], list[Sequence], int]]:
+        """
+        Stream (columns, typed column batch, row count) from Firebolt Core.
+        
+        TSV bodies are read as raw byte chunks and decoded a batch of lines
+        at a time. The first batch is yielded as soon as the header and type
+        lines arrive, so callers learn the columns even for empty results.
+        JSON_Compact bodies (see _core_format; `materialized` says the
+        caller collects the whole result) are read in one piece and yielded
+        in batches of `batch_size` rows.
+        """
         client = self._get_core_client()
+        codec = self.compression
+        output_format = self._core_format(sql, materialized)
         
         # Optionally disable cache
-        if disable_cache:
-            sql = f"SET enable_result_cache = FALSE;\n{sql}"
+        text = f"SET enable_result_cache = FALSE;\n{sql}" if disable_cache else sql
+        body = text.encode()
+        compress_start = time.perf_counter()
+        content, encoding = compress_body(body, codec)
+        compress_s = time.perf_counter() - compress_start
+        headers = {"Content-Type": "text/plain", "Accept-Encoding": accept_encoding(codec)}
+        if encoding:
+            headers["Content-Encoding"] = encoding
         
-        start_time = time.perf_counter()
+        received = 0
+        # Backstop in case the server-side cancel does not arrive. httpx
+        # timeouts apply to each connect/read, so a response that keeps
+        # trickling in is also checked against the total deadline per chunk.
+        deadline = time.perf_counter() + timeout_s + CANCEL_GRACE_S if timeout_s is not None else None
         
+        def counted(chunks: Iterator[bytes]) -> Iterator[bytes]:
+            nonlocal received
+            for chunk in chunks:
+                if deadline is not None and time.perf_counter() > deadline:
+                    raise httpx.ReadTimeout(f"Response still arriving {timeout_s + CANCEL_GRACE_S:.1f}s after sending")
+                received += len(chunk)
+                yield chunk
+        
+        # Set when Core rejects a compressed body; the query is then sent
+        # again uncompressed and only that attempt is recorded
+        resend = False
         try:
-            response = client.post(
+            start_time = time.perf_counter()
+            with client.stream(
+                "POST",
                 "/",
-                params=self._core_params,
-                content=sql,
-                headers={"Content-Type": "text/plain"}
-            )
-            response.raise_for_status()
-            
-            execution_time_ms = (time.perf_counter() - start_time) * 1000
-            
-            # Parse response
-            result_data = []
-            columns = []
-            rows_scanned = None
-            bytes_read = None
-            
-            if response.text.strip():
-                lines = response.text.strip().split('\n')
-                if lines:
-                    # First line is headers
-                    columns = lines[0].split('\t')
-                    # Remaining lines are data
-                    for line in lines[1:]:
-                        if line.strip():
-                            values = line.split('\t')
-                            result_data.append(dict(zip(columns, values)))
-            
-            return QueryResult(
-                data=result_data,
-                row_count=len(result_data),
-                columns=columns,
-                execution_time_ms=execution_time_ms,
-                rows_scanned=rows_scanned,
-                bytes_read=bytes_read
-            )
-            
+                params={
+                    **self._core_params,
+                    "output_format": output_format,
+                    **query_metrics.label_setting(label)
+                },
+                content=content,
+                headers=headers,
+                timeout=timeout_s + CANCEL_GRACE_S if timeout_s is not None else httpx.USE_CLIENT_DEFAULT
+            ) as response:
+                try:
+                    if response.is_error:
+                        response.read()
+                        if encoding is not None and response.status_code == 415:
+                            # The server does not take compressed bodies
+                            print(f"  Core rejected {encoding} request bodies; sending uncompressed from now on")
+                            self.compression = "none"
+                            resend = True
+                        else:
+                            response.raise_for_status()
+                    
+                    if not resend:
+                        yield from self._read_core_response(response, sql, output_format, batch_size, counted)
+                finally:
+                    if not resend:
+                        self.transfer_stats.record(
+                            len(body), len(content), received, response.num_bytes_downloaded,
+                            compress_s, time.perf_counter() - start_time
+                        )
+                
         except httpx.HTTPStatusError as e:
             raise RuntimeError(f"Query failed: {e.response.text}")
-        except Exception as e:
+        except httpx.HTTPError as e:
+            if isinstance(e, httpx.ConnectError):
+                # Core may have gone away; re-detect next time
+                forget_cached_runtime()
             raise RuntimeError(f"Query execution error: {e}")
+        
+        if resend:
+            yield from self._stream_core(sql, disable_cache, batch_size, label, timeout_s, materialized)
     
-    def _execute_cloud(self, sql: str, disable_cache: bool = False) -> QueryResult:
-        """Execute SQL on Firebolt Cloud."""
-        connection = self._get_cloud_connection()
-        cursor = connection.cursor()
+    def _read_core_response(
+        self,
+        response: httpx.Response,
+        sql: str,
+        output_format: str,
+        batch_size: int,
+        counted: Callable[[Iterator[bytes]], Iterator[bytes]]
+    ) -> Iterator[tuple[list[str], list[Sequence], int]]:
+        """Decode a successful Core response body into (columns, column batch, row count)."""
+        total_rows = 0
+        if output_format == JSON_COMPACT_FORMAT:
+            payload = b"".join(counted(response.iter_bytes()))
+            if payload.strip():
+                columns, _, values, total_rows = decode_json_compact(payload)
+                if not total_rows:
+                    yield columns, values, 0
+                for start in range(0, total_rows, batch_size):
+                    stop = min(start + batch_size, total_rows)
+                    yield columns, [column[start:stop] for column in values], stop - start
+        else:
+            decoder = TSVDecoder()
+            pending = []
+            emitted = False
+            # httpx decompresses the body chunk by chunk
+            for lines in iter_line_batches(counted(response.iter_bytes())):
+                pending.extend(lines)
+                # Wait for the header and type lines, then for a full batch
+                if len(pending) < (batch_size if emitted else 2):
+                    continue
+                values, row_count = decoder.decode_lines(pending)
+                pending = []
+                emitted = True
+                total_rows += row_count
+                yield decoder.columns, values, row_count
+            if pending or not emitted:
+                values, row_count = decoder.decode_lines(pending)
+                total_rows += row_count
+                if decoder.columns is not None:
+                    yield decoder.columns, values, row_count
+        self._note_result_rows(sql, total_rows)
+    
+    def _stream_cloud(
+        self,
+        sql: str,
+        disable_cache: bool = False,
+        batch_size: int = DEFAULT_STREAM_BATCH_ROWS,
+        label: Optional[str] = None
+    ) -> Iterator[tuple[list[str], list[Sequence], int]]:
+        """
+        Stream (columns, column batch, row count) from Firebolt Cloud via cursor.fetchmany.
         
-        # Optionally disable cache
-        if disable_cache:
-            cursor.execute("SET enable_result_cache = FALSE")
+        Streams get their own cursor so a caller can run other queries
+        while iterating.
+        """
+        connection = self._get_cloud_connection()
+        session = CloudSession(connection.cursor())
+        cursor = session.cursor
         
+        try:
+            session.apply(cloud_settings(disable_cache, label))
+            cursor.execute(sql)
+            columns = [desc[0] for desc in cursor.description] if cursor.description else []
+            if not columns:
+                return
+            yield columns, [[] for _ in columns], 0
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield columns, [list(values) for values in zip(*rows)], len(rows)
+        finally:
+            cursor.close()
+    
+    def _execute_core(
+        self,
+        sql: str,
+        disable_cache: bool = False,
+        label: Optional[str] = None,
+        timeout_s: Optional[float] = None
+    ) -> QueryResult:
+        """Execute SQL on Firebolt Core."""
         start_time = time.perf_counter()
-        cursor.execute(sql)
+        
+        # Consume the stream so the raw body and line list are never buffered
+        builder = None
+        for columns, batch, row_count in self._stream_core(sql, disable_cache, label=label, timeout_s=timeout_s,
+                                                           materialized=True):
+            if builder is None:
+                builder = ColumnBuilder(columns)
+            builder.add_columns(batch, row_count)
+        
         execution_time_ms = (time.perf_counter() - start_time) * 1000
         
-        # Fetch results
-        columns = [desc[0] for desc in cursor.description] if cursor.description else []
-        rows = cursor.fetchall()
+        return QueryResult(
+            column_data=builder.build() if builder else {},
+            row_count=builder.row_count if builder else 0,
+            columns=builder.columns if builder else [],
+            execution_time_ms=execution_time_ms,
+            rows_scanned=None,
+            bytes_read=None
+        )
+    
+    def _execute_cloud(
+        self,
+        sql: str,
+        disable_cache: bool = False,
+        label: Optional[str] = None
+    ) -> QueryResult:
+        """
+        Execute SQL on Firebolt Cloud.
         
-        result_data = [dict(zip(columns, row)) for row in rows]
+        Reuses this thread's cursor, sends SETs only when a setting changes,
+        and builds the result from fetchmany batches into the same columnar
+        structure as Core.
+        """
+        session = self._cloud_session()
+        cursor = session.cursor
+        
+        try:
+            # SETs (label, result cache) are separate round trips; keep them out of the timing
+            session.apply(cloud_settings(disable_cache, label))
+            
+            start_time = time.perf_counter()
+            cursor.execute(sql)
+            execution_time_ms = (time.perf_counter() - start_time) * 1000
+            # The cursor keeps SET/USE for later queries; the result cache keys on them
+            setting = session_setting(sql)
+            if setting is not None:
+                session.settings[setting[0]] = setting[1]
+            
+            columns = [desc[0] for desc in cursor.description] if cursor.description else []
+            builder = ColumnBuilder(columns)
+            if columns:
+                while True:
+                    rows = cursor.fetchmany(DEFAULT_STREAM_BATCH_ROWS)
+                    if not rows:
+                        break
+                    builder.add_rows(rows)
+        except Exception as e:
+            # The cursor may be unusable after an error; start a fresh one
+            self._drop_cloud_session()
+            raise RuntimeError(f"Query failed: {e}") from e
         
         return QueryResult(
-            data=result_data,
-            row_count=len(result_data),
-            columns=columns,
+            column_data=builder.build(),
+            row_count=builder.row_count,
+            columns=builder.columns,
             execution_time_ms=execution_time_ms,
-            rows_scanned=None,  # Cloud SDK doesn't expose this easily
+            rows_scanned=None,  # Filled in later by fetch_query_metrics
             bytes_read=None
         )
     
-    def execute_file(self, filepath: str | Path) -> QueryResult:
-        """Execute SQL from a file."""
+    def execute_script(
+        self,
+        sql: str,
+        disable_cache: bool = False,
+        verbose: bool = False
+    ) -> list[QueryResult]:
+        """
+        Execute a multi-statement script one statement per request.
+        
+        Core accepts a single query per request, so the script is split
+        with a tokenizer (semicolons in strings and comments are safe) up
+        front, and the statements are sent back to back over the same
+        keep-alive connection. Statements run strictly in order: later
+        statements usually depend on earlier DDL.
+        
+        SET statements are carried into every following request, since
+        each Core request starts a fresh session.
+        
+        Args:
+            sql: Script text
+            disable_cache: If True, disable result caching for every statement
+            verbose: Print each statement's time as it completes
+            
+        Returns:
+            One QueryResult per statement, each with its own timing
+            
+        Raises:
+            RuntimeError: naming the failing statement; earlier statements
+                have already been applied
+        """
+        statements = split_statements(sql)
+        settings: list[str] = []
+        results = []
+        for i, statement in enumerate(statements, 1):
+            if statement_kind(statement) == "set":
+                settings.append(statement)
+                continue
+            text = ";\n".join(settings + [statement])
+            try:
+                result = self.execute(text, disable_cache=disable_cache)
+            except RuntimeError as e:
+                raise RuntimeError(
+                    f"Statement {i}/{len(statements)} failed ({statement_summary(statement)}): {e}"
+                ) from e
+            result.sql = statement
+            results.append(result)
+            if verbose:
+                print(f"  [{i}/{len(statements)}] {result.execution_time_ms:>9,.1f} ms  "
+                      f"{statement_summary(statement)}")
+        return results
+    
+    def execute_file(
+        self,
+        filepath: str | Path,
+        disable_cache: bool = False,
+        verbose: bool = False
+    ) -> QueryResult:
+        """
+        Execute SQL from a file, statement by statement.
+        
+        Returns:
+            The last statement's result (e.g. a final SELECT or SHOW);
+            see execute_script for per-statement results
+        """
         path = Path(filepath)
         if not path.exists():
             raise FileNotFoundError(f"SQL file not found: {filepath}")
         
-        sql = path.read_text()
-        return self.execute(sql)
+        results = self.execute_script(path.read_text(), disable_cache=disable_cache, verbose=verbose)
+        if not results:
+            return QueryResult(column_data={}, row_count=0, columns=[], execution_time_ms=0.0)
+        return results[-1]
+    
+    def fetch_query_metrics(
+        self,
+        results: list[QueryResult],
+        timeout_s: float = 10.0,
+        poll_interval_s: float = 0.5
+    ) -> int:
+        """
+        Attach server-side metrics from engine query history to results.
+        
+        Results are looked up by query label, many labels per history query.
+        History rows are written when a query finishes, possibly with a
+        short delay, so missing labels are polled for up to `timeout_s`.
+        
+        Returns:
+            Number of results that received metrics
+        """
+        if self._metrics_unavailable:
+            return 0
+        
+        results = [r for r in results if r is not None]
+        deadline = time.perf_counter() + timeout_s
+        updated = 0
+        while True:
+            for batch in query_metrics.batches(query_metrics.pending(results)):
+                try:
+                    history = self.execute(query_metrics.history_sql(r.query_label for r in batch))
+                except QueryTimeout:
+                    return updated  # Out of time_budget(); history itself is fine
+                except RuntimeError as e:
+                    # Engine without query history access; don't retry every call
+                    print(f"  Query history unavailable, skipping server metrics: {e}")
+                    self._metrics_unavailable = True
+                    return updated
+                updated += query_metrics.apply_history(batch, history.data)
+            
+            if not query_metrics.pending(results) or time.perf_counter() >= deadline:
+                return updated
+            time.sleep(poll_interval_s)
     
     def benchmark(
         self, 
-        sql: str, 
+        sql: str,
         iterations: int = 3,
-        warmup: int = 1
+        warmup: int = 1,
+        max_iterations: int = 30,
+        target_ci_pct: float = 5.0,
+        time_budget_s: Optional[float] = 60.0,
+        collect_metrics: bool = True,
+        timeout_s: Optional[float] = None
     ) -> QueryResult:
         """
-        Benchmark a query with multiple iterations.
+        Benchmark a query, keeping every sample.
+        
+        Warm-up runs continue until run times are steady (at most 10). Timed
+        runs continue past `iterations` until the 95% confidence interval of
+        the median is within `target_ci_pct` percent, `max_iterations` is
+        reached, or `time_budget_s` is used up.
         
         Args:
             sql: SQL query to benchmark
-            iterations: Number of iterations to average
-            warmup: Number of warmup runs (not counted)
+            iterations: Minimum number of timed runs
+            warmup: Minimum number of warmup runs (not counted); 0 disables warm-up
+            max_iterations: Upper bound on timed runs
+            target_ci_pct: Stop once the median's CI half-width is this tight
+            time_budget_s: Wall-clock budget for the whole benchmark (None = no limit)
+            collect_metrics: Fetch rows/bytes scanned etc. for the last run
+                from engine query history
+            timeout_s: Deadline for each run; a run past it is cancelled on
+                the server
             
         Returns:
-            QueryResult with averaged execution time
+            QueryResult of the last run, with execution_time_ms set to the
+            median and all run times in `samples` / `warmup_samples`
+            
+        Raises:
+            QueryTimeout: if a run hits its deadline (or the time_budget()
+                runs out) before any timed sample was taken
         """
-        # Warmup runs
-        for _ in range(warmup):
-            self.execute(sql, disable_cache=True)
-        
-        # Timed runs
-        total_time = 0
+        remaining = self.remaining_budget_s()
+        if remaining is not None:
+            time_budget_s = remaining if time_budget_s is None else min(time_budget_s, remaining)
+        sampler = AdaptiveSampler(
+            min_iterations=iterations,
+            max_iterations=max_iterations,
+            min_warmup=warmup,
+            target_ci_pct=target_ci_pct,
+            time_budget_s=time_budget_s
+        )
         last_result = None
         
-        for _ in range(iterations):
-            result = self.execute(sql, disable_cache=True)
-            total_time += result.execution_time_ms
-            last_result = result
+        def measure() -> float:
+            nonlocal last_result
+            last_result = self.execute(sql, disable_cache=True, timeout_s=timeout_s)
+            return last_result.execution_time_ms
+        
+        try:
+            sampler.run(measure)
+        except QueryTimeout as e:
+            if not sampler.samples:
+                raise
+            # Keep the samples taken so far
+            print(f"  Stopped sampling after {len(sampler.samples)} runs: {e}")
+        
+        # Return result with the median time and every sample attached
+        last_result.samples = sampler.samples
+        last_result.warmup_samples = sampler.warmup_samples
+        last_result.execution_time_ms = last_result.timing.median
         
-        # Return result with averaged time
-        if last_result:
-            last_result.execution_time_ms = total_time / iterations
+        if collect_metrics and self.label_queries:
+            self.fetch_query_metrics([last_result])
         
         return last_result
     
@@ -388,7 +1370,7 @@ class FireboltRunner:
         
         # Run baseline
         print("  Running baseline query...")
-        baseline_result = self.benchmark(baseline_sql, iterations=iterations)
+        baseline_result = self.benchmark(baseline_sql, iterations=iterations, collect_metrics=False)
         
         # Run setup if provided
         if setup_sql:
@@ -397,13 +1379,17 @@ class FireboltRunner:
         
         # Run optimized
         print("  Running optimized query...")
-        optimized_result = self.benchmark(optimized_sql, iterations=iterations)
+        optimized_result = self.benchmark(optimized_sql, iterations=iterations, collect_metrics=False)
         
         # Run teardown if provided
         if teardown_sql:
             print("  Running teardown...")
             self.execute(teardown_sql)
         
+        # One history lookup for both sides
+        if self.label_queries:
+            self.fetch_query_metrics([baseline_result, optimized_result])
+        
         result = BenchmarkResult(
             name=name,
             baseline=baseline_result,
@@ -423,6 +1409,9 @@ class FireboltRunner:
         """Close connections."""
         if self._core_client:
             self._core_client.close()
+        for session in self._cloud_sessions:
+            session.close()
+        self._cloud_sessions = []
         if self._connection:
             self._connection.close()
 
@@ -431,11 +1420,15 @@ class FireboltRunner:
 if __name__ == "__main__":
     import sys
     
+    from tabulate import tabulate
+    
     if len(sys.argv) < 2:
         print("Usage: python -m lib.firebolt <command> [args]")
         print("Commands:")
         print("  run <file.sql>  - Execute a SQL file")
         print("  query <sql>     - Execute inline SQL")
+        print("  export <sql|file.sql> --out <file> [--format csv|parquet|arrow]")
+        print("                  - Stream a result to a file")
         print("  status          - Check connection status")
         sys.exit(1)
     
@@ -443,16 +1436,43 @@ if __name__ == "__main__":
     command = sys.argv[1]
     
     if command == "run" and len(sys.argv) > 2:
-        result = runner.execute_file(sys.argv[2])
-        print(f"Executed: {result}")
+        start = time.perf_counter()
+        result = runner.execute_file(sys.argv[2], verbose=True)
+        print(f"Executed {sys.argv[2]} in {time.perf_counter() - start:.2f}s")
         if result.data:
             print(tabulate(result.data[:10], headers="keys", tablefmt="rounded_grid"))
     
     elif command == "query" and len(sys.argv) > 2:
-        result = runner.execute(" ".join(sys.argv[2:]))
-        print(f"Result: {result}")
-        if result.data:
-            print(tabulate(result.data[:10], headers="keys", tablefmt="rounded_grid"))
+        # Only the preview is fetched; the response is closed after 10 rows
+        preview = []
+        for batch in runner.execute_stream(" ".join(sys.argv[2:]), limit=10):
+            preview.extend(batch)
+        print(f"Result: {len(preview)} row(s) previewed")
+        if preview:
+            print(tabulate(preview, headers="keys", tablefmt="rounded_grid"))
+    
+    elif command == "export" and len(sys.argv) > 2:
+        import argparse
+        
+        from .export import DEFAULT_EXPORT_BATCH_ROWS, EXPORT_FORMATS, print_export_summary
+        
+        parser = argparse.ArgumentParser(prog="python -m lib.firebolt export")
+        parser.add_argument("sql", help="Query text, or a .sql file holding one query")
+        parser.add_argument("--out", required=True, help="Output file")
+        parser.add_argument("--format", choices=EXPORT_FORMATS,
+                            help="Output format (default: from the file extension)")
+        parser.add_argument("--batch-rows", type=int, default=DEFAULT_EXPORT_BATCH_ROWS,
+                            help=f"Rows per batch / row group (default: {DEFAULT_EXPORT_BATCH_ROWS:,})")
+        args = parser.parse_args(sys.argv[2:])
+        sql = args.sql
+        if sql.endswith(".sql") and Path(sql).is_file():
+            sql = Path(sql).read_text()
+        try:
+            summary = runner.export(sql, args.out, format=args.format, batch_rows=args.batch_rows, progress=True)
+        except RuntimeError as e:
+            print(f"Export failed: {e}")
+            sys.exit(1)
+        print_export_summary(summary)
     
     elif command == "status":
         print(f"Runtime: {runner.runtime}")
@@ -0,0 +1,486 @@
+"""
+Asyncio Firebolt Runner
+
+Async counterpart of FireboltRunner with the same execute/benchmark
+surface. Core queries share one pooled httpx.AsyncClient; Cloud queries go
+through the Firebolt SDK's async API. `execute_many` runs independent
+statements concurrently with a bounded number in flight.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from pathlib import Path
+from typing import AsyncIterator, Iterable, Literal, Optional, Sequence
+
+import httpx
+
+from .columnar import ColumnBuilder, RowView
+from .decoder import TSVDecoder
+from .sql import split_statements, statement_kind, statement_summary
+from .stats import AdaptiveSampler
+from . import query_metrics
+from .firebolt import (
+    DEFAULT_STREAM_BATCH_ROWS,
+    BenchmarkResult,
+    QueryResult,
+    cloud_connection_settings,
+    core_connection_settings,
+    detect_runtime,
+)
+
+
+# Default number of statements in flight for execute_many
+DEFAULT_CONCURRENCY = 8
+
+
+async def _aiter_line_batches(chunks: AsyncIterator[bytes]) -> AsyncIterator[list[bytes]]:
+    """Async version of decoder.iter_line_batches."""
+    tail = b""
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        lines = (tail + chunk).split(b"\n")
+        tail = lines.pop()
+        if lines:
+            yield lines
+    if tail:
+        yield [tail]
+
+
+class AsyncFireboltRunner:
+    """
+    Asyncio interface for Firebolt Cloud and Firebolt Core.
+
+    Use as an async context manager or call `close()` when done.
+    """
+
+    def __init__(
+        self,
+        runtime: Literal["cloud", "core", "auto"] = "auto",
+        max_connections: int = 32,
+        label_queries: bool = True
+    ):
+        """
+        Initialize the async Firebolt runner.
+
+        Args:
+            runtime: Which runtime to use. "auto" will detect based on env.
+            max_connections: Size of the Core HTTP connection pool
+            label_queries: Tag each query with a unique query label so
+                server-side metrics can be looked up afterwards. On Cloud
+                each label costs a SET round trip, which is kept out of
+                execution_time_ms.
+        """
+        # Load environment variables
+        from dotenv import load_dotenv
+        load_dotenv()
+
+        self.runtime = detect_runtime(runtime)
+        self.max_connections = max_connections
+        self.label_queries = label_queries
+        self._metrics_unavailable = False
+        self._connection = None
+        self._connection_lock = asyncio.Lock()
+        self._core_client = None
+
+        print(f"Async Firebolt Runner initialized: {self.runtime}")
+
+    async def __aenter__(self) -> "AsyncFireboltRunner":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _get_core_client(self) -> httpx.AsyncClient:
+        """Get or create the pooled Core HTTP client."""
+        if self._core_client is None:
+            base_url, params = core_connection_settings()
+            limits = httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections
+            )
+            self._core_client = httpx.AsyncClient(base_url=base_url, timeout=300.0, limits=limits)
+            self._core_params = params
+
+        return self._core_client
+
+    async def _get_cloud_connection(self):
+        """Get or create the async Cloud SDK connection."""
+        async with self._connection_lock:
+            if self._connection is None:
+                try:
+                    from firebolt.async_db import connect
+
+                    self._connection = await connect(**cloud_connection_settings())
+                except ImportError:
+                    raise RuntimeError(
+                        "firebolt-sdk not installed. Run: pip install firebolt-sdk"
+                    )
+                except Exception as e:
+                    raise RuntimeError(f"Failed to connect to Firebolt Cloud: {e}")
+
+        return self._connection
+
+    async def execute(self, sql: str, disable_cache: bool = False) -> QueryResult:
+        """
+        Execute a SQL statement.
+
+        Args:
+            sql: SQL statement to execute
+            disable_cache: If True, disable result caching for accurate benchmarks
+
+        Returns:
+            QueryResult with data and metrics
+        """
+        label = query_metrics.new_query_label() if self.label_queries else None
+        # On Cloud the session SETs (result cache, label) are separate round
+        # trips; send them before the clock starts
+        cursor = await self._cloud_cursor(disable_cache, label) if self.runtime == "cloud" else None
+        start_time = time.perf_counter()
+
+        builder = None
+        async for columns, batch, row_count in self._stream(sql, disable_cache, label=label, cursor=cursor):
+            if builder is None:
+                builder = ColumnBuilder(columns)
+            builder.add_columns(batch, row_count)
+
+        execution_time_ms = (time.perf_counter() - start_time) * 1000
+
+        return QueryResult(
+            column_data=builder.build() if builder else {},
+            row_count=builder.row_count if builder else 0,
+            columns=builder.columns if builder else [],
+            execution_time_ms=execution_time_ms,
+            query_label=label,
+            sql=sql
+        )
+
+    async def execute_stream(
+        self,
+        sql: str,
+        disable_cache: bool = False,
+        limit: Optional[int] = None,
+        batch_size: int = DEFAULT_STREAM_BATCH_ROWS
+    ) -> AsyncIterator[list[dict]]:
+        """
+        Execute a SQL statement and yield rows in batches as they arrive.
+
+        See FireboltRunner.execute_stream.
+        """
+        batches = self._stream(sql, disable_cache, batch_size)
+        remaining = limit
+        try:
+            async for columns, batch, row_count in batches:
+                rows = RowView(columns, dict(zip(columns, batch)), row_count)
+                if remaining is not None:
+                    rows = rows[:remaining]
+                    remaining -= len(rows)
+                if rows:
+                    yield list(rows)
+                if remaining is not None and remaining <= 0:
+                    return
+        finally:
+            await batches.aclose()
+
+    async def execute_many(
+        self,
+        sqls: Iterable[str],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        disable_cache: bool = False,
+        return_exceptions: bool = False
+    ) -> list[QueryResult]:
+        """
+        Execute independent statements concurrently.
+
+        Args:
+            sqls: Statements to run; order of execution is not guaranteed
+            concurrency: Maximum number of statements in flight
+            disable_cache: If True, disable result caching for accurate benchmarks
+            return_exceptions: If True, failed statements return their exception
+                instead of cancelling the rest
+
+        Returns:
+            Results in the same order as `sqls`
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run_one(sql: str) -> QueryResult:
+            async with semaphore:
+                return await self.execute(sql, disable_cache=disable_cache)
+
+        return await asyncio.gather(
+            *(run_one(sql) for sql in sqls),
+            return_exceptions=return_exceptions
+        )
+
+    def _stream(
+        self,
+        sql: str,
+        disable_cache: bool = False,
+        batch_size: int = DEFAULT_STREAM_BATCH_ROWS,
+        label: Optional[str] = None,
+        cursor=None
+    ) -> AsyncIterator[tuple[list[str], list[Sequence], int]]:
+        if self.runtime == "core":
+            return self._stream_core(sql, disable_cache, batch_size, label)
+        return self._stream_cloud(sql, disable_cache, batch_size, label, cursor)
+
+    async def _stream_core(
+        self,
+        sql: str,
+        disable_cache: bool = False,
+        batch_size: int = DEFAULT_STREAM_BATCH_ROWS,
+        label: Optional[str] = None
+    ) -> AsyncIterator[tuple[list[str], list[Sequence], int]]:
+        """Stream (columns, typed column batch, row count) from Firebolt Core."""
+        client = self._get_core_client()
+
+        # Optionally disable cache
+        if disable_cache:
+            sql = f"SET enable_result_cache = FALSE;\n{sql}"
+
+        try:
+            async with client.stream(
+                "POST",
+                "/",
+                params={**self._core_params, **query_metrics.label_setting(label)},
+                content=sql,
+                headers={"Content-Type": "text/plain"}
+            ) as response:
+                if response.is_error:
+                    await response.aread()
+                    response.raise_for_status()
+
+                decoder = TSVDecoder()
+                pending = []
+                emitted = False
+                async for lines in _aiter_line_batches(response.aiter_bytes()):
+                    pending.extend(lines)
+                    # Wait for the header and type lines, then for a full batch
+                    if len(pending) < (batch_size if emitted else 2):
+                        continue
+                    values, row_count = decoder.decode_lines(pending)
+                    pending = []
+                    emitted = True
+                    yield decoder.columns, values, row_count
+                if pending or not emitted:
+                    values, row_count = decoder.decode_lines(pending)
+                    if decoder.columns is not None:
+                        yield decoder.columns, values, row_count
+
+        except httpx.HTTPStatusError as e:
+            raise RuntimeError(f"Query failed: {e.response.text}")
+        except httpx.HTTPError as e:
+            raise RuntimeError(f"Query execution error: {e}")
+
+    async def _cloud_cursor(self, disable_cache: bool = False, label: Optional[str] = None):
+        """A new Cloud cursor with the session settings a query needs."""
+        connection = await self._get_cloud_connection()
+        cursor = connection.cursor()
+
+        # Optionally disable cache
+        if disable_cache:
+            await cursor.execute("SET enable_result_cache = FALSE")
+        if label:
+            await cursor.execute(f"SET query_label = '{label}'")
+        return cursor
+
+    async def _stream_cloud(
+        self,
+        sql: str,
+        disable_cache: bool = False,
+        batch_size: int = DEFAULT_STREAM_BATCH_ROWS,
+        label: Optional[str] = None,
+        cursor=None
+    ) -> AsyncIterator[tuple[list[str], list[Sequence], int]]:
+        """
+        Stream (columns, column batch, row count) from Firebolt Cloud via cursor.fetchmany.
+
+        `cursor`, if given, comes from _cloud_cursor with the settings applied.
+        """
+        if cursor is None:
+            cursor = await self._cloud_cursor(disable_cache, label)
+
+        try:
+            await cursor.execute(sql)
+            columns = [desc[0] for desc in cursor.description] if cursor.description else []
+            if not columns:
+                return
+            yield columns, [[] for _ in columns], 0
+            while True:
+                rows = await cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield columns, [list(values) for values in zip(*rows)], len(rows)
+        finally:
+            cursor.close()
+
+    async def execute_script(
+        self,
+        sql: str,
+        disable_cache: bool = False,
+        verbose: bool = False
+    ) -> list[QueryResult]:
+        """
+        Execute a multi-statement script one statement per request, in order.
+
+        See FireboltRunner.execute_script; SET statements are carried into
+        every following request.
+        """
+        statements = split_statements(sql)
+        settings: list[str] = []
+        results = []
+        for i, statement in enumerate(statements, 1):
+            if statement_kind(statement) == "set":
+                settings.append(statement)
+                continue
+            try:
+                result = await self.execute(";\n".join(settings + [statement]), disable_cache=disable_cache)
+            except RuntimeError as e:
+                raise RuntimeError(
+                    f"Statement {i}/{len(statements)} failed ({statement_summary(statement)}): {e}"
+                ) from e
+            result.sql = statement
+            results.append(result)
+            if verbose:
+                print(f"  [{i}/{len(statements)}] {result.execution_time_ms:>9,.1f} ms  "
+                      f"{statement_summary(statement)}")
+        return results
+
+    async def execute_file(
+        self,
+        filepath: str | Path,
+        disable_cache: bool = False,
+        verbose: bool = False
+    ) -> QueryResult:
+        """Execute SQL from a file, statement by statement; returns the last result."""
+        path = Path(filepath)
+        if not path.exists():
+            raise FileNotFoundError(f"SQL file not found: {filepath}")
+
+        results = await self.execute_script(path.read_text(), disable_cache=disable_cache, verbose=verbose)
+        if not results:
+            return QueryResult(column_data={}, row_count=0, columns=[], execution_time_ms=0.0)
+        return results[-1]
+
+    async def fetch_query_metrics(
+        self,
+        results: list[QueryResult],
+        timeout_s: float = 10.0,
+        poll_interval_s: float = 0.5
+    ) -> int:
+        """
+        Attach server-side metrics from engine query history to results.
+
+        See FireboltRunner.fetch_query_metrics.
+        """
+        if self._metrics_unavailable:
+            return 0
+
+        results = [r for r in results if r is not None]
+        deadline = time.perf_counter() + timeout_s
+        updated = 0
+        while True:
+            for batch in query_metrics.batches(query_metrics.pending(results)):
+                try:
+                    history = await self.execute(query_metrics.history_sql(r.query_label for r in batch))
+                except RuntimeError as e:
+                    # Engine without query history access; don't retry every call
+                    print(f"  Query history unavailable, skipping server metrics: {e}")
+                    self._metrics_unavailable = True
+                    return updated
+                updated += query_metrics.apply_history(batch, history.data)
+
+            if not query_metrics.pending(results) or time.perf_counter() >= deadline:
+                return updated
+            await asyncio.sleep(poll_interval_s)
+
+    async def benchmark(
+        self,
+        sql: str,
+        iterations: int = 3,
+        warmup: int = 1,
+        max_iterations: int = 30,
+        target_ci_pct: float = 5.0,
+        time_budget_s: Optional[float] = 60.0,
+        collect_metrics: bool = True
+    ) -> QueryResult:
+        """
+        Benchmark a query, keeping every sample.
+
+        Timed runs are sequential so they do not compete with each other.
+        See FireboltRunner.benchmark.
+        """
+        sampler = AdaptiveSampler(
+            min_iterations=iterations,
+            max_iterations=max_iterations,
+            min_warmup=warmup,
+            target_ci_pct=target_ci_pct,
+            time_budget_s=time_budget_s
+        )
+        last_result = None
+
+        while sampler.needs_warmup():
+            last_result = await self.execute(sql, disable_cache=True)
+            sampler.warmup_samples.append(last_result.execution_time_ms)
+        while sampler.needs_sample():
+            last_result = await self.execute(sql, disable_cache=True)
+            sampler.samples.append(last_result.execution_time_ms)
+
+        # Return result with the median time and every sample attached
+        last_result.samples = sampler.samples
+        last_result.warmup_samples = sampler.warmup_samples
+        last_result.execution_time_ms = last_result.timing.median
+
+        if collect_metrics and self.label_queries:
+            await self.fetch_query_metrics([last_result])
+
+        return last_result
+
+    async def run_benchmark_comparison(
+        self,
+        name: str,
+        baseline_sql: str,
+        optimized_sql: str,
+        setup_sql: Optional[str] = None,
+        teardown_sql: Optional[str] = None,
+        iterations: int = 3
+    ) -> BenchmarkResult:
+        """Run a full benchmark comparison. See FireboltRunner.run_benchmark_comparison."""
+        print(f"Running benchmark: {name}")
+
+        print("  Running baseline query...")
+        baseline_result = await self.benchmark(baseline_sql, iterations=iterations, collect_metrics=False)
+
+        if setup_sql:
+            print("  Running setup (e.g., creating index)...")
+            await self.execute(setup_sql)
+
+        print("  Running optimized query...")
+        optimized_result = await self.benchmark(optimized_sql, iterations=iterations, collect_metrics=False)
+
+        if teardown_sql:
+            print("  Running teardown...")
+            await self.execute(teardown_sql)
+
+        # One history lookup for both sides
+        if self.label_queries:
+            await self.fetch_query_metrics([baseline_result, optimized_result])
+
+        result = BenchmarkResult(
+            name=name,
+            baseline=baseline_result,
+            optimized=optimized_result
+        )
+
+        result.print_comparison()
+        return result
+
+    async def close(self):
+        """Close connections."""
+        if self._core_client:
+            await self._core_client.aclose()
+        if self._connection:
+            await self._connection.aclose()
@@ -0,0 +1,227 @@
+"""
+Hedged Requests
+
+Opt-in tail-latency reduction for read-only queries. A query runs as
+usual; if it has not answered within a percentile (p95 by default) of the
+recent latencies of the same query shape (the statement with its literals
+blanked out, so lookups of different keys share a history), a duplicate is
+sent on another pooled connection (Core) or cursor (Cloud). The first
+answer wins.
+
+The losing attempt is not torn down at once. When queries are labelled,
+it is cancelled on the server by its label, in the background. Its thread
+stops reading, and closes its response or cursor, only when the next
+batch (or the end of the result) arrives; until then the loser keeps its
+connection or cursor busy. Without labels nothing stops the engine from
+finishing the losing query.
+
+Hedges are rationed by a token bucket: every query earns `budget_pct`
+percent of a hedge, up to `burst` saved hedges. When everything is slow --
+an incident, an overloaded engine -- the bucket runs dry and hedging stops,
+so extra load is bounded by `budget_pct` percent of traffic.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+from .sql import READ_ONLY_KINDS, query_shape, significant_tokens, statement_kind
+from .stats import percentile
+
+if TYPE_CHECKING:
+    from .firebolt import FireboltRunner, QueryResult
+
+
+# Latencies kept per query shape for the hedge delay
+LATENCY_WINDOW = 200
+
+# Samples needed before a query shape is hedged
+MIN_SAMPLES = 20
+
+
+@dataclass
+class HedgeStats:
+    queries: int = 0
+    hedged: int = 0
+    hedge_wins: int = 0
+    # Queries that would have been hedged but the budget was used up
+    budget_denied: int = 0
+    # Estimated from the recent latencies that exceeded the winning time
+    saved_ms: float = 0.0
+
+    @property
+    def hedge_rate(self) -> float:
+        return self.hedged / self.queries if self.queries else 0.0
+
+    @property
+    def win_rate(self) -> float:
+        return self.hedge_wins / self.hedged if self.hedged else 0.0
+
+
+def is_hedgeable(sql: str) -> bool:
+    """True for single read-only statements."""
+    if statement_kind(sql) not in READ_ONLY_KINDS:
+        return False
+    return not any(t.text == ";" for t in significant_tokens(sql)[:-1])
+
+
+class Hedger:
+    """
+    Runs read-only queries with a hedge after a latency percentile.
+
+    Returns as soon as either attempt answers; the loser is cancelled on
+    the server by label and dropped at its next batch (see module notes).
+    Thread-safe; one Hedger can be shared by runners used from several
+    threads.
+    """
+
+    def __init__(
+        self,
+        hedge_percentile: float = 95.0,
+        min_delay_ms: float = 5.0,
+        budget_pct: float = 5.0,
+        burst: float = 10.0
+    ):
+        """
+        Args:
+            hedge_percentile: Send the hedge once the query is slower than
+                this percentile of its recent latencies
+            min_delay_ms: Never hedge sooner than this
+            budget_pct: Hedges allowed as a percentage of queries
+            burst: Most hedges that can be saved up while traffic is calm
+        """
+        self.hedge_percentile = hedge_percentile
+        self.min_delay_ms = min_delay_ms
+        self.budget_pct = budget_pct
+        self.burst = burst
+        self.stats = HedgeStats()
+        self._tokens = burst
+        self._latencies: dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def hedge_delay_ms(self, key: str) -> Optional[float]:
+        """Delay before hedging a query shape, or None while too few samples exist."""
+        with self._lock:
+            window = self._latencies.get(key)
+            if window is None or len(window) < MIN_SAMPLES:
+                return None
+            samples = list(window)
+        return max(self.min_delay_ms, percentile(samples, self.hedge_percentile))
+
+    def _earn(self):
+        with self._lock:
+            self.stats.queries += 1
+            self._tokens = min(self.burst, self._tokens + self.budget_pct / 100)
+
+    def _spend(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                self.stats.budget_denied += 1
+                return False
+            self._tokens -= 1
+            self.stats.hedged += 1
+            return True
+
+    def _record(self, key: str, latency_ms: float, hedge_won: bool):
+        with self._lock:
+            window = self._latencies.setdefault(key, deque(maxlen=LATENCY_WINDOW))
+            if hedge_won:
+                self.stats.hedge_wins += 1
+                # The primary would have taken at least latency_ms; estimate
+                # how much longer from the slower recent samples
+                slower = [s for s in window if s > latency_ms]
+                if slower:
+                    self.stats.saved_ms += sum(slower) / len(slower) - latency_ms
+            window.append(latency_ms)
+
+    def execute(
+        self,
+        runner: "FireboltRunner",
+        sql: str,
+        disable_cache: bool = False,
+        label: Optional[str] = None
+    ) -> "QueryResult":
+        """Run a statement through `runner`, hedging it if it is slow."""
+        from . import query_metrics
+
+        key = query_shape(sql)
+        delay_ms = self.hedge_delay_ms(key)
+        self._earn()
+
+        start = time.perf_counter()
+        outcomes: queue.Queue = queue.Queue()
+        cancels = [threading.Event()]
+        labels = [label]
+        self._launch(runner, sql, disable_cache, label, cancels[0], outcomes, 0)
+
+        errors: list[BaseException] = []
+        timeout = delay_ms / 1000 if delay_ms is not None else None
+        while True:
+            try:
+                attempt, result, error = outcomes.get(timeout=timeout)
+            except queue.Empty:
+                # The primary is slower than usual: hedge if the budget allows
+                timeout = None
+                if self._spend():
+                    hedge_label = query_metrics.new_query_label() if label else None
+                    cancels.append(threading.Event())
+                    labels.append(hedge_label)
+                    self._launch(runner, sql, disable_cache, hedge_label, cancels[1], outcomes, 1)
+                continue
+            if error is not None:
+                errors.append(error)
+                if len(errors) < len(cancels):
+                    continue  # The other attempt may still succeed
+                raise errors[0]
+            break
+
+        for i, cancel in enumerate(cancels):
+            if i != attempt:
+                cancel.set()
+                if labels[i]:
+                    # The loser's thread only notices `cancel` at its next
+                    # batch; stop the engine working on it meanwhile
+                    threading.Thread(
+                        target=runner.cancel_query,
+                        args=(labels[i],),
+                        kwargs={"verbose": False},
+                        daemon=True
+                    ).start()
+        latency_ms = (time.perf_counter() - start) * 1000
+        self._record(key, latency_ms, hedge_won=attempt == 1)
+        result.execution_time_ms = latency_ms
+        result.query_label = labels[attempt]
+        return result
+
+    @staticmethod
+    def _launch(runner, sql, disable_cache, label, cancel, outcomes, attempt):
+        # Daemon threads: a loser stuck waiting on the server never blocks
+        # the caller or interpreter exit
+        threading.Thread(
+            target=_run_attempt,
+            args=(runner, sql, disable_cache, label, cancel, outcomes, attempt),
+            name=f"hedge-{attempt}",
+            daemon=True
+        ).start()
+
+
+def _run_attempt(runner, sql, disable_cache, label, cancel, outcomes, attempt):
+    """Run one attempt on its own stream, stopping at the next batch once cancelled."""
+    try:
+        result = runner._collect(sql, disable_cache, label=label, cancel=cancel)
+        if result is not None:
+            outcomes.put((attempt, result, None))
+    except Exception as e:
+        outcomes.put((attempt, None, e))
+
+
+def print_hedge_stats(stats: HedgeStats):
+    """One-line summary of hedging activity."""
+    print(f"Hedging: {stats.hedged}/{stats.queries} queries hedged ({stats.hedge_rate:.1%}), "
+          f"hedge won {stats.hedge_wins} ({stats.win_rate:.0%}), "
+          f"{stats.budget_denied} denied by budget, ~{stats.saved_ms:,.0f} ms saved")
@@ -0,0 +1,480 @@
+"""
+Pipelined Sample-Data Ingest
+
+The sample-data generators used to alternate between building an INSERT
+and waiting on it, so the CPU sat idle while the engine ingested and the
+engine sat idle while the next batch was formatted. run_pipeline overlaps
+the two:
+
+  worker processes --> bounded queue --> N uploader threads --> engine
+     (generate +        (backpressure)      (runner.execute)
+      serialize)
+
+Batches are built in a process pool (formatting SQL is CPU-bound Python,
+so threads would serialize on the GIL) and handed to uploader threads
+through a queue of at most `queue_depth` batches. When uploads fall
+behind, the queue fills and generation pauses; when generation falls
+behind, uploaders wait. Either way at most about
+`workers + queue_depth + uploaders` batches exist at once, so memory stays
+flat however many rows are loaded.
+
+A batch builder is a module-level function taking one picklable task and
+returning (sql, row_count); it runs in another process, so it must not
+touch the runner or rely on module state such as the global `random`.
+Builders that stage a file for the statement to load (see
+lib/file_ingest.py) return (sql, row_count, path) instead: the file's size
+is counted as the batch's bytes, and the file is deleted once the
+statement succeeds.
+
+Batch size can be tuned while loading. With a BatchSizer, tasks are taken
+from a feed (lib.scale.ChunkFeed) at the size the sizer currently asks
+for, and the sizer adjusts that size AIMD-style from the rows/s each
+INSERT achieves:
+
+  - after every few batches at one size, if rows/s per request held up,
+    the size grows by a fixed step (additive increase);
+  - if rows/s dropped, the size is cut by half (multiplicative decrease);
+  - an INSERT rejected for engine memory or request size halves the size
+    and caps it below the failed size, and its rows are retried in smaller
+    batches. Timeouts and dropped connections abort instead: the INSERT
+    may have committed, and retrying it would insert its rows twice;
+  - the size never exceeds the row limit, or the byte limit at the bytes
+    per row seen so far.
+
+The sizes tried and the throughput at each are printed with the pipeline
+stats, so a good size can be pinned for repeatable runs.
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Optional
+
+
+# Processes building batches (leave a core for the uploaders and engine)
+DEFAULT_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+
+# Concurrent INSERTs per table
+DEFAULT_UPLOADERS = 4
+
+# Built batches waiting for an uploader
+DEFAULT_QUEUE_DEPTH = 8
+
+# Limits for adaptive batch sizes: rows, and bytes of SQL (or staged file)
+DEFAULT_MAX_BATCH_ROWS = 200_000
+DEFAULT_MAX_BATCH_BYTES = 16 * 1024 * 1024
+
+# Batches measured at one size before the size is adjusted
+DEFAULT_SIZING_WINDOW = 3
+
+# Errors meaning the INSERT was rejected for its size, so nothing was
+# committed and it can be retried smaller (engine memory, request size).
+# Timeouts and disconnects are left out: the statement may have committed.
+_BACKOFF_ERRORS = re.compile(r"memory|too large|payload|entity|\b413\b", re.IGNORECASE)
+
+
+@dataclass
+class StageStats:
+    """Work done by one pipeline stage."""
+    concurrency: int
+    batches: int = 0
+    rows: int = 0
+    bytes: int = 0
+    # Time spent working, summed over the stage's workers
+    busy_s: float = 0.0
+    # Time spent blocked on the other stage, summed over the stage's workers
+    wait_s: float = 0.0
+
+
+@dataclass
+class PipelineStats:
+    """Throughput of a generate-and-upload run, per stage."""
+    name: str
+    generate: StageStats
+    upload: StageStats
+    wall_s: float = 0.0
+    sizer: Optional[BatchSizer] = None
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def utilization(self, stage: StageStats) -> float:
+        """Fraction of the stage's capacity that was busy."""
+        capacity = self.wall_s * stage.concurrency
+        return stage.busy_s / capacity if capacity else 0.0
+
+    @property
+    def bottleneck(self) -> str:
+        return "upload" if self.utilization(self.upload) >= self.utilization(self.generate) else "generate"
+
+
+@dataclass
+class SizingStep:
+    """Throughput measured at one batch size, and what the sizer did next."""
+    rows: int
+    batches: int
+    rows_per_s: float
+    bytes_per_row: float
+    action: str
+
+
+class BatchSizer:
+    """
+    AIMD controller for rows per batch, fed with the latency of each INSERT.
+
+    Thread-safe: uploaders report batches concurrently. Observations are
+    tagged with the epoch the batch was sized in, so batches built before a
+    size change do not count towards the new size's window.
+    """
+
+    def __init__(
+        self,
+        initial_rows: int,
+        min_rows: int = 1,
+        max_rows: int = DEFAULT_MAX_BATCH_ROWS,
+        max_bytes: int = DEFAULT_MAX_BATCH_BYTES,
+        step_rows: Optional[int] = None,
+        window: int = DEFAULT_SIZING_WINDOW,
+        decrease: float = 0.5,
+        tolerance: float = 0.05,
+        pinned: bool = False
+    ):
+        self.min_rows = max(1, min_rows)
+        self.max_rows = max(self.min_rows, max_rows)
+        self.max_bytes = max_bytes
+        self.step_rows = step_rows or initial_rows
+        self.window = max(1, window)
+        self.decrease = decrease
+        self.tolerance = tolerance
+        self.pinned = pinned
+        self.initial_rows = initial_rows
+        self.epoch = 0
+        self.curve: list[SizingStep] = []
+        self._rows = initial_rows if pinned else min(max(initial_rows, self.min_rows), self.max_rows)
+        self._bytes_per_row = 0.0
+        self._last_rate: Optional[float] = None
+        self._window_batches = 0
+        self._window_rows = 0
+        self._window_bytes = 0
+        self._window_s = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def rows(self) -> int:
+        """Rows to put in the next batch."""
+        return self._rows
+
+    @property
+    def best(self) -> Optional[SizingStep]:
+        """The size with the highest rows/s per request so far."""
+        return max(self.curve, key=lambda step: step.rows_per_s, default=None)
+
+    def observe(self, epoch: int, rows: int, size: int, seconds: float):
+        """Record one successful batch; adjusts the size at the end of a window."""
+        with self._lock:
+            if rows <= 0 or seconds <= 0:
+                return
+            per_row = size / rows
+            self._bytes_per_row = per_row if not self._bytes_per_row else 0.8 * self._bytes_per_row + 0.2 * per_row
+            if epoch != self.epoch:
+                return
+            self._window_batches += 1
+            self._window_rows += rows
+            self._window_bytes += size
+            self._window_s += seconds
+            if self._window_batches < self.window:
+                return
+
+            rate = self._window_rows / self._window_s
+            if self.pinned:
+                target, action = self._rows, "pinned"
+            elif self._last_rate is None or rate >= self._last_rate * (1 - self.tolerance):
+                target, action = self._rows + self.step_rows, "increase"
+            else:
+                target, action = int(self._rows * self.decrease), "decrease"
+            self._last_rate = rate
+            self._step(target, action, rate, self._window_bytes / self._window_rows)
+
+    def backoff(self, error: BaseException, rows: int) -> bool:
+        """
+        Shrink batches after `error` on a batch of `rows` rows.
+
+        Returns False when the error is not size-related or the batch cannot
+        get smaller, so the caller should give up instead of retrying.
+        """
+        with self._lock:
+            if self.pinned or rows <= self.min_rows or not _BACKOFF_ERRORS.search(str(error)):
+                return False
+            # Never grow back to the size that failed: cap growth halfway
+            # between it and the backed-off size
+            self.max_rows = max(self.min_rows, min(self.max_rows, int(rows * (1 + self.decrease) / 2)))
+            target = int(rows * self.decrease)
+            if target < self._rows:
+                # Batches built at the old size may fail after this one; they
+                # shrink the size only if it is still above half theirs
+                self._last_rate = None
+                self._step(target, f"backoff ({str(error).splitlines()[0][:60]})", 0.0, self._bytes_per_row)
+            return True
+
+    def _step(self, target: int, action: str, rate: float, bytes_per_row: float):
+        """Record the finished window and move to the next size (lock held)."""
+        self.curve.append(SizingStep(self._rows, self._window_batches, rate, bytes_per_row, action))
+        if not self.pinned:
+            limit = self.max_rows
+            if self._bytes_per_row:
+                limit = min(limit, int(self.max_bytes / self._bytes_per_row))
+            if target > limit:
+                self.curve[-1].action = "hold (limit)" if limit <= self._rows else f"{action} (limit)"
+                target = limit
+            self._rows = max(self.min_rows, target)
+        self.epoch += 1
+        self._window_batches = self._window_rows = self._window_bytes = 0
+        self._window_s = 0.0
+
+
+def _build_timed(build: Callable[[Any], tuple], task: Any) -> tuple[str, int, int, Optional[str], float]:
+    """Run a batch builder, returning (sql, rows, bytes, staged file, seconds); executes in a worker."""
+    start = time.perf_counter()
+    sql, rows, *staged = build(task)
+    path = staged[0] if staged else None
+    size = os.path.getsize(path) if path else len(sql.encode())
+    return sql, rows, size, path, time.perf_counter() - start
+
+
+def run_pipeline(
+    runner,
+    build: Callable[[Any], tuple],
+    tasks: Iterable[Any],
+    name: str = "",
+    workers: int = DEFAULT_WORKERS,
+    uploaders: int = DEFAULT_UPLOADERS,
+    queue_depth: int = DEFAULT_QUEUE_DEPTH,
+    executor: Optional[Executor] = None,
+    progress_rows: int = 0,
+    sizer: Optional[BatchSizer] = None
+) -> PipelineStats:
+    """
+    Build batches in worker processes and execute them on concurrent uploaders.
+
+    Args:
+        runner: Runner the INSERTs are executed with (shared by the uploaders)
+        build: Module-level function task -> (sql, row_count[, staged file])
+        tasks: One picklable task per batch; with `sizer`, a feed with
+            take(rows) -> task or None and put_back(task) (lib.scale.ChunkFeed)
+        name: Label for progress and stats output (usually the table)
+        workers: Processes building batches; 0 builds in this thread
+        uploaders: INSERTs in flight at once
+        queue_depth: Built batches that may wait for an uploader
+        executor: Existing pool to build in (e.g. one shared by several tables);
+            `workers` then only limits how many of its slots this run uses
+        progress_rows: Print a line every this many rows uploaded (0: never)
+        sizer: Adapts the rows taken per task from the feed to the observed
+            throughput, and retries size-related failures in smaller batches
+
+    Raises:
+        RuntimeError: An INSERT failed; nothing further is built or sent
+    """
+    uploaders = max(1, uploaders)
+    stats = PipelineStats(
+        name=name,
+        generate=StageStats(concurrency=max(1, workers)),
+        upload=StageStats(concurrency=uploaders),
+        sizer=sizer
+    )
+    batches: queue.Queue = queue.Queue(maxsize=max(1, queue_depth))
+    failed = threading.Event()
+    errors: list[BaseException] = []
+    # Batches enqueued but not yet finished; with a sizer, a failed batch
+    # can put its task back, so the feed is not done until none are left
+    in_flight = [0]
+    settled = threading.Condition(stats._lock)
+
+    def finish():
+        with settled:
+            in_flight[0] -= 1
+            settled.notify_all()
+
+    def upload():
+        while True:
+            waited = time.perf_counter()
+            item = batches.get()
+            started = time.perf_counter()
+            if item is None:
+                return
+            with stats._lock:
+                stats.upload.wait_s += started - waited
+            if failed.is_set():
+                finish()
+                continue  # Drain the queue so generation never blocks
+            sql, rows, size, path, task, epoch = item
+            try:
+                runner.execute(sql)
+            except Exception as e:
+                if sizer is not None and sizer.backoff(e, rows):
+                    print(f"  {name}: {rows:,}-row batch failed, retrying at {sizer.rows:,} rows")
+                    if path:
+                        os.remove(path)
+                    tasks.put_back(task)
+                else:
+                    # A staged file is kept for inspection
+                    errors.append(e)
+                    failed.set()
+                finish()
+                continue
+            if path:
+                os.remove(path)
+            done = time.perf_counter()
+            if sizer is not None:
+                sizer.observe(epoch, rows, size, done - started)
+            with stats._lock:
+                before = stats.upload.rows
+                stats.upload.batches += 1
+                stats.upload.rows += rows
+                stats.upload.bytes += size
+                stats.upload.busy_s += done - started
+                after = stats.upload.rows
+            finish()
+            if progress_rows and after // progress_rows > before // progress_rows:
+                print(f"  {after:,} {name} rows inserted")
+
+    def enqueue(task: Any, epoch: int, built: tuple):
+        sql, rows, size, path, build_s = built
+        stats.generate.batches += 1
+        stats.generate.rows += rows
+        stats.generate.bytes += size
+        stats.generate.busy_s += build_s
+        # Blocks while the queue is full: the backpressure on generation
+        waited = time.perf_counter()
+        while not failed.is_set():
+            try:
+                with settled:
+                    in_flight[0] += 1
+                batches.put((sql, rows, size, path, task, epoch), timeout=0.1)
+                break
+            except queue.Full:
+                finish()
+        stats.generate.wait_s += time.perf_counter() - waited
+
+    if sizer is None:
+        task_iter = iter(tasks)
+        next_task = lambda: next(task_iter, None)
+    else:
+        next_task = lambda: tasks.take(sizer.rows)
+
+    def feed_done() -> bool:
+        """With a sizer, wait for in-flight batches that might put work back."""
+        if sizer is None:
+            return True
+        with settled:
+            while not failed.is_set() and in_flight[0] and not len(tasks):
+                settled.wait(timeout=0.1)
+        return failed.is_set() or not len(tasks)
+
+    start = time.perf_counter()
+    threads = [
+        threading.Thread(target=upload, name=f"upload-{name}-{i}", daemon=True)
+        for i in range(uploaders)
+    ]
+    for t in threads:
+        t.start()
+
+    own_pool = None
+    try:
+        pool = executor
+        if pool is None and workers > 0:
+            pool = own_pool = ProcessPoolExecutor(max_workers=workers)
+        # Keep each worker busy plus one batch in hand; results are taken
+        # in submission order so batches are inserted in task order
+        pending: deque = deque()
+        exhausted = False
+        while not failed.is_set():
+            while not exhausted and len(pending) < max(0, workers) + 1:
+                epoch = sizer.epoch if sizer is not None else 0
+                task = next_task()
+                if task is None:
+                    exhausted = True
+                    break
+                if workers > 0:
+                    future = pool.submit(_build_timed, build, task)
+                else:
+                    future = Future()
+                    future.set_result(_build_timed(build, task))
+                pending.append((task, epoch, future))
+            if not pending:
+                if feed_done():
+                    break
+                exhausted = False
+                continue
+            task, epoch, future = pending.popleft()
+            enqueue(task, epoch, future.result())
+        for _, _, future in pending:
+            future.cancel()
+    finally:
+        for _ in threads:
+            batches.put(None)
+        for t in threads:
+            t.join()
+        if own_pool is not None:
+            own_pool.shutdown(cancel_futures=True)
+        stats.wall_s = time.perf_counter() - start
+
+    if errors:
+        raise RuntimeError(f"Loading {name or 'batches'} failed: {errors[0]}") from errors[0]
+    return stats
+
+
+def parse_batch_rows(text: str) -> dict[str, int]:
+    """
+    Parse a --batch-rows value: "auto" (tune every table), N (pin every
+    table at N rows) or table=N,... (pin those tables, tune the rest).
+    """
+    pins: dict[str, int] = {}
+    if text.strip().lower() in ("", "auto"):
+        return pins
+    for part in text.split(","):
+        table, _, rows = part.strip().rpartition("=")
+        try:
+            pins[table or "*"] = int(rows)
+        except ValueError:
+            raise ValueError(f"Bad --batch-rows entry {part!r}; expected auto, N or table=N") from None
+        if pins[table or "*"] <= 0:
+            raise ValueError(f"Batch rows must be positive, got {part!r}")
+    return pins
+
+
+def pinned_batch_rows(pins: dict[str, int], table: str) -> Optional[int]:
+    """A table's pinned batch size from parse_batch_rows, or None to tune it."""
+    return pins.get(table, pins.get("*"))
+
+
+def print_pipeline_stats(stats: PipelineStats):
+    """Rows/s and MB/s per stage, with how busy each stage was."""
+    wall = stats.wall_s or 1e-9
+    print(f"{stats.name or 'pipeline'}: {stats.upload.rows:,} rows in {stats.wall_s:.1f}s "
+          f"(bottleneck: {stats.bottleneck})")
+    for label, stage in (("generate", stats.generate), ("upload", stats.upload)):
+        print(f"  {label:<9} x{stage.concurrency:<3} {stage.rows / wall:>12,.0f} rows/s "
+              f"{stage.bytes / 1e6 / wall:>8,.1f} MB/s  busy {stats.utilization(stage):>4.0%}  "
+              f"waiting {stage.wait_s:,.1f}s")
+    if stats.sizer is not None and stats.sizer.curve:
+        print_sizing(stats.sizer, stats.name)
+
+
+def print_sizing(sizer: BatchSizer, name: str = ""):
+    """The batch sizes tried, the throughput at each, and the size to pin."""
+    best = sizer.best
+    if sizer.pinned:
+        print(f"  batch size: pinned at {sizer.rows:,} rows")
+    elif best and best.rows_per_s:
+        print(f"  batch size: {sizer.initial_rows:,} -> {sizer.rows:,} rows; best {best.rows:,} "
+              f"({best.rows_per_s:,.0f} rows/s per request), pin with --batch-rows "
+              f"{f'{name}=' if name else ''}{best.rows}")
+    print(f"  {'rows':>10} {'batches':>8} {'rows/s/req':>11} {'KB/batch':>9}  next")
+    for step in sizer.curve:
+        print(f"  {step.rows:>10,} {step.batches:>8} {step.rows_per_s:>11,.0f} "
+              f"{step.rows * step.bytes_per_row / 1024:>9,.0f}  {step.action}")
@@ -0,0 +1,325 @@
+"""
+Dependency-Aware Load Scheduler
+
+Runs schema and data-loading work as a DAG instead of top to bottom.
+Each node -- a SQL statement from a script, or a Python callable such as
+a sample-data generator -- declares the tables it reads and writes (taken
+from the SQL automatically). A node depends on every earlier node it
+conflicts with:
+
+  - it reads or writes a table an earlier node writes
+  - it writes a table an earlier node reads
+
+Independent nodes run concurrently on a thread pool, so loading is bounded
+by the slowest dependency chain rather than the sum of all statements.
+Statements whose tables cannot be determined act as barriers.
+
+Usage:
+  python -m lib.load_scheduler verticals/adtech/schema/01_tables.sql verticals/adtech/data/load.sql
+  python -m lib.load_scheduler --vertical all --parallelism 8
+  python -m lib.load_scheduler --vertical gaming --dry-run
+  python -m lib.load_scheduler --vertical adtech --scale-factor 0.1
+"""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+from .sql import READ_ONLY_KINDS, SESSION_KINDS, referenced_tables, split_statements, statement_kind, statement_summary
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Default number of nodes running at once
+DEFAULT_PARALLELISM = 4
+
+
+@dataclass
+class LoadNode:
+    """One unit of load work: a SQL statement or a callable taking the runner."""
+    name: str
+    action: Union[str, Callable[[Any], Any]]
+    reads: set[str] = field(default_factory=set)
+    writes: set[str] = field(default_factory=set)
+    barrier: bool = False
+    depends_on: set[int] = field(default_factory=set)
+    # Filled in by run()
+    start_s: Optional[float] = None
+    end_s: Optional[float] = None
+    error: Optional[BaseException] = None
+
+    @property
+    def duration_s(self) -> float:
+        if self.start_s is None or self.end_s is None:
+            return 0.0
+        return self.end_s - self.start_s
+
+
+@dataclass
+class LoadReport:
+    """Timing of a scheduled load."""
+    nodes: list[LoadNode]
+    wall_s: float
+    critical_path: list[LoadNode]
+
+    @property
+    def serial_s(self) -> float:
+        """Time the same work would take run one node at a time."""
+        return sum(n.duration_s for n in self.nodes)
+
+    @property
+    def critical_path_s(self) -> float:
+        return sum(n.duration_s for n in self.critical_path)
+
+
+class LoadPlan:
+    """
+    Nodes in submission order plus the dependencies between them.
+
+    Add work with add_sql / add_script / add_file / add_callable, then
+    call run(runner).
+    """
+
+    def __init__(self):
+        self.nodes: list[LoadNode] = []
+        # SET statements seen so far per script, applied to its later statements
+        self._settings: dict[str, list[str]] = {}
+
+    def _add(self, node: LoadNode) -> LoadNode:
+        index = len(self.nodes)
+        for i, earlier in enumerate(self.nodes):
+            if (
+                node.barrier or earlier.barrier
+                or node.reads & earlier.writes
+                or node.writes & (earlier.writes | earlier.reads)
+            ):
+                node.depends_on.add(i)
+        self.nodes.append(node)
+        return self.nodes[index]
+
+    def add_sql(self, sql: str, name: Optional[str] = None, script: str = "") -> Optional[LoadNode]:
+        """Add one statement; tables are taken from the SQL."""
+        kind = statement_kind(sql)
+        if kind in SESSION_KINDS:
+            self._settings.setdefault(script, []).append(sql)
+            return None
+        reads, writes = referenced_tables(sql)
+        barrier = not reads and not writes and kind not in READ_ONLY_KINDS
+        text = ";\n".join(self._settings.get(script, []) + [sql])
+        return self._add(LoadNode(
+            name=name or statement_summary(sql),
+            action=text,
+            reads=reads,
+            writes=writes,
+            barrier=barrier
+        ))
+
+    def add_script(self, sql: str, source: str = "script") -> list[LoadNode]:
+        """Add every statement of a script as its own node."""
+        nodes = []
+        for i, statement in enumerate(split_statements(sql), 1):
+            node = self.add_sql(statement, f"{source}:{i} {statement_summary(statement, 50)}", script=source)
+            if node is not None:
+                nodes.append(node)
+        return nodes
+
+    def add_file(self, path: str | Path, transform: Optional[Callable[[str], str]] = None) -> list[LoadNode]:
+        """Add a SQL file; `transform` can rewrite the text first (e.g. for Core)."""
+        path = Path(path)
+        text = path.read_text()
+        if transform:
+            text = transform(text)
+        try:
+            source = str(path.resolve().relative_to(REPO_ROOT))
+        except ValueError:
+            source = str(path)
+        return self.add_script(text, source)
+
+    def add_callable(
+        self,
+        name: str,
+        fn: Callable[[Any], Any],
+        reads: tuple[str, ...] | set[str] = (),
+        writes: tuple[str, ...] | set[str] = ()
+    ) -> LoadNode:
+        """Add Python work, e.g. a sample-data generator called as fn(runner)."""
+        return self._add(LoadNode(
+            name=name,
+            action=fn,
+            reads={t.lower() for t in reads},
+            writes={t.lower() for t in writes},
+            barrier=not reads and not writes
+        ))
+
+    def levels(self) -> list[list[LoadNode]]:
+        """Nodes grouped by dependency depth (each level could run at once)."""
+        depth: list[int] = []
+        for node in self.nodes:
+            depth.append(1 + max((depth[d] for d in node.depends_on), default=-1))
+        grouped: dict[int, list[LoadNode]] = {}
+        for node, d in zip(self.nodes, depth):
+            grouped.setdefault(d, []).append(node)
+        return [grouped[d] for d in sorted(grouped)]
+
+    def critical_path(self) -> list[LoadNode]:
+        """Longest chain of dependent nodes by measured duration."""
+        finish: list[float] = []
+        previous: list[Optional[int]] = []
+        for node in self.nodes:
+            best = max(node.depends_on, key=lambda d: finish[d], default=None)
+            finish.append((finish[best] if best is not None else 0.0) + node.duration_s)
+            previous.append(best)
+        if not self.nodes:
+            return []
+        i: Optional[int] = max(range(len(self.nodes)), key=lambda k: finish[k])
+        path = []
+        while i is not None:
+            path.append(self.nodes[i])
+            i = previous[i]
+        return path[::-1]
+
+    def _run_node(self, node: LoadNode, runner, t0: float):
+        node.start_s = time.perf_counter() - t0
+        try:
+            if isinstance(node.action, str):
+                runner.execute(node.action)
+            else:
+                node.action(runner)
+        finally:
+            node.end_s = time.perf_counter() - t0
+
+    def run(self, runner, parallelism: int = DEFAULT_PARALLELISM, verbose: bool = True) -> LoadReport:
+        """
+        Execute the plan with up to `parallelism` nodes at once.
+
+        On the first failure no new nodes are started; running nodes
+        finish, then RuntimeError is raised naming the failed node.
+        """
+        t0 = time.perf_counter()
+        remaining = {i: set(node.depends_on) for i, node in enumerate(self.nodes)}
+        dependents: dict[int, list[int]] = {i: [] for i in range(len(self.nodes))}
+        for i, node in enumerate(self.nodes):
+            for d in node.depends_on:
+                dependents[d].append(i)
+
+        running: dict[Future, int] = {}
+        failed: Optional[LoadNode] = None
+        done_count = 0
+
+        with ThreadPoolExecutor(max_workers=max(1, parallelism), thread_name_prefix="load") as pool:
+            def submit_ready():
+                for i in [i for i, deps in remaining.items() if not deps]:
+                    del remaining[i]
+                    running[pool.submit(self._run_node, self.nodes[i], runner, t0)] = i
+
+            submit_ready()
+            while running:
+                finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    i = running.pop(future)
+                    node = self.nodes[i]
+                    error = future.exception()
+                    done_count += 1
+                    if error is not None:
+                        node.error = error
+                        failed = failed or node
+                        if verbose:
+                            print(f"  FAILED {node.name}: {error}")
+                        continue
+                    if verbose:
+                        print(f"  [{done_count}/{len(self.nodes)}] {node.duration_s * 1000:>9,.0f} ms  {node.name}")
+                    for j in dependents[i]:
+                        if j in remaining:
+                            remaining[j].discard(i)
+                if failed is None:
+                    submit_ready()
+
+        if failed is not None:
+            raise RuntimeError(f"Load step failed ({failed.name}): {failed.error}") from failed.error
+
+        return LoadReport(
+            nodes=self.nodes,
+            wall_s=time.perf_counter() - t0,
+            critical_path=self.critical_path()
+        )
+
+
+def print_load_report(report: LoadReport):
+    """Print wall time against serial time and the critical path."""
+    speedup = report.serial_s / report.wall_s if report.wall_s else 0.0
+    print(f"\nLoaded {len(report.nodes)} steps in {report.wall_s:.1f}s "
+          f"(serial would be {report.serial_s:.1f}s, {speedup:.1f}X)")
+    print(f"Critical path: {report.critical_path_s:.1f}s over {len(report.critical_path)} steps")
+    for node in report.critical_path:
+        print(f"  {node.duration_s:>8.1f}s  {node.name}")
+
+
+def vertical_files(vertical: str) -> list[Path]:
+    """Schema files followed by data/load.sql for one vertical."""
+    root = REPO_ROOT / "verticals" / vertical
+    files = sorted((root / "schema").glob("*.sql"))
+    load = root / "data" / "load.sql"
+    if load.exists():
+        files.append(load)
+    return files
+
+
+# CLI support
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    from .firebolt import FireboltRunner
+    from .scale import add_scale_arguments, scale_script
+
+    parser = argparse.ArgumentParser(description="Load SQL scripts as a parallel dependency graph")
+    parser.add_argument("files", nargs="*", help="SQL files, in the order they would run serially")
+    parser.add_argument("--vertical", action="append", default=[],
+                        help="Load a vertical's schema and data (repeatable, or 'all')")
+    parser.add_argument("--parallelism", type=int, default=DEFAULT_PARALLELISM,
+                        help=f"Steps running at once (default: {DEFAULT_PARALLELISM})")
+    parser.add_argument("--dry-run", action="store_true", help="Print the plan without executing")
+    parser.add_argument("--core-compat", action="store_true",
+                        help="Rewrite CREATE DIMENSION/FACT TABLE to CREATE TABLE for Firebolt Core")
+    add_scale_arguments(parser)
+    args = parser.parse_args()
+
+    verticals = args.vertical
+    if "all" in verticals:
+        verticals = sorted(p.name for p in (REPO_ROOT / "verticals").iterdir() if (p / "schema").is_dir())
+    files = [Path(f) for f in args.files] + [f for v in verticals for f in vertical_files(v)]
+    if not files:
+        parser.error("give SQL files or --vertical")
+
+    def prepare(text: str) -> str:
+        text = scale_script(text, args.scale_factor)
+        if args.core_compat:
+            text = text.replace("CREATE DIMENSION TABLE", "CREATE TABLE").replace("CREATE FACT TABLE", "CREATE TABLE")
+        return text
+
+    plan = LoadPlan()
+    for f in files:
+        plan.add_file(f, transform=prepare)
+
+    levels = plan.levels()
+    print(f"{len(plan.nodes)} steps from {len(files)} file(s); longest chain {len(levels)} steps")
+    if args.dry_run:
+        for depth, level in enumerate(levels, 1):
+            print(f"\nLevel {depth} ({len(level)} steps):")
+            for node in level:
+                print(f"  {node.name}")
+        sys.exit(0)
+
+    runner = FireboltRunner()
+    try:
+        report = plan.run(runner, parallelism=args.parallelism)
+    except RuntimeError as e:
+        print(f"\n{e}")
+        sys.exit(1)
+    finally:
+        runner.close()
+    print_load_report(report)
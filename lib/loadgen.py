@@ -0,0 +1,234 @@
+"""
+Open-Loop Load Generator
+
+Fires queries at a target arrival rate on a Poisson schedule, independent of
+how fast earlier queries complete. Latency is measured from each query's
+*intended* start time, so when the engine (or this client) falls behind,
+the time a request spent waiting to be sent is counted. This corrects for
+coordinated omission: a closed-loop client that waits for each response
+silently skips the requests it would have sent during a stall.
+
+Latencies are recorded in a log-linear histogram (HdrHistogram-style) so
+p99/p99.9 stay accurate without keeping every sample. Failed requests
+(errors, timeouts) are recorded too, at the time they failed: under
+overload they are the slow tail, and leaving them out would flatter the
+curve exactly where it bends. The error rate is reported per step.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from tabulate import tabulate
+
+
+class LatencyHistogram:
+    """
+    Log-linear latency histogram in microseconds.
+
+    Values are bucketed with `precision` sub-buckets per power of two, which
+    bounds the relative error of any reported percentile to about
+    1/precision.
+    """
+
+    def __init__(self, precision: int = 128):
+        self.precision = precision
+        self.counts: dict[int, int] = {}
+        self.count = 0
+        self.total_us = 0
+        self.min_us: Optional[int] = None
+        self.max_us = 0
+
+    def _bucket(self, value_us: int) -> int:
+        if value_us < self.precision:
+            return value_us
+        exponent = value_us.bit_length() - self.precision.bit_length()
+        return (exponent + 1) * self.precision + (value_us >> exponent) - self.precision
+
+    def _bucket_value(self, bucket: int) -> int:
+        if bucket < self.precision:
+            return bucket
+        exponent = bucket // self.precision - 1
+        mantissa = bucket % self.precision + self.precision
+        # Report the midpoint of the bucket's range
+        return (mantissa << exponent) + ((1 << exponent) >> 1)
+
+    def record(self, value_us: int):
+        """Record one latency value in microseconds."""
+        value_us = max(0, int(value_us))
+        bucket = self._bucket(value_us)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total_us += value_us
+        self.min_us = value_us if self.min_us is None else min(self.min_us, value_us)
+        self.max_us = max(self.max_us, value_us)
+
+    def merge(self, other: "LatencyHistogram"):
+        """Add all values recorded in another histogram."""
+        for bucket, n in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + n
+        self.count += other.count
+        self.total_us += other.total_us
+        if other.min_us is not None:
+            self.min_us = other.min_us if self.min_us is None else min(self.min_us, other.min_us)
+        self.max_us = max(self.max_us, other.max_us)
+
+    def percentile(self, pct: float) -> float:
+        """Return the latency (ms) at the given percentile (0-100)."""
+        if not self.count:
+            return 0.0
+        target = max(1, math.ceil(self.count * pct / 100))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= target:
+                return min(self._bucket_value(bucket), self.max_us) / 1000
+        return self.max_us / 1000
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_us / self.count / 1000 if self.count else 0.0
+
+
+@dataclass
+class LoadStepResult:
+    """Outcome of running one target arrival rate."""
+    target_qps: float
+    duration_s: float
+    sent: int = 0
+    completed: int = 0
+    errors: int = 0
+    # All requests, failed ones included, from the intended send time
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    service_time: LatencyHistogram = field(default_factory=LatencyHistogram)
+    max_send_lag_ms: float = 0.0
+
+    @property
+    def achieved_qps(self) -> float:
+        """Successful completions per second over the step."""
+        return self.completed / self.duration_s if self.duration_s else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        """Share of finished requests that failed."""
+        finished = self.completed + self.errors
+        return self.errors / finished if finished else 0.0
+
+    def summary_row(self) -> list:
+        return [
+            f"{self.target_qps:g}",
+            f"{self.achieved_qps:.1f}",
+            f"{self.error_rate:.1%}",
+            self.completed,
+            self.errors,
+            f"{self.latency.percentile(50):.1f}",
+            f"{self.latency.percentile(95):.1f}",
+            f"{self.latency.percentile(99):.1f}",
+            f"{self.latency.percentile(99.9):.1f}",
+            f"{self.service_time.percentile(99):.1f}",
+            f"{self.max_send_lag_ms:.0f}",
+        ]
+
+
+class OpenLoopLoadGenerator:
+    """
+    Drive an AsyncFireboltRunner at fixed arrival rates.
+
+    `next_query` is called once per arrival with the step's random
+    generator and returns the SQL to send, so query mixes and parameter
+    values are reproducible for a given seed.
+    """
+
+    def __init__(
+        self,
+        runner,
+        next_query: Callable[[random.Random], str],
+        max_in_flight: int = 256,
+        disable_cache: bool = True
+    ):
+        self.runner = runner
+        self.next_query = next_query
+        self.max_in_flight = max_in_flight
+        self.disable_cache = disable_cache
+
+    async def run_step(self, target_qps: float, duration_s: float, seed: int = 0) -> LoadStepResult:
+        """
+        Send queries for `duration_s` seconds at a Poisson rate of `target_qps`.
+
+        Requests over `max_in_flight` wait for a free slot, but their latency
+        is still measured from the intended send time.
+        """
+        rng = random.Random(seed)
+        result = LoadStepResult(target_qps=target_qps, duration_s=duration_s)
+        slots = asyncio.Semaphore(self.max_in_flight)
+        tasks = []
+
+        async def fire(sql: str, intended: float):
+            async with slots:
+                sent_at = time.perf_counter()
+                result.max_send_lag_ms = max(result.max_send_lag_ms, (sent_at - intended) * 1000)
+                try:
+                    await self.runner.execute(sql, disable_cache=self.disable_cache)
+                except Exception:
+                    result.errors += 1
+                else:
+                    result.completed += 1
+                done = time.perf_counter()
+            result.latency.record((done - intended) * 1_000_000)
+            result.service_time.record((done - sent_at) * 1_000_000)
+
+        start = time.perf_counter()
+        intended = start
+        end = start + duration_s
+        while True:
+            intended += rng.expovariate(target_qps)
+            if intended >= end:
+                break
+            delay = intended - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(fire(self.next_query(rng), intended)))
+            result.sent += 1
+
+        await asyncio.gather(*tasks)
+        # Achieved rate counts the drain time after the last arrival
+        result.duration_s = max(duration_s, time.perf_counter() - start)
+        return result
+
+    async def run(
+        self,
+        rates: list[float],
+        duration_s: float,
+        seed: int = 0,
+        cooldown_s: float = 2.0
+    ) -> list[LoadStepResult]:
+        """Run each target rate in turn and return one result per step."""
+        results = []
+        for i, rate in enumerate(rates):
+            print(f"  Step {i + 1}/{len(rates)}: {rate:g} QPS for {duration_s:g}s...")
+            step = await self.run_step(rate, duration_s, seed=seed + i)
+            results.append(step)
+            print(f"    achieved {step.achieved_qps:.1f} QPS, "
+                  f"p99 {step.latency.percentile(99):.1f} ms, errors {step.errors} ({step.error_rate:.1%})")
+            if cooldown_s and i < len(rates) - 1:
+                await asyncio.sleep(cooldown_s)
+        return results
+
+
+def print_load_report(results: list[LoadStepResult]):
+    """Print the saturation curve as a table."""
+    print(tabulate(
+        [r.summary_row() for r in results],
+        headers=["Target QPS", "Achieved", "Error %", "OK", "Errors",
+                 "p50 ms", "p95 ms", "p99 ms", "p99.9 ms",
+                 "Service p99", "Max lag ms"],
+        tablefmt="rounded_grid"
+    ))
+    print("\nLatencies are measured from the scheduled send time "
+          "(coordinated-omission corrected) and include failed requests; "
+          "'Service p99' excludes queueing.")
@@ -0,0 +1,129 @@
+"""
+Server-Side Query Metrics
+
+Every query sent by the runners carries a unique query label. After the
+fact, the engine's query history (information_schema.engine_query_history)
+is looked up by label in one batched query, and the server-side metrics --
+rows and bytes scanned, CPU time, peak memory, cache hits -- are attached
+to the matching QueryResult.
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+import uuid
+from typing import TYPE_CHECKING, Iterable, Optional
+
+if TYPE_CHECKING:
+    from .firebolt import QueryResult
+
+
+# Prefix for generated labels; unique per runner process
+LABEL_PREFIX = "plg"
+
+# Labels looked up per history query
+HISTORY_BATCH_SIZE = 200
+
+# QueryResult attribute -> candidate history columns (first present wins).
+# Column names vary slightly across engine versions, so the lookup selects
+# * and maps whatever is there.
+HISTORY_COLUMNS = {
+    "query_id": ("query_id",),
+    "rows_scanned": ("scanned_rows",),
+    "bytes_read": ("scanned_bytes",),
+    "cache_bytes_read": ("scanned_cache_bytes", "scanned_bytes_cache"),
+    "cpu_time_us": ("cpu_usage_us", "cpu_time_us"),
+    "peak_memory_bytes": ("peak_memory_bytes", "max_memory_bytes", "memory_usage_bytes"),
+    "server_time_ms": ("duration_us",),
+}
+
+_session = uuid.uuid4().hex[:8]
+_counter = itertools.count(1)
+
+
+def new_query_label() -> str:
+    """Return a label that is unique across runs and processes."""
+    return f"{LABEL_PREFIX}_{os.getpid()}_{_session}_{next(_counter)}"
+
+
+def history_sql(labels: Iterable[str]) -> str:
+    """SQL that fetches finished-query history rows for the given labels."""
+    quoted = ", ".join("'" + label.replace("'", "''") + "'" for label in labels)
+    return f"""
+        SELECT *
+        FROM information_schema.engine_query_history
+        WHERE query_label IN ({quoted})
+    """
+
+
+def running_query_sql(label: str) -> str:
+    """SQL that finds the ids of running queries carrying a label."""
+    quoted = "'" + label.replace("'", "''") + "'"
+    return f"""
+        SELECT query_id
+        FROM information_schema.engine_running_queries
+        WHERE query_label = {quoted}
+    """
+
+
+def cancel_sql(query_id: str) -> str:
+    """SQL that cancels a running query on the server."""
+    return "CANCEL QUERY WHERE query_id = '" + str(query_id).replace("'", "''") + "'"
+
+
+def _first(row: dict, candidates: tuple[str, ...]):
+    for name in candidates:
+        if row.get(name) is not None:
+            return row[name]
+    return None
+
+
+def apply_history(results: list["QueryResult"], history_rows: Iterable[dict]) -> int:
+    """
+    Copy server-side metrics from history rows onto results by label.
+
+    Only rows for successfully finished queries are used; a label can also
+    show up with a STARTED status while the query was running.
+
+    Returns:
+        Number of results that received metrics
+    """
+    by_label: dict[str, dict] = {}
+    for row in history_rows:
+        status = str(row.get("status") or "").upper()
+        if status and not status.startswith("ENDED"):
+            continue
+        by_label[row.get("query_label")] = row
+
+    updated = 0
+    for result in results:
+        row = by_label.get(result.query_label)
+        if row is None:
+            continue
+        for attribute, candidates in HISTORY_COLUMNS.items():
+            value = _first(row, candidates)
+            if value is None:
+                continue
+            if attribute == "server_time_ms":
+                value = int(value) / 1000
+            elif attribute != "query_id":
+                value = int(value)
+            setattr(result, attribute, value)
+        updated += 1
+    return updated
+
+
+def pending(results: list["QueryResult"]) -> list["QueryResult"]:
+    """Results that have a label but no server metrics yet."""
+    return [r for r in results if r.query_label and r.query_id is None]
+
+
+def batches(results: list["QueryResult"], size: int = HISTORY_BATCH_SIZE) -> Iterable[list["QueryResult"]]:
+    for start in range(0, len(results), size):
+        yield results[start:start + size]
+
+
+def label_setting(label: Optional[str]) -> dict:
+    """Core query parameters that attach a label to a request."""
+    return {"query_label": label} if label else {}
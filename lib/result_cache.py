@@ -0,0 +1,163 @@
+"""
+Client-Side Result Cache
+
+An opt-in, in-process cache of query results for interactive use (IDE,
+demo app, status checks), where the same read-only queries are sent over
+and over. Entries are keyed by normalized SQL plus the connection scope
+(runtime, endpoint, database, and any session settings in effect, see
+FireboltRunner._cache_key_scope), evicted least-recently-used beyond
+`max_entries`, and expire after `ttl_s`.
+
+Any statement that writes -- DDL, DML, COPY -- invalidates the cached
+results that read the tables it touches. A write whose tables cannot be
+determined clears the whole cache. Benchmarks never see cached results:
+FireboltRunner bypasses the cache whenever disable_cache=True.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Hashable, Optional
+
+from .sql import READ_ONLY_KINDS, SESSION_KINDS, normalize, referenced_tables, statement_kind, significant_tokens
+
+if TYPE_CHECKING:
+    from .firebolt import QueryResult
+
+
+# Functions whose value changes between calls; queries using them are not cached
+VOLATILE_FUNCTIONS = {"random", "now", "current_timestamp", "localtimestamp", "gen_random_uuid"}
+
+# Queries on system schemas are never cached (e.g. query history polling)
+UNCACHEABLE_SCHEMAS = ("information_schema.",)
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+
+@dataclass
+class _Entry:
+    result: "QueryResult"
+    expires_at: float
+    tables: frozenset[str]
+
+
+def is_cacheable(sql: str) -> bool:
+    """True for single read-only statements without volatile functions."""
+    tokens = significant_tokens(sql)
+    if statement_kind(sql) not in READ_ONLY_KINDS:
+        return False
+    if any(t.text == ";" for t in tokens[:-1]):
+        return False  # Multi-statement scripts
+    words = {t.text.lower() for t in tokens if t.kind == "word"}
+    if words & VOLATILE_FUNCTIONS:
+        return False
+    reads, _ = referenced_tables(sql)
+    return not any(table.startswith(UNCACHEABLE_SCHEMAS) for table in reads)
+
+
+class ResultCache:
+    """
+    LRU + TTL cache of QueryResults.
+
+    Thread-safe, so one cache can be shared by runners used from several
+    threads.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_s: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[tuple, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(sql: str, scope: Hashable) -> tuple:
+        return (normalize(sql), scope)
+
+    def get(self, sql: str, scope: Hashable) -> Optional["QueryResult"]:
+        """
+        Return a cached result for the statement, or None.
+
+        The returned QueryResult is a copy marked `cached=True` with the
+        lookup time as its execution time; column data is shared.
+        """
+        start = time.perf_counter()
+        key = self.key(sql, scope)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+        return dataclasses.replace(
+            entry.result,
+            execution_time_ms=(time.perf_counter() - start) * 1000,
+            query_label=None,
+            query_id=None,
+            cached=True
+        )
+
+    def put(self, sql: str, scope: Hashable, result: "QueryResult"):
+        """Cache a result if the statement is cacheable."""
+        if self.max_entries <= 0 or not is_cacheable(sql):
+            return
+        reads, _ = referenced_tables(sql)
+        key = self.key(sql, scope)
+        with self._lock:
+            self._entries[key] = _Entry(dataclasses.replace(result), time.monotonic() + self.ttl_s, frozenset(reads))
+            self._entries.move_to_end(key)
+            self.stats.stores += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def invalidate_tables(self, tables: set[str]):
+        """Drop cached results that read any of `tables`."""
+        # Match both qualified and bare names: public.playstats vs playstats
+        names = set(tables) | {t.rsplit(".", 1)[-1] for t in tables}
+        with self._lock:
+            stale = [
+                key for key, entry in self._entries.items()
+                if entry.tables & names or {t.rsplit(".", 1)[-1] for t in entry.tables} & names
+            ]
+            for key in stale:
+                del self._entries[key]
+            self.stats.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self.stats.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def observe(self, sql: str):
+        """
+        Invalidate entries affected by a statement (or script) that was
+        just executed. Reads and session statements change nothing.
+        """
+        kind = statement_kind(sql)
+        if kind in READ_ONLY_KINDS or kind in SESSION_KINDS:
+            if not any(t.text == ";" for t in significant_tokens(sql)[:-1]):
+                return
+        _, writes = referenced_tables(sql)
+        if writes:
+            self.invalidate_tables(writes)
+        elif kind not in READ_ONLY_KINDS and kind not in SESSION_KINDS:
+            # A write we cannot attribute to tables: be safe
+            self.clear()
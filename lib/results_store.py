@@ -0,0 +1,353 @@
+"""
+Benchmark Result Store
+
+Keeps every benchmark run in a local SQLite database so performance can be
+compared across Firebolt versions, schema changes and machines. Each run
+records the engine version, runtime, a fingerprint of the data it ran on,
+and for every query the SQL hash and all raw timing samples.
+
+`compare` flags statistically significant regressions: the bootstrap 95%
+confidence interval of candidate/baseline median time must lie entirely
+above 1 + threshold. Use its exit code as a gate before rolling out a new
+engine version: 0 no regressions, 1 regressions, 2 nothing to compare
+(unknown run, or no query comparable between the two runs).
+
+Usage:
+  python -m lib.results_store list [--suite gaming/aggregating_indexes]
+  python -m lib.results_store compare <baseline-run> [<candidate-run>] [--threshold 5]
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import statistics
+import subprocess
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+from .stats import bootstrap_ratio_ci
+
+if TYPE_CHECKING:
+    from .firebolt import BenchmarkResult, FireboltRunner, QueryResult
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_DB_PATH = REPO_ROOT / ".plg-ide" / "benchmarks.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    suite TEXT NOT NULL,
+    runtime TEXT,
+    engine_version TEXT,
+    data_fingerprint TEXT,
+    data_counts TEXT,
+    git_commit TEXT,
+    tag TEXT
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id TEXT NOT NULL REFERENCES runs(run_id),
+    name TEXT NOT NULL,
+    side TEXT NOT NULL,
+    query_hash TEXT,
+    sql TEXT,
+    median_ms REAL,
+    samples TEXT NOT NULL,
+    warmup_samples TEXT,
+    rows_scanned INTEGER,
+    bytes_read INTEGER,
+    cpu_time_us INTEGER,
+    PRIMARY KEY (run_id, name, side)
+);
+"""
+
+
+def query_hash(sql: Optional[str]) -> Optional[str]:
+    """Stable hash of a query, ignoring whitespace and letter case."""
+    if not sql:
+        return None
+    normalized = re.sub(r"\s+", " ", sql).strip().rstrip(";").lower()
+    return hashlib.sha256(normalized.encode()).hexdigest()[:16]
+
+
+def engine_version(runner: "FireboltRunner") -> Optional[str]:
+    """Return the engine's version string, or None if it cannot be read."""
+    try:
+        result = runner.execute("SELECT VERSION() AS version")
+    except RuntimeError:
+        return None
+    return str(result.data[0]["version"]) if result.row_count else None
+
+
+def data_fingerprint(runner: "FireboltRunner", tables: list[str]) -> tuple[Optional[str], dict]:
+    """Fingerprint the data a benchmark ran on from per-table row counts."""
+    counts = {}
+    for table in sorted(tables):
+        try:
+            result = runner.execute(f"SELECT COUNT(*) AS row_count FROM {table}")
+            counts[table] = int(result.data[0]["row_count"])
+        except RuntimeError:
+            counts[table] = None
+    if not counts:
+        return None, counts
+    digest = hashlib.sha256(json.dumps(counts, sort_keys=True).encode()).hexdigest()[:12]
+    return digest, counts
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT, capture_output=True, text=True, timeout=5
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+@dataclass
+class Comparison:
+    """One query/side compared between a baseline run and a candidate run."""
+    name: str
+    side: str
+    baseline_ms: float
+    candidate_ms: float
+    ratio: float
+    ci: Optional[tuple[float, float]]
+    status: str  # "regression", "improvement", "unchanged", "query changed", "insufficient samples"
+
+
+class ResultStore:
+    """SQLite-backed store of benchmark runs."""
+
+    def __init__(self, path: Optional[str | Path] = None):
+        self.path = Path(path or os.getenv("PLG_RESULTS_DB", DEFAULT_DB_PATH))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path)
+        self._db.row_factory = sqlite3.Row
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def record_run(
+        self,
+        suite: str,
+        results: list["BenchmarkResult"],
+        runtime: Optional[str] = None,
+        engine_version: Optional[str] = None,
+        fingerprint: Optional[str] = None,
+        data_counts: Optional[dict] = None,
+        tag: Optional[str] = None
+    ) -> str:
+        """Store one benchmark run and return its run id."""
+        run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:6]
+        with self._db:
+            self._db.execute(
+                "INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, datetime.now(timezone.utc).isoformat(), suite, runtime, engine_version,
+                 fingerprint, json.dumps(data_counts or {}), _git_commit(), tag)
+            )
+            for result in results:
+                for side, query in (("baseline", result.baseline), ("optimized", result.optimized)):
+                    self._insert_result(run_id, result.name, side, query)
+        return run_id
+
+    def _insert_result(self, run_id: str, name: str, side: str, query: "QueryResult"):
+        samples = query.samples or [query.execution_time_ms]
+        self._db.execute(
+            "INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (run_id, name, side, query_hash(query.sql), query.sql,
+             statistics.median(samples), json.dumps(samples), json.dumps(query.warmup_samples),
+             query.rows_scanned, query.bytes_read, query.cpu_time_us)
+        )
+
+    def runs(self, suite: Optional[str] = None, limit: int = 20) -> list[sqlite3.Row]:
+        """Most recent runs first."""
+        sql = "SELECT * FROM runs"
+        params: tuple = ()
+        if suite:
+            sql += " WHERE suite = ?"
+            params = (suite,)
+        sql += " ORDER BY created_at DESC LIMIT ?"
+        return self._db.execute(sql, params + (limit,)).fetchall()
+
+    def resolve_run(
+        self,
+        ref: str,
+        suite: Optional[str] = None,
+        relative_to: Optional[sqlite3.Row] = None
+    ) -> sqlite3.Row:
+        """
+        Find a run by id prefix, by tag, or 'latest' / 'previous'.
+
+        With `relative_to`, 'previous' is the last run of that run's suite
+        made before it (the natural baseline for a candidate).
+        """
+        if ref == "previous" and relative_to is not None:
+            row = self._db.execute(
+                "SELECT * FROM runs WHERE suite = ? AND created_at < ? ORDER BY created_at DESC LIMIT 1",
+                (relative_to["suite"], relative_to["created_at"])
+            ).fetchone()
+            if row is None:
+                raise LookupError(f"No run of suite {relative_to['suite']} before {relative_to['run_id']}")
+            return row
+        if ref in ("latest", "previous"):
+            runs = self.runs(suite, limit=2)
+            index = 0 if ref == "latest" else 1
+            if len(runs) <= index:
+                raise LookupError(f"No {ref} run" + (f" for suite {suite}" if suite else ""))
+            return runs[index]
+        rows = self._db.execute(
+            "SELECT * FROM runs WHERE run_id LIKE ? OR tag = ? ORDER BY created_at DESC",
+            (ref + "%", ref)
+        ).fetchall()
+        if suite:
+            rows = [r for r in rows if r["suite"] == suite]
+        if not rows:
+            raise LookupError(f"No run matches '{ref}'")
+        return rows[0]
+
+    def _results(self, run_id: str) -> dict[tuple[str, str], sqlite3.Row]:
+        rows = self._db.execute("SELECT * FROM results WHERE run_id = ?", (run_id,)).fetchall()
+        return {(r["name"], r["side"]): r for r in rows}
+
+    def compare(self, baseline_run: str, candidate_run: str, threshold_pct: float = 5.0) -> list[Comparison]:
+        """Compare every query/side present in both runs."""
+        baseline = self._results(baseline_run)
+        candidate = self._results(candidate_run)
+        comparisons = []
+        for key in sorted(baseline.keys() & candidate.keys()):
+            before, after = baseline[key], candidate[key]
+            before_samples = json.loads(before["samples"])
+            after_samples = json.loads(after["samples"])
+            ratio = after["median_ms"] / before["median_ms"] if before["median_ms"] else float("inf")
+            ci = bootstrap_ratio_ci(after_samples, before_samples)
+
+            if before["query_hash"] != after["query_hash"]:
+                status = "query changed"
+            elif ci is None:
+                status = "insufficient samples"
+            elif ci[0] > 1 + threshold_pct / 100:
+                status = "regression"
+            elif ci[1] < 1 - threshold_pct / 100:
+                status = "improvement"
+            else:
+                status = "unchanged"
+            comparisons.append(Comparison(
+                name=key[0], side=key[1],
+                baseline_ms=before["median_ms"], candidate_ms=after["median_ms"],
+                ratio=ratio, ci=ci, status=status
+            ))
+        return comparisons
+
+
+def record_benchmark_run(
+    runner: "FireboltRunner",
+    suite: str,
+    results: list["BenchmarkResult"],
+    tables: Optional[list[str]] = None,
+    tag: Optional[str] = None,
+    store: Optional[ResultStore] = None
+) -> str:
+    """Record a vertical's benchmark results with engine and data metadata."""
+    own_store = store is None
+    store = store or ResultStore()
+    try:
+        fingerprint, counts = data_fingerprint(runner, tables or [])
+        run_id = store.record_run(
+            suite,
+            results,
+            runtime=runner.runtime,
+            engine_version=engine_version(runner),
+            fingerprint=fingerprint,
+            data_counts=counts,
+            tag=tag
+        )
+        print(f"\nRecorded benchmark run {run_id} ({suite}) in {store.path}")
+        return run_id
+    finally:
+        if own_store:
+            store.close()
+
+
+# CLI support
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    from tabulate import tabulate
+
+    parser = argparse.ArgumentParser(description="Benchmark result store")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = sub.add_parser("list", help="List recorded runs")
+    list_parser.add_argument("--suite")
+    list_parser.add_argument("--limit", type=int, default=20)
+
+    compare_parser = sub.add_parser("compare", help="Compare a candidate run against a baseline run")
+    compare_parser.add_argument("baseline", help="Run id prefix, tag, 'latest' or 'previous'")
+    compare_parser.add_argument("candidate", nargs="?", default="latest",
+                                help="Run id prefix, tag, 'latest' or 'previous' (default: latest)")
+    compare_parser.add_argument("--suite", help="Restrict run lookup to one suite")
+    compare_parser.add_argument("--threshold", type=float, default=5.0,
+                                help="Slowdown (%%) the CI must exceed to count as a regression (default: 5)")
+
+    args = parser.parse_args()
+    store = ResultStore()
+
+    if args.command == "list":
+        rows = store.runs(args.suite, args.limit)
+        print(tabulate(
+            [[r["run_id"], r["suite"], r["runtime"], r["engine_version"], r["data_fingerprint"],
+              r["git_commit"], r["tag"]] for r in rows],
+            headers=["Run", "Suite", "Runtime", "Engine", "Data", "Commit", "Tag"],
+            tablefmt="rounded_grid"
+        ))
+
+    elif args.command == "compare":
+        try:
+            # 'previous' means the candidate suite's run before the candidate,
+            # so runs of another vertical are never picked as the baseline
+            candidate = store.resolve_run(args.candidate, args.suite)
+            relative = args.baseline in ("latest", "previous")
+            baseline = store.resolve_run(args.baseline, args.suite or (candidate["suite"] if relative else None),
+                                         relative_to=candidate)
+        except LookupError as e:
+            print(e)
+            sys.exit(2)
+
+        print(f"Baseline:  {baseline['run_id']} (engine {baseline['engine_version']}, data {baseline['data_fingerprint']})")
+        print(f"Candidate: {candidate['run_id']} (engine {candidate['engine_version']}, data {candidate['data_fingerprint']})")
+        if baseline["suite"] != candidate["suite"]:
+            print(f"WARNING: comparing suite {baseline['suite']} against {candidate['suite']}")
+        if baseline["data_fingerprint"] != candidate["data_fingerprint"]:
+            print("WARNING: runs were made on different data; timings may not be comparable")
+
+        comparisons = store.compare(baseline["run_id"], candidate["run_id"], args.threshold)
+        print(tabulate(
+            [[c.name, c.side, f"{c.baseline_ms:.1f}", f"{c.candidate_ms:.1f}", f"{c.ratio:.2f}x",
+              f"{c.ci[0]:.2f}-{c.ci[1]:.2f}" if c.ci else "N/A", c.status.upper() if c.status == "regression" else c.status]
+             for c in comparisons],
+            headers=["Query", "Side", "Baseline ms", "Candidate ms", "Ratio", "95% CI", "Status"],
+            tablefmt="rounded_grid"
+        ))
+
+        if not any(c.status in ("regression", "improvement", "unchanged") for c in comparisons):
+            # An empty comparison must not pass as "no regressions"
+            print("\nNo comparable queries: the runs share no query with an unchanged SQL hash and enough samples")
+            sys.exit(2)
+
+        regressions = [c for c in comparisons if c.status == "regression"]
+        if regressions:
+            print(f"\n{len(regressions)} significant regression(s) beyond {args.threshold:g}%")
+            sys.exit(1)
+        print("\nNo significant regressions")
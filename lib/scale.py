@@ -0,0 +1,280 @@
+"""
+Scale Factors and Deterministic Data Generation
+
+Sample data sizes follow a TPC-style scale factor: SF1 is the size the
+demos were written for, SF0.01 a quick smoke test, SF100 a hundred times
+SF1. Small lookup tables (games, categories, services, ...) stay fixed;
+everything else scales, foreign-key ranges included, so joins keep their
+selectivity at every size.
+
+Two kinds of generators share the scale factor:
+
+  - data/load.sql scripts build rows with generate_series and arithmetic on
+    the row number, so they are already deterministic. Row counts and key
+    ranges that scale are marked with a /*sf*/ comment, which scale_script
+    rewrites; the unmarked script is SF1 and still runs as-is.
+
+  - Python generators split each table into fixed chunks of CHUNK_ROWS
+    rows. A chunk's random stream is derived from (seed, table, chunk
+    index) alone, so any chunk can be generated on its own, in any process
+    and in any order, and the same (scale factor, seed, as-of date) always
+    produces the same rows, whatever batch or file size is used to load
+    them.
+
+Times are generated relative to the as-of date (today unless pinned), so
+demo queries filtering on CURRENT_DATE keep finding data; pin it with
+--as-of to reproduce a run exactly on another day.
+
+Usage:
+  python -m lib.scale verticals/adtech/data/load.sql --scale-factor 0.1
+  python -m lib.scale --vertical observability --scale-factor 0.01 --dry-run
+  python -m lib.load_scheduler --vertical all --scale-factor 10
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+import zlib
+from collections import deque
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+
+
+# Documented sizes; any positive scale factor works
+SCALE_FACTORS = (0.01, 0.1, 1, 10, 100)
+DEFAULT_SCALE_FACTOR = 1.0
+DEFAULT_SEED = 42
+
+# Rows per deterministic chunk. Changing it changes the generated data.
+CHUNK_ROWS = 1_000
+
+_SCALED_LITERAL = re.compile(r"/\*\s*sf\s*\*/\s*(\d+)")
+
+
+def scaled_rows(base_rows: int, scale_factor: float) -> int:
+    """Rows of a scaling table at a scale factor (at least 1)."""
+    return max(1, round(base_rows * scale_factor))
+
+
+def scale_script(sql: str, scale_factor: float) -> str:
+    """Multiply every /*sf*/-marked integer in a SQL script by the scale factor."""
+    if scale_factor == 1:
+        return sql
+    return _SCALED_LITERAL.sub(lambda m: f"/*sf*/ {scaled_rows(int(m.group(1)), scale_factor)}", sql)
+
+
+@dataclass(frozen=True)
+class DataSpec:
+    """What to generate: scale factor, seed and the date times are relative to."""
+    scale_factor: float = DEFAULT_SCALE_FACTOR
+    seed: int = DEFAULT_SEED
+    as_of: str = ""  # ISO date; empty means today
+
+    def __post_init__(self):
+        if self.scale_factor <= 0:
+            raise ValueError(f"Scale factor must be positive, got {self.scale_factor}")
+        if not self.as_of:
+            object.__setattr__(self, "as_of", date.today().isoformat())
+
+    def rows(self, base_rows: int, scales: bool = True) -> int:
+        """Row count of a table that has `base_rows` rows at SF1."""
+        return scaled_rows(base_rows, self.scale_factor) if scales else base_rows
+
+    @property
+    def anchor(self) -> np.datetime64:
+        """Midnight of the as-of date; generated times lie before it."""
+        return np.datetime64(self.as_of, "s")
+
+    @property
+    def label(self) -> str:
+        return f"SF{self.scale_factor:g} seed {self.seed} as of {self.as_of}"
+
+    @property
+    def tag(self) -> str:
+        """Compact form of the spec, the prefix of every chunk tag."""
+        return f"sf{self.scale_factor:g}-seed{self.seed}-{self.as_of}"
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """Rows start .. end-1 (0-based) of one table."""
+    table: str
+    index: int
+    start: int
+    end: int
+
+    @property
+    def rows(self) -> int:
+        return self.end - self.start
+
+    def ids(self) -> np.ndarray:
+        """1-based row numbers, used as surrogate keys."""
+        return np.arange(self.start + 1, self.end + 1)
+
+
+def table_chunks(table: str, rows: int) -> list[Chunk]:
+    """A table's rows split into deterministic chunks."""
+    return [
+        Chunk(table, i, start, min(start + CHUNK_ROWS, rows))
+        for i, start in enumerate(range(0, rows, CHUNK_ROWS))
+    ]
+
+
+def chunk_tag(spec: DataSpec, chunk: Chunk) -> str:
+    """Tag stored with every row of a chunk, e.g. sf1-seed42-2024-03-31/137 (see lib/checkpoint.py)."""
+    return f"{spec.tag}/{chunk.index}"
+
+
+def _seed_sequence(spec: DataSpec, chunk: Chunk) -> np.random.SeedSequence:
+    return np.random.SeedSequence([spec.seed, zlib.crc32(chunk.table.encode()), chunk.index])
+
+
+def chunk_rng(spec: DataSpec, chunk: Chunk) -> np.random.Generator:
+    """NumPy generator for one chunk; depends only on the seed, table and chunk index."""
+    return np.random.default_rng(_seed_sequence(spec, chunk))
+
+
+def chunk_seed(spec: DataSpec, chunk: Chunk) -> int:
+    """Integer seed for one chunk, for generators built on the standard `random` module."""
+    return int(_seed_sequence(spec, chunk).generate_state(1, np.uint64)[0])
+
+
+def chunk_tasks(
+    spec: DataSpec,
+    table: str,
+    rows: int,
+    group_rows: int = CHUNK_ROWS,
+    chunks: Optional[Sequence[Chunk]] = None
+) -> list[tuple]:
+    """
+    (spec, chunks) tasks of about `group_rows` rows each, for lib.ingest.
+
+    Grouping only decides how many chunks go into one INSERT or file;
+    the rows generated are the same for any group size. Pass `chunks` to
+    load only some of the table's chunks (e.g. the ones a resumed load
+    still needs).
+    """
+    chunks = list(table_chunks(table, rows) if chunks is None else chunks)
+    per_task = max(1, round(group_rows / CHUNK_ROWS))
+    return [(spec, tuple(chunks[i:i + per_task])) for i in range(0, len(chunks), per_task)]
+
+
+class ChunkFeed:
+    """
+    A table's chunks handed out as (spec, chunks) tasks of whatever size is
+    asked for at the time, for lib.ingest.run_pipeline with a BatchSizer.
+
+    A task whose INSERT failed can be put back and is then handed out again,
+    regrouped at the (smaller) size asked for next.
+    """
+
+    def __init__(self, spec: DataSpec, table: str, rows: int, chunks: Optional[Sequence[Chunk]] = None):
+        self.spec = spec
+        self._chunks = deque(table_chunks(table, rows) if chunks is None else chunks)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    def take(self, rows: int) -> Optional[tuple]:
+        """The next task of about `rows` rows (at least one chunk); None when empty."""
+        with self._lock:
+            if not self._chunks:
+                return None
+            count = min(len(self._chunks), max(1, round(rows / CHUNK_ROWS)))
+            return self.spec, tuple(self._chunks.popleft() for _ in range(count))
+
+    def put_back(self, task: tuple):
+        with self._lock:
+            self._chunks.extendleft(reversed(task[1]))
+
+
+def task_columns(
+    make_chunk: Callable[[DataSpec, Chunk], dict[str, Sequence]],
+    task: tuple,
+    tag_column: Optional[str] = None
+) -> dict[str, Sequence]:
+    """
+    Generate every chunk of a (spec, chunks) task and concatenate the columns.
+
+    With `tag_column`, a text column holding each row's chunk_tag is added
+    last, so loads can be fingerprinted and resumed per chunk.
+    """
+    spec, chunks = task
+    parts = [make_chunk(spec, chunk) for chunk in chunks]
+    if tag_column:
+        for part, chunk in zip(parts, chunks):
+            part[tag_column] = np.full(chunk.rows, chunk_tag(spec, chunk))
+    if len(parts) == 1:
+        return parts[0]
+    return {
+        name: np.concatenate([p[name] for p in parts]) if isinstance(parts[0][name], np.ndarray)
+        else [v for p in parts for v in p[name]]
+        for name in parts[0]
+    }
+
+
+def add_scale_arguments(parser):
+    """--scale-factor, --seed and --as-of, defaulting to PLG_SCALE_FACTOR / PLG_SEED / PLG_AS_OF."""
+    parser.add_argument("--scale-factor", "--sf", type=float,
+                        default=float(os.getenv("PLG_SCALE_FACTOR", DEFAULT_SCALE_FACTOR)),
+                        help=f"Data size relative to the demo size (e.g. {', '.join(f'{s:g}' for s in SCALE_FACTORS)}; "
+                             f"default: {DEFAULT_SCALE_FACTOR:g})")
+    parser.add_argument("--seed", type=int, default=int(os.getenv("PLG_SEED", DEFAULT_SEED)),
+                        help=f"Random seed (default: {DEFAULT_SEED})")
+    parser.add_argument("--as-of", default=os.getenv("PLG_AS_OF", ""),
+                        help="Date generated times are relative to, YYYY-MM-DD (default: today)")
+
+
+def spec_from_args(args) -> DataSpec:
+    return DataSpec(scale_factor=args.scale_factor, seed=args.seed, as_of=args.as_of)
+
+
+# CLI support
+if __name__ == "__main__":
+    import argparse
+    import sys
+    from pathlib import Path
+
+    from .load_scheduler import REPO_ROOT, vertical_files
+
+    parser = argparse.ArgumentParser(description="Run a data/load.sql script at a scale factor")
+    parser.add_argument("files", nargs="*", help="SQL scripts with /*sf*/-marked row counts")
+    parser.add_argument("--vertical", help="Load this vertical's schema and data/load.sql")
+    parser.add_argument("--dry-run", action="store_true", help="Print the scaled script instead of running it")
+    add_scale_arguments(parser)
+    args = parser.parse_args()
+
+    files = [Path(f) for f in args.files]
+    if args.vertical:
+        files += vertical_files(args.vertical)
+    if not files:
+        parser.error("give SQL files or --vertical")
+
+    scripts = [(f, scale_script(f.read_text(), args.scale_factor)) for f in files]
+    if args.dry_run:
+        for f, text in scripts:
+            print(f"-- {f} at SF{args.scale_factor:g}\n{text}")
+        sys.exit(0)
+
+    from .firebolt import FireboltRunner
+
+    runner = FireboltRunner()
+    try:
+        for f, text in scripts:
+            try:
+                name = f.resolve().relative_to(REPO_ROOT)
+            except ValueError:
+                name = f
+            print(f"{name} (SF{args.scale_factor:g})")
+            runner.execute_script(text, verbose=True)
+    except RuntimeError as e:
+        print(f"\n{e}")
+        sys.exit(1)
+    finally:
+        runner.close()
@@ -0,0 +1,291 @@
+"""
+SQL Text Utilities
+
+A small lexer for the Firebolt SQL dialect and helpers built on it:
+splitting scripts into statements, normalizing statements for use as
+cache keys, and finding the tables a statement reads and writes. The lexer understands string literals
+('...', E'...'), quoted identifiers ("...") and comments, so keywords
+and semicolons inside them are never mistaken for SQL.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Iterator
+
+
+@dataclass(frozen=True)
+class Token:
+    kind: str  # "word", "ident" (quoted), "string", "number", "punct", "comment", "space"
+    text: str
+
+
+_WORD = re.compile(r"[A-Za-z_][A-Za-z0-9_$]*")
+_NUMBER = re.compile(r"\d+(\.\d*)?([eE][+-]?\d+)?|\.\d+([eE][+-]?\d+)?")
+_SPACE = re.compile(r"\s+")
+
+
+def _quoted_end(sql: str, start: int, quote: str, backslash: bool) -> int:
+    """Index just past the closing quote of a literal opened at `start`."""
+    i = start + 1
+    n = len(sql)
+    while i < n:
+        c = sql[i]
+        if backslash and c == "\\":
+            i += 2
+            continue
+        if c == quote:
+            if i + 1 < n and sql[i + 1] == quote:
+                i += 2
+                continue
+            return i + 1
+        i += 1
+    return n  # Unterminated; the rest of the text belongs to the literal
+
+
+def tokenize(sql: str) -> Iterator[Token]:
+    """Split SQL text into tokens. Never fails; unknown characters become punctuation."""
+    i = 0
+    n = len(sql)
+    while i < n:
+        c = sql[i]
+        if c.isspace():
+            end = _SPACE.match(sql, i).end()
+            yield Token("space", sql[i:end])
+        elif c == "-" and sql.startswith("--", i):
+            end = sql.find("\n", i)
+            end = n if end == -1 else end
+            yield Token("comment", sql[i:end])
+        elif c == "/" and sql.startswith("/*", i):
+            end = sql.find("*/", i + 2)
+            end = n if end == -1 else end + 2
+            yield Token("comment", sql[i:end])
+        elif c == "'":
+            end = _quoted_end(sql, i, "'", backslash=False)
+            yield Token("string", sql[i:end])
+        elif c in "eE" and sql.startswith("'", i + 1):
+            end = _quoted_end(sql, i + 1, "'", backslash=True)
+            yield Token("string", sql[i:end])
+        elif c == '"':
+            end = _quoted_end(sql, i, '"', backslash=False)
+            yield Token("ident", sql[i:end])
+        elif c.isdigit() or (c == "." and i + 1 < n and sql[i + 1].isdigit()):
+            end = _NUMBER.match(sql, i).end()
+            yield Token("number", sql[i:end])
+        elif c.isalpha() or c == "_":
+            end = _WORD.match(sql, i).end()
+            yield Token("word", sql[i:end])
+        else:
+            end = i + 2 if sql.startswith(("::", "<=", ">=", "<>", "!=", "||"), i) else i + 1
+            yield Token("punct", sql[i:end])
+        i = end
+
+
+def significant_tokens(sql: str) -> list[Token]:
+    """Tokens without whitespace and comments."""
+    return [t for t in tokenize(sql) if t.kind not in ("space", "comment")]
+
+
+def normalize(sql: str) -> str:
+    """
+    Canonical text of a statement: comments dropped, whitespace collapsed,
+    unquoted words lower-cased, trailing semicolons removed. Literals and
+    quoted identifiers are kept exactly.
+    """
+    parts = []
+    for token in significant_tokens(sql):
+        parts.append(token.text.lower() if token.kind == "word" else token.text)
+    while parts and parts[-1] == ";":
+        parts.pop()
+    return " ".join(parts)
+
+
+def query_shape(sql: str) -> str:
+    """
+    Normalized statement with string and number literals replaced by ?,
+    so the same query with different parameters maps to one key.
+    """
+    parts = []
+    for token in significant_tokens(sql):
+        if token.kind in ("string", "number"):
+            parts.append("?")
+        else:
+            parts.append(token.text.lower() if token.kind == "word" else token.text)
+    while parts and parts[-1] == ";":
+        parts.pop()
+    return " ".join(parts)
+
+
+def statement_kind(sql: str) -> str:
+    """Lower-case leading keyword of a statement ("select", "insert", ...)."""
+    for token in significant_tokens(sql):
+        if token.kind == "word":
+            return token.text.lower()
+        if token.text != "(":
+            break
+    return ""
+
+
+# Statements that never change data or schema
+READ_ONLY_KINDS = {"select", "with", "show", "describe", "explain", "values"}
+
+# Statements that change neither data nor schema (though settings can
+# change the results of later queries in the same session)
+SESSION_KINDS = {"set", "use"}
+
+
+def session_setting(sql: str) -> tuple[str, str] | None:
+    """(name, normalized value) of a SET or USE statement, else None."""
+    tokens = significant_tokens(sql)
+    while tokens and tokens[-1].text == ";":
+        tokens.pop()
+    kind = statement_kind(sql)
+    if kind == "use" and len(tokens) > 1:
+        return "use", normalize(" ".join(t.text for t in tokens[1:]))
+    if kind == "set" and len(tokens) > 3 and tokens[2].text == "=":
+        return tokens[1].text.lower(), normalize(" ".join(t.text for t in tokens[3:]))
+    return None
+
+
+def _identifier(tokens: list[Token], i: int) -> tuple[str | None, int]:
+    """Read a possibly qualified name starting at tokens[i]; returns (name, next index)."""
+    parts = []
+    while i < len(tokens) and tokens[i].kind in ("word", "ident"):
+        token = tokens[i]
+        parts.append(token.text[1:-1].replace('""', '"') if token.kind == "ident" else token.text.lower())
+        if i + 1 < len(tokens) and tokens[i + 1].text == ".":
+            i += 2
+            continue
+        i += 1
+        break
+    return (".".join(parts) if parts else None), i
+
+
+def _skip_words(tokens: list[Token], i: int, *words: str) -> int:
+    """Skip an optional run of keywords such as IF NOT EXISTS."""
+    while i < len(tokens) and tokens[i].kind == "word" and tokens[i].text.lower() in words:
+        i += 1
+    return i
+
+
+def referenced_tables(sql: str) -> tuple[set[str], set[str]]:
+    """
+    Tables a statement (or script) reads and writes, as lower-cased names.
+
+    This is a keyword scan, not a parser: it finds names after FROM, JOIN,
+    INSERT INTO, UPDATE, DELETE FROM, TRUNCATE, COPY INTO and the
+    CREATE/DROP/ALTER forms, and ignores CTE names. It is precise enough
+    for cache invalidation and load ordering in this repo's SQL.
+    """
+    tokens = significant_tokens(sql)
+    words = [t.text.lower() if t.kind == "word" else None for t in tokens]
+    reads: set[str] = set()
+    writes: set[str] = set()
+    ctes: set[str] = set()
+
+    # Function call enclosing each token, so EXTRACT(x FROM y) is not a table
+    enclosing: list[str | None] = []
+    stack: list[str | None] = []
+    for i, token in enumerate(tokens):
+        enclosing.append(stack[-1] if stack else None)
+        if token.text == "(":
+            stack.append(words[i - 1] if i > 0 else None)
+        elif token.text == ")" and stack:
+            stack.pop()
+
+    for i, word in enumerate(words):
+        if word is None:
+            continue
+        nxt = words[i + 1] if i + 1 < len(words) else None
+        statement_start = i == 0 or tokens[i - 1].text == ";"
+
+        if word == "as" and i > 1 and i + 1 < len(tokens) and tokens[i + 1].text == "(":
+            # name AS ( ... ) inside WITH
+            prev = tokens[i - 1]
+            if prev.kind in ("word", "ident") and (words[i - 2] in ("with", "recursive") or tokens[i - 2].text == ","):
+                ctes.add(prev.text.strip('"').lower())
+
+        if word in ("from", "join"):
+            if i > 0 and words[i - 1] == "delete":
+                name, _ = _identifier(tokens, i + 1)
+                if name:
+                    writes.add(name)
+                continue
+            if enclosing[i] in ("extract", "substring", "trim", "position", "overlay"):
+                continue
+            name, j = _identifier(tokens, i + 1)
+            if name and (j >= len(tokens) or tokens[j].text != "("):
+                reads.add(name)
+        elif word == "into" and i > 0 and words[i - 1] in ("insert", "copy"):
+            name, _ = _identifier(tokens, i + 1)
+            if name:
+                writes.add(name)
+        elif word == "update" and statement_start:
+            name, _ = _identifier(tokens, i + 1)
+            if name:
+                writes.add(name)
+        elif word == "truncate":
+            j = _skip_words(tokens, i + 1, "table")
+            name, _ = _identifier(tokens, j)
+            if name:
+                writes.add(name)
+        elif word in ("create", "drop", "alter") and nxt is not None:
+            j = _skip_words(tokens, i + 1, "or", "replace", "fact", "dimension", "external", "temporary")
+            obj = words[j] if j < len(words) else None
+            if obj in ("table", "view"):
+                j = _skip_words(tokens, j + 1, "if", "not", "exists")
+                name, _ = _identifier(tokens, j)
+                if name:
+                    writes.add(name)
+            elif obj in ("index", "aggregating"):
+                # CREATE AGGREGATING INDEX name ON table (...)
+                for k in range(j, len(words)):
+                    if words[k] == "on":
+                        name, _ = _identifier(tokens, k + 1)
+                        if name:
+                            writes.add(name)
+                        break
+        elif word == "vacuum" and statement_start:
+            name, _ = _identifier(tokens, i + 1)
+            if name:
+                writes.add(name)
+
+    return reads - ctes, writes
+
+
+def split_statements(sql: str) -> list[str]:
+    """
+    Split a script into statements at top-level semicolons.
+
+    Semicolons inside literals, quoted identifiers and comments do not
+    split. Comments before a statement stay with it; chunks that are only
+    whitespace or comments are dropped. Statements are returned without
+    their terminating semicolon.
+    """
+    statements = []
+    current: list[str] = []
+    has_sql = False
+    for token in tokenize(sql):
+        if token.kind == "punct" and token.text == ";":
+            if has_sql:
+                statements.append("".join(current).strip())
+            current = []
+            has_sql = False
+            continue
+        current.append(token.text)
+        if token.kind not in ("space", "comment"):
+            has_sql = True
+    if has_sql:
+        statements.append("".join(current).strip())
+    return statements
+
+
+def statement_summary(sql: str, width: int = 70) -> str:
+    """First line of a statement with comments removed, for progress output."""
+    text = "".join(t.text for t in tokenize(sql) if t.kind != "comment")
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped:
+            return stripped[:width] + ("..." if len(stripped) > width else "")
+    return ""
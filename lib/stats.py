@@ -0,0 +1,193 @@
+"""
+Benchmark Statistics
+
+Summary statistics, confidence intervals and the adaptive sampling loop
+used by FireboltRunner.benchmark. Pure Python: sample counts are small
+(tens of runs), so NumPy would not buy anything here.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+import statistics
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Percentile (0-100) with linear interpolation between closest ranks."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+@dataclass
+class TimingStats:
+    """Summary of a set of timing samples (milliseconds)."""
+    n: int
+    min: float
+    median: float
+    mean: float
+    p95: float
+    stddev: float
+
+    @classmethod
+    def from_samples(cls, samples: list[float]) -> "TimingStats":
+        return cls(
+            n=len(samples),
+            min=min(samples),
+            median=statistics.median(samples),
+            mean=statistics.fmean(samples),
+            p95=percentile(samples, 95),
+            stddev=statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        )
+
+
+def median_ci(samples: list[float], confidence: float = 0.95) -> Optional[tuple[float, float]]:
+    """
+    Distribution-free confidence interval for the median.
+
+    Uses order statistics with binomial(n, 0.5) ranks, so it needs no
+    assumption about the shape of the latency distribution. Returns None
+    when there are too few samples for the requested confidence.
+    """
+    n = len(samples)
+    if n < 2:
+        return None
+    ordered = sorted(samples)
+    alpha = 1 - confidence
+
+    # Largest j with P(Binomial(n, 0.5) < j) <= alpha / 2
+    cumulative = 0.0
+    j = 0
+    for k in range(n + 1):
+        p = math.comb(n, k) / 2 ** n
+        if cumulative + p > alpha / 2:
+            break
+        cumulative += p
+        j = k + 1
+    if j == 0:
+        return None
+    return ordered[j - 1], ordered[n - j]
+
+
+def bootstrap_ratio_ci(
+    baseline: list[float],
+    optimized: list[float],
+    confidence: float = 0.95,
+    resamples: int = 2000,
+    seed: int = 0
+) -> Optional[tuple[float, float]]:
+    """
+    Bootstrap confidence interval for median(baseline) / median(optimized).
+
+    Each side is resampled independently with replacement. The seed is
+    fixed so the printed interval is reproducible for the same samples.
+    """
+    if len(baseline) < 2 or len(optimized) < 2:
+        return None
+    rng = random.Random(seed)
+    ratios = []
+    for _ in range(resamples):
+        b = statistics.median(rng.choices(baseline, k=len(baseline)))
+        o = statistics.median(rng.choices(optimized, k=len(optimized)))
+        if o > 0:
+            ratios.append(b / o)
+    if not ratios:
+        return None
+    tail = (1 - confidence) / 2 * 100
+    return percentile(ratios, tail), percentile(ratios, 100 - tail)
+
+
+def is_steady(samples: list[float], window: int = 3, tolerance: float = 0.2) -> bool:
+    """
+    True when the last `window` samples agree within `tolerance`.
+
+    Agreement is the spread (max - min) relative to their median, which
+    catches the cold-cache first runs that dominate warm-up.
+    """
+    if len(samples) < window:
+        return False
+    recent = samples[-window:]
+    mid = statistics.median(recent)
+    if mid <= 0:
+        return True
+    return (max(recent) - min(recent)) / mid <= tolerance
+
+
+class AdaptiveSampler:
+    """
+    Decide how many warm-up and timed runs a benchmark needs.
+
+    Warm-up continues past `min_warmup` until the run times are steady (or
+    `max_warmup` is reached). Timed runs continue past `min_iterations`
+    until the median's confidence interval is within `target_ci_pct` of the
+    median, `max_iterations` is reached, or `time_budget_s` runs out.
+    """
+
+    def __init__(
+        self,
+        min_iterations: int = 3,
+        max_iterations: int = 30,
+        min_warmup: int = 1,
+        max_warmup: int = 10,
+        target_ci_pct: float = 5.0,
+        time_budget_s: Optional[float] = 60.0
+    ):
+        self.min_iterations = max(1, min_iterations)
+        self.max_iterations = max(max_iterations, min_iterations)
+        self.min_warmup = min_warmup
+        self.max_warmup = max(max_warmup, min_warmup)
+        self.target_ci_pct = target_ci_pct
+        self.time_budget_s = time_budget_s
+        self.warmup_samples: list[float] = []
+        self.samples: list[float] = []
+        self._start = time.perf_counter()
+
+    def _budget_left(self) -> bool:
+        if self.time_budget_s is None:
+            return True
+        return time.perf_counter() - self._start < self.time_budget_s
+
+    def needs_warmup(self) -> bool:
+        n = len(self.warmup_samples)
+        if self.min_warmup == 0:
+            return False
+        if n < self.min_warmup:
+            return True
+        if n >= self.max_warmup or not self._budget_left():
+            return False
+        # Steady means the last two (later three) warm-up runs agree
+        return not is_steady(self.warmup_samples, window=min(3, max(2, n)))
+
+    def relative_ci_pct(self) -> Optional[float]:
+        """Half-width of the median CI as a percentage of the median."""
+        interval = median_ci(self.samples)
+        if interval is None:
+            return None
+        mid = statistics.median(self.samples)
+        if mid <= 0:
+            return 0.0
+        return (interval[1] - interval[0]) / 2 / mid * 100
+
+    def needs_sample(self) -> bool:
+        n = len(self.samples)
+        if n < self.min_iterations:
+            return True
+        if n >= self.max_iterations or not self._budget_left():
+            return False
+        ci = self.relative_ci_pct()
+        return ci is None or ci > self.target_ci_pct
+
+    def run(self, measure: Callable[[], float]):
+        """Drive a synchronous `measure()` that returns one run time in ms."""
+        while self.needs_warmup():
+            self.warmup_samples.append(measure())
+        while self.needs_sample():
+            self.samples.append(measure())
@@ -0,0 +1,348 @@
+"""
+Parameter Sweeps
+
+Benchmark a templated query across many parameter values instead of one
+hard-coded key. Parameters are drawn from distributions -- uniform, Zipf,
+or sampled from the table itself with its real skew -- and latency is
+reported per parameter bucket (how hot the key is) and for first versus
+repeated keys, which is where result-cache effects show up.
+
+Example:
+    template = QueryTemplate(
+        "Player Profile",
+        "SELECT gameid, COUNT(*) FROM playstats WHERE playerid = {playerid} GROUP BY gameid",
+        [Sampled("playstats", "playerid")],
+    )
+    result = ParameterSweep(runner).run(template, iterations=1000)
+    print_sweep_report(result)
+"""
+
+from __future__ import annotations
+
+import bisect
+import itertools
+import math
+import random
+import re
+import statistics
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Optional, Sequence, Union
+
+from tabulate import tabulate
+
+from .columnar import column_slice
+from .stats import percentile
+
+
+Names = Union[str, Sequence[str]]
+
+
+def sql_literal(value: Any) -> str:
+    """Render a Python value as a SQL literal."""
+    if value is None:
+        return "NULL"
+    if hasattr(value, "item"):  # NumPy scalar
+        value = value.item()
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, (date, datetime)):
+        value = value.isoformat(sep=" ") if isinstance(value, datetime) else value.isoformat()
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def rank_bucket(rank: int) -> str:
+    """Group a 1-based popularity rank into powers of ten: 1, 2-10, 11-100, ..."""
+    if rank <= 1:
+        return "rank 1"
+    exponent = math.ceil(math.log10(rank))
+    return f"rank {10 ** (exponent - 1) + 1}-{10 ** exponent}"
+
+
+def distinct_values(runner, table: str, names: Names, max_values: int = 100_000) -> list[tuple]:
+    """Distinct values of one or more columns, most frequent first, with counts."""
+    columns = [names] if isinstance(names, str) else list(names)
+    column_list = ", ".join(columns)
+    result = runner.execute(f"""
+        SELECT {column_list}, COUNT(*) AS weight
+        FROM {table}
+        GROUP BY {column_list}
+        ORDER BY weight DESC
+        LIMIT {int(max_values)}
+    """)
+    if not result.row_count:
+        raise RuntimeError(f"{table} has no rows to sample {column_list} from")
+    data = result.column_data
+    return list(zip(*(column_slice(data[c], 0, result.row_count) for c in columns + ["weight"])))
+
+
+class Distribution:
+    """
+    Base class for parameter distributions.
+
+    A distribution fills one or more template placeholders (`names`). Each
+    draw returns (values by name, bucket label).
+    """
+
+    def __init__(self, names: Names):
+        self.names = [names] if isinstance(names, str) else list(names)
+
+    def resolve(self, runner):
+        """Fetch anything needed from the database before drawing."""
+
+    def draw(self, rng: random.Random) -> tuple[dict, str]:
+        raise NotImplementedError
+
+    def _as_params(self, value) -> dict:
+        if len(self.names) == 1:
+            return {self.names[0]: value[0] if isinstance(value, tuple) else value}
+        return dict(zip(self.names, value))
+
+
+class Uniform(Distribution):
+    """
+    Every value equally likely: integers in [low, high], or a list of values.
+
+    Buckets are quartiles of the range (or of the value list).
+    """
+
+    def __init__(
+        self,
+        names: Names,
+        low: Optional[int] = None,
+        high: Optional[int] = None,
+        values: Optional[Sequence] = None
+    ):
+        super().__init__(names)
+        if values is None and (low is None or high is None):
+            raise ValueError("Uniform needs either low/high or values")
+        self.low = low
+        self.high = high
+        self.values = list(values) if values is not None else None
+
+    def draw(self, rng: random.Random) -> tuple[dict, str]:
+        if self.values is not None:
+            index = rng.randrange(len(self.values))
+            quartile = index * 4 // len(self.values) + 1
+            return self._as_params(self.values[index]), f"Q{quartile}"
+        value = rng.randint(self.low, self.high)
+        quartile = min(4, (value - self.low) * 4 // (self.high - self.low + 1) + 1)
+        return self._as_params(value), f"Q{quartile}"
+
+
+class Zipf(Distribution):
+    """
+    Zipf-distributed popularity: the k-th most popular value is drawn with
+    probability proportional to 1 / k**s.
+
+    Values are integers in [low, low + n) or an explicit list. With
+    `shuffle`, ranks are mapped to values in a seeded random order so the
+    hot keys are not simply the smallest ids.
+    """
+
+    def __init__(
+        self,
+        names: Names,
+        n: Optional[int] = None,
+        s: float = 1.1,
+        low: int = 1,
+        values: Optional[Sequence] = None,
+        shuffle: bool = True,
+        seed: int = 0
+    ):
+        super().__init__(names)
+        if values is None and n is None:
+            raise ValueError("Zipf needs either n or values")
+        self.values = list(values) if values is not None else list(range(low, low + n))
+        if shuffle:
+            random.Random(seed).shuffle(self.values)
+        self.s = s
+        self._cumulative = list(itertools.accumulate(1 / k ** s for k in range(1, len(self.values) + 1)))
+
+    def draw(self, rng: random.Random) -> tuple[dict, str]:
+        index = bisect.bisect_left(self._cumulative, rng.random() * self._cumulative[-1])
+        index = min(index, len(self.values) - 1)
+        return self._as_params(self.values[index]), rank_bucket(index + 1)
+
+
+class Sampled(Distribution):
+    """
+    Values sampled from the table itself.
+
+    With `weighted` (the default), each value is drawn in proportion to how
+    many rows it has, reproducing the real skew of lookups; otherwise every
+    distinct value is equally likely. Buckets are the value's frequency
+    rank in the table.
+    """
+
+    def __init__(self, table: str, names: Names, weighted: bool = True, max_values: int = 100_000):
+        super().__init__(names)
+        self.table = table
+        self.weighted = weighted
+        self.max_values = max_values
+        self._values: list[tuple] = []
+        self._cumulative: list[int] = []
+
+    def resolve(self, runner):
+        rows = distinct_values(runner, self.table, self.names, self.max_values)
+        self._values = [row[:-1] for row in rows]
+        self._cumulative = list(itertools.accumulate(int(row[-1]) for row in rows))
+
+    def draw(self, rng: random.Random) -> tuple[dict, str]:
+        if not self._values:
+            raise RuntimeError("Sampled distribution used before resolve()")
+        if self.weighted:
+            index = bisect.bisect_right(self._cumulative, rng.random() * self._cumulative[-1])
+            index = min(index, len(self._values) - 1)
+        else:
+            index = rng.randrange(len(self._values))
+        return self._as_params(self._values[index]), rank_bucket(index + 1)
+
+
+@dataclass
+class QueryTemplate:
+    """
+    SQL with `{name}` placeholders filled from parameter distributions.
+
+    Values are rendered as SQL literals, so string and date parameters are
+    quoted automatically. The first distribution's bucket is the one
+    results are grouped by.
+    """
+    name: str
+    sql: str
+    params: list[Distribution]
+
+    def render(self, rng: random.Random) -> tuple[str, dict, str]:
+        values: dict = {}
+        bucket = None
+        for distribution in self.params:
+            drawn, drawn_bucket = distribution.draw(rng)
+            values.update(drawn)
+            bucket = bucket or drawn_bucket
+        sql = self.sql.format(**{k: sql_literal(v) for k, v in values.items()})
+        return sql, values, bucket or "all"
+
+
+@dataclass
+class SweepSample:
+    """One execution of a template."""
+    params: dict
+    bucket: str
+    latency_ms: float
+    rows: int
+    repeat: bool
+
+
+@dataclass
+class SweepResult:
+    """All executions of a template, with per-bucket summaries."""
+    name: str
+    distribution: str
+    samples: list[SweepSample] = field(default_factory=list)
+    errors: int = 0
+    elapsed_s: float = 0.0
+
+    def _summary(self, label: str, samples: list[SweepSample]) -> list:
+        latencies = [s.latency_ms for s in samples]
+        keys = {tuple(sorted(s.params.items())) for s in samples}
+        return [
+            label,
+            len(samples),
+            len(keys),
+            f"{percentile(latencies, 50):.1f}",
+            f"{percentile(latencies, 95):.1f}",
+            f"{percentile(latencies, 99):.1f}",
+            f"{max(latencies):.1f}",
+            f"{statistics.fmean(s.rows for s in samples):.0f}",
+        ]
+
+    def bucket_rows(self) -> list[list]:
+        """Summary rows per bucket, then first-seen vs repeated keys, then overall."""
+        by_bucket: dict[str, list[SweepSample]] = {}
+        for sample in self.samples:
+            by_bucket.setdefault(sample.bucket, []).append(sample)
+
+        def order(label: str):
+            number = re.search(r"\d+", label)
+            return (int(number.group()) if number else 0, label)
+
+        rows = [self._summary(b, by_bucket[b]) for b in sorted(by_bucket, key=order)]
+        first = [s for s in self.samples if not s.repeat]
+        repeat = [s for s in self.samples if s.repeat]
+        if first and repeat:
+            rows.append(self._summary("first-seen keys", first))
+            rows.append(self._summary("repeated keys", repeat))
+        if self.samples:
+            rows.append(self._summary("overall", self.samples))
+        return rows
+
+
+class ParameterSweep:
+    """Run a QueryTemplate across many parameter values with a FireboltRunner."""
+
+    def __init__(self, runner, disable_cache: bool = False):
+        self.runner = runner
+        self.disable_cache = disable_cache
+
+    def run(
+        self,
+        template: QueryTemplate,
+        iterations: int = 1000,
+        seed: int = 0,
+        warmup: int = 0,
+        progress_every: int = 250
+    ) -> SweepResult:
+        """
+        Execute `iterations` renderings of the template, one at a time.
+
+        `warmup` renderings are executed first and discarded. Parameter
+        draws are reproducible for a given seed.
+        """
+        for distribution in template.params:
+            distribution.resolve(self.runner)
+
+        rng = random.Random(seed)
+        result = SweepResult(
+            name=template.name,
+            distribution=", ".join(type(d).__name__ for d in template.params)
+        )
+        seen: set[tuple] = set()
+        start = time.perf_counter()
+
+        for i in range(warmup + iterations):
+            sql, values, bucket = template.render(rng)
+            key = tuple(sorted(values.items()))
+            try:
+                query = self.runner.execute(sql, disable_cache=self.disable_cache)
+            except RuntimeError:
+                result.errors += 1
+                continue
+            if i >= warmup:
+                result.samples.append(SweepSample(
+                    params=values,
+                    bucket=bucket,
+                    latency_ms=query.execution_time_ms,
+                    rows=query.row_count,
+                    repeat=key in seen
+                ))
+                done = i - warmup + 1
+                if progress_every and done % progress_every == 0:
+                    print(f"  {done}/{iterations} queries...")
+            seen.add(key)
+
+        result.elapsed_s = time.perf_counter() - start
+        return result
+
+
+def print_sweep_report(result: SweepResult):
+    """Print per-bucket latency percentiles for a sweep."""
+    print(f"\n{result.name} ({result.distribution}): {len(result.samples)} queries "
+          f"in {result.elapsed_s:.1f}s, {result.errors} errors")
+    print(tabulate(
+        result.bucket_rows(),
+        headers=["Bucket", "Queries", "Keys", "p50 ms", "p95 ms", "p99 ms", "Max ms", "Avg rows"],
+        tablefmt="rounded_grid"
+    ))
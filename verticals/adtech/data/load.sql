@@ -5,6 +5,7 @@
 -- Generate sample data via SQL (works everywhere)
 -- =============================================================================
 -- Creates: 10K publishers, 1K advertisers, 100K campaigns, 10M impressions, 1M clicks
+-- Sizes are SF1; /*sf*/-marked counts scale with: python -m lib.scale <this file> --scale-factor 0.1
 -- Approximate load time: 30-120 seconds depending on engine size
 
 -- Insert sample publishers
@@ -24,7 +25,7 @@ SELECT
     END AS country,
     (1000000 + (seq % 10000000))::BIGINT AS monthly_impressions,
     (0.3 + (seq % 20) / 100.0)::DECIMAL(5,4) AS revenue_share
-FROM generate_series(1, 10000) AS t(seq);
+FROM generate_series(1, /*sf*/ 10000) AS t(seq);
 
 -- Insert sample advertisers
 INSERT INTO advertisers (advertiser_id, advertiser_name, industry, monthly_budget, target_audience)
@@ -51,13 +52,13 @@ SELECT
     CASE seq % 3 
         WHEN 0 THEN 'active' WHEN 1 THEN 'paused' ELSE 'completed' 
     END AS status
-FROM generate_series(1, 100000) AS t(seq);
+FROM generate_series(1, /*sf*/ 100000) AS t(seq);
 
 -- Insert sample ad units
 INSERT INTO ad_units (ad_unit_id, campaign_id, creative_type, size, ctr)
 SELECT 
     seq AS ad_unit_id,
-    (seq % 100000) + 1 AS campaign_id,
+    (seq % /*sf*/ 100000) + 1 AS campaign_id,
     CASE seq % 4 
         WHEN 0 THEN 'banner' WHEN 1 THEN 'video' WHEN 2 THEN 'native' 
         ELSE 'display' 
@@ -66,16 +67,16 @@ SELECT
         WHEN 0 THEN '300x250' WHEN 1 THEN '728x90' ELSE 'native' 
     END AS size,
     (0.01 + (seq % 50) / 1000.0)::DECIMAL(5,4) AS ctr
-FROM generate_series(1, 200000) AS t(seq);
+FROM generate_series(1, /*sf*/ 200000) AS t(seq);
 
 -- Insert sample impressions (the high-volume table - 10M rows)
 INSERT INTO impressions (impression_id, campaign_id, publisher_id, ad_unit_id, user_id, timestamp, device_type, browser, os, geo_country, geo_city, bid_price, win_price)
 SELECT 
     seq AS impression_id,
-    (seq % 100000) + 1 AS campaign_id,
-    (seq % 10000) + 1 AS publisher_id,
-    (seq % 200000) + 1 AS ad_unit_id,
-    (seq % 1000000) + 1 AS user_id,
+    (seq % /*sf*/ 100000) + 1 AS campaign_id,
+    (seq % /*sf*/ 10000) + 1 AS publisher_id,
+    (seq % /*sf*/ 200000) + 1 AS ad_unit_id,
+    (seq % /*sf*/ 1000000) + 1 AS user_id,
     TIMESTAMP '2024-01-01 00:00:00' + INTERVAL '1 second' * seq AS timestamp,
     CASE seq % 3 
         WHEN 0 THEN 'desktop' WHEN 1 THEN 'mobile' ELSE 'tablet' 
@@ -97,7 +98,7 @@ SELECT
     'City_' || (seq % 100)::TEXT AS geo_city,
     (0.1 + (seq % 100) / 100.0)::DECIMAL(10,4) AS bid_price,
     (0.05 + (seq % 50) / 100.0)::DECIMAL(10,4) AS win_price
-FROM generate_series(1, 10000000) AS t(seq);
+FROM generate_series(1, /*sf*/ 10000000) AS t(seq);
 
 -- Insert sample clicks (1M rows - ~10% CTR)
 INSERT INTO clicks (click_id, impression_id, timestamp, user_id, device_type, geo_country)
@@ -105,7 +106,7 @@ SELECT
     seq AS click_id,
     (seq * 10) + (seq % 100) AS impression_id,  -- ~10% of impressions
     TIMESTAMP '2024-01-01 00:00:00' + INTERVAL '1 second' * (seq * 10) AS timestamp,
-    (seq % 1000000) + 1 AS user_id,
+    (seq % /*sf*/ 1000000) + 1 AS user_id,
     CASE seq % 3 
         WHEN 0 THEN 'desktop' WHEN 1 THEN 'mobile' ELSE 'tablet' 
     END AS device_type,
@@ -115,7 +116,7 @@ SELECT
         WHEN 6 THEN 'Japan' WHEN 7 THEN 'Brazil' WHEN 8 THEN 'India' 
         ELSE 'Spain' 
     END AS geo_country
-FROM generate_series(1, 1000000) AS t(seq);
+FROM generate_series(1, /*sf*/ 1000000) AS t(seq);
 
 -- Insert sample conversions (100K rows - ~1% conversion rate)
 INSERT INTO conversions (conversion_id, click_id, impression_id, campaign_id, timestamp, conversion_type, value, user_id)
@@ -123,15 +124,15 @@ SELECT
     seq AS conversion_id,
     (seq * 10) + (seq % 100) AS click_id,
     (seq * 100) + (seq % 1000) AS impression_id,
-    (seq % 100000) + 1 AS campaign_id,
+    (seq % /*sf*/ 100000) + 1 AS campaign_id,
     TIMESTAMP '2024-01-01 00:00:00' + INTERVAL '1 second' * (seq * 100) AS timestamp,
     CASE seq % 4 
         WHEN 0 THEN 'purchase' WHEN 1 THEN 'signup' WHEN 2 THEN 'download' 
         ELSE 'lead' 
     END AS conversion_type,
     (10 + (seq % 1000))::DECIMAL(12,2) AS value,
-    (seq % 1000000) + 1 AS user_id
-FROM generate_series(1, 100000) AS t(seq);
+    (seq % /*sf*/ 1000000) + 1 AS user_id
+FROM generate_series(1, /*sf*/ 100000) AS t(seq);
 
 -- =============================================================================
 -- VERIFICATION
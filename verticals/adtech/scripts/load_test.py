@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Open-loop QPS load test for the AdTech vertical.
+
+Fires a mix of the AdTech benchmark queries and parameterized point lookups
+on impressions/campaigns at increasing target arrival rates (Poisson
+schedule) and reports coordinated-omission-corrected latency percentiles
+and achieved QPS for each rate step -- the saturation curve.
+
+Usage:
+  python verticals/adtech/scripts/load_test.py --rates 5,10,25,50,100 --duration 30
+  python verticals/adtech/scripts/load_test.py --mix lookups --rates 50,100,200
+
+Requires the AdTech schema and data (verticals/adtech/data/load.sql).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib.util
+import random
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+sys.path.insert(0, str(REPO_ROOT))
+
+from lib.firebolt_async import AsyncFireboltRunner
+from lib.loadgen import OpenLoopLoadGenerator, print_load_report
+
+
+def _load_benchmark_queries() -> dict:
+    """Reuse the QUERIES dict from the aggregating indexes benchmark."""
+    path = REPO_ROOT / "verticals" / "adtech" / "features" / "aggregating_indexes" / "benchmark.py"
+    spec = importlib.util.spec_from_file_location("adtech_agg_benchmark", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.QUERIES
+
+
+POINT_LOOKUPS = {
+    "Impression Lookup": """
+        SELECT impression_id, campaign_id, publisher_id, timestamp, device_type, win_price
+        FROM impressions
+        WHERE impression_id = {impression_id}
+    """,
+    "Campaign Lookup": """
+        SELECT campaign_id, advertiser_id, campaign_name, budget, status
+        FROM campaigns
+        WHERE campaign_id = {campaign_id}
+    """,
+    "Campaign Spend On Day": """
+        SELECT COUNT(*) AS impressions, SUM(win_price) AS spend
+        FROM impressions
+        WHERE campaign_id = {campaign_id}
+          AND timestamp >= TIMESTAMP '{day}'
+          AND timestamp < TIMESTAMP '{day}' + INTERVAL '1 day'
+    """,
+}
+
+
+async def _max_id(runner: AsyncFireboltRunner, table: str, column: str) -> int:
+    result = await runner.execute(f"SELECT MAX({column}) AS max_id FROM {table}")
+    max_id = result.data[0]["max_id"] if result.row_count else None
+    if not max_id:
+        raise RuntimeError(f"{table} is empty; load verticals/adtech/data/load.sql first")
+    return int(max_id)
+
+
+async def _day_range(runner: AsyncFireboltRunner, table: str, column: str) -> tuple[date, date]:
+    """First and last day covered by a timestamp column (the sample data is not current)."""
+    result = await runner.execute(f"SELECT MIN({column}) AS first, MAX({column}) AS last FROM {table}")
+    row = result.data[0] if result.row_count else {}
+    if row.get("first") is None:
+        raise RuntimeError(f"{table} is empty; load verticals/adtech/data/load.sql first")
+    return date.fromisoformat(str(row["first"])[:10]), date.fromisoformat(str(row["last"])[:10])
+
+
+def build_query_source(mix: str, max_impression_id: int, max_campaign_id: int, days: tuple[date, date]):
+    """Return a next_query(rng) callable for the chosen mix."""
+    analytics = [info["sql"] for info in _load_benchmark_queries().values()]
+    lookups = list(POINT_LOOKUPS.values())
+
+    if mix == "analytics":
+        templates = analytics
+    elif mix == "lookups":
+        templates = lookups
+    else:
+        # Mostly point lookups with some dashboard queries, like a serving API
+        templates = lookups * 3 + analytics
+
+    first_day, last_day = days
+    span_days = (last_day - first_day).days
+
+    def next_query(rng: random.Random) -> str:
+        template = rng.choice(templates)
+        return template.format(
+            impression_id=rng.randint(1, max_impression_id),
+            campaign_id=rng.randint(1, max_campaign_id),
+            day=(first_day + timedelta(days=rng.randint(0, span_days))).isoformat(),
+        )
+
+    return next_query
+
+
+async def run(args):
+    rates = [float(r) for r in args.rates.split(",") if r.strip()]
+
+    # No query labels: nothing here reads query history, and on Cloud each
+    # label would add a SET round trip to every request
+    async with AsyncFireboltRunner(max_connections=args.max_in_flight, label_queries=False) as runner:
+        max_impression_id = await _max_id(runner, "impressions", "impression_id")
+        max_campaign_id = await _max_id(runner, "campaigns", "campaign_id")
+        days = await _day_range(runner, "impressions", "timestamp")
+
+        generator = OpenLoopLoadGenerator(
+            runner,
+            build_query_source(args.mix, max_impression_id, max_campaign_id, days),
+            max_in_flight=args.max_in_flight,
+            disable_cache=not args.allow_cache,
+        )
+
+        print("=" * 70)
+        print("ADTECH OPEN-LOOP LOAD TEST")
+        print(f"Mix: {args.mix} | Rates: {args.rates} QPS | {args.duration:g}s per step")
+        print("=" * 70)
+
+        results = await generator.run(rates, args.duration, seed=args.seed)
+
+    print()
+    print_load_report(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AdTech open-loop QPS load test")
+    parser.add_argument("--rates", default="5,10,25,50,100",
+                        help="Comma-separated target arrival rates in QPS (default: 5,10,25,50,100)")
+    parser.add_argument("--duration", type=float, default=30.0,
+                        help="Seconds per rate step (default: 30)")
+    parser.add_argument("--mix", choices=["mixed", "lookups", "analytics"], default="mixed",
+                        help="Query mix (default: mixed)")
+    parser.add_argument("--max-in-flight", type=int, default=256,
+                        help="Cap on concurrent requests; excess arrivals queue (default: 256)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for arrivals and parameters")
+    parser.add_argument("--allow-cache", action="store_true",
+                        help="Leave the engine result cache enabled")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@
 -- OPTION A: Generate sample data via SQL (DEFAULT - works everywhere)
 -- =============================================================================
 -- Creates: ~100K events per table (AWS, Azure, GCP)
+-- Sizes are SF1; /*sf*/-marked counts scale with: python -m lib.scale <this file> --scale-factor 0.1
 -- Includes DeleteInstance and similar destructive events for anomaly detection demos
 -- Approximate load time: 30-90 seconds depending on engine size
 
@@ -33,7 +34,7 @@ SELECT
     NULL AS current_state,
     NULL AS previous_state,
     NULL AS src
-FROM generate_series(1, 100000) AS t(seq);
+FROM generate_series(1, /*sf*/ 100000) AS t(seq);
 
 -- Azure Activity Log events
 INSERT INTO azure_events (event_time, event_name, event_source, username, source_ip, instance_id, current_state, previous_state, src)
@@ -54,7 +55,7 @@ SELECT
     NULL AS current_state,
     NULL AS previous_state,
     NULL AS src
-FROM generate_series(1, 100000) AS t(seq);
+FROM generate_series(1, /*sf*/ 100000) AS t(seq);
 
 -- GCP Audit Log events
 INSERT INTO gcp_events (event_time, event_name, event_source, username, source_ip, instance_id, current_state, previous_state, src)
@@ -75,7 +76,7 @@ SELECT
     NULL AS current_state,
     NULL AS previous_state,
     NULL AS src
-FROM generate_series(1, 100000) AS t(seq);
+FROM generate_series(1, /*sf*/ 100000) AS t(seq);
 
 -- =============================================================================
 -- VERIFICATION
@@ -4,13 +4,20 @@ Sample Data Generator for CyberTech Vertical
 Generates synthetic multi-cloud security audit log events for Firebolt Core
 (local development) when S3 access is not available. Includes controlled
 anomaly injection for anomaly detection demos.
+
+Every row is tagged with its chunk in `src`, so a rerun keeps what is
+already loaded: an interrupted load resumes and a complete one is skipped
+(see lib/checkpoint.py). Use --fresh to reload from scratch.
 """
 
 import os
 import random
+from concurrent.futures import Executor, ProcessPoolExecutor
 from datetime import datetime, timedelta
+from functools import partial
 from pathlib import Path
 import sys
+from typing import Optional
 
 # Default database for CyberTech vertical (override with FIREBOLT_DATABASE env)
 os.environ.setdefault("FIREBOLT_DATABASE", "cybertech")
@@ -18,11 +25,23 @@ os.environ.setdefault("FIREBOLT_DATABASE", "cybertech")
 # Add lib to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
+from lib.checkpoint import print_resume_plan, record_checkpoint, resume_plan, resume_spec
+from lib.file_ingest import DEFAULT_FILE_ROWS, DEFAULT_ROW_GROUP_ROWS, FILE_FORMATS, check_format, stage_batch
 from lib.firebolt import FireboltRunner
+from lib.ingest import (
+    DEFAULT_UPLOADERS, DEFAULT_WORKERS, BatchSizer, PipelineStats, parse_batch_rows, pinned_batch_rows,
+    print_pipeline_stats, run_pipeline
+)
+from lib.load_scheduler import DEFAULT_PARALLELISM, LoadPlan, print_load_report
+from lib.scale import (
+    CHUNK_ROWS, Chunk, ChunkFeed, DataSpec, add_scale_arguments, chunk_seed, chunk_tasks, spec_from_args, task_columns
+)
 
 
 # Configuration
-NUM_EVENTS_PER_TABLE = 100_000  # ~100K events per table for meaningful benchmarks
+SF1_EVENTS_PER_TABLE = 100_000  # ~100K events per table at SF1 for meaningful benchmarks
+BATCH_ROWS = 5000  # Rows per INSERT to start from; tuned while loading unless pinned
+TAG_COLUMN = "src"  # Holds each row's chunk tag, for resumable loads (see lib/checkpoint.py)
 
 # AWS CloudTrail event types (name, weight, is_destructive)
 AWS_EVENTS = [
@@ -54,15 +73,22 @@ AWS_USERS = [f"user.aws_{i}" for i in range(1, 31)] + ["contractor.alex", "servi
 AZURE_USERS = [f"user.azure_{i}" for i in range(1, 26)] + ["bob.martinez", "carlos.contractor"]
 GCP_USERS = [f"user.gcp_{i}" for i in range(1, 21)] + ["eve.developer", "dana.admin"]
 
+# Per table: (event types, users, event source prefix, instance id prefix, spike users)
+CLOUDS = {
+    "events": (AWS_EVENTS, AWS_USERS, "ec2.amazonaws", "i-", ["contractor.alex", "service.account.deploy"]),
+    "azure_events": (AZURE_EVENTS, AZURE_USERS, "microsoft.compute", "vm-", ["bob.martinez", "carlos.contractor"]),
+    "gcp_events": (GCP_EVENTS, GCP_USERS, "compute.googleapis", "gce-", ["eve.developer", "dana.admin"]),
+}
+
 
 def _escape(s: str) -> str:
     """Escape single quotes for SQL."""
     return s.replace("'", "''") if s else ""
 
 
-def _weighted_choice(events: list) -> str:
+def _weighted_choice(events: list, rng: random.Random = random) -> str:
     """Select event by weight."""
-    r = random.random()
+    r = rng.random()
     cum = 0
     for name, weight in events:
         cum += weight
@@ -71,65 +97,131 @@ def _weighted_choice(events: list) -> str:
     return events[-1][0]
 
 
+def _events_chunk(spec: DataSpec, chunk: Chunk) -> dict[str, list]:
+    """One chunk of cloud events as named columns (state columns are left NULL)."""
+    events_list, users, event_source_prefix, instance_prefix, spike_users = CLOUDS[chunk.table]
+    rng = random.Random(chunk_seed(spec, chunk))
+    anchor = datetime.fromisoformat(spec.as_of)
+    columns: dict[str, list] = {
+        name: [] for name in ("event_time", "event_name", "event_source", "username", "source_ip", "instance_id")
+    }
+
+    for _ in range(chunk.rows):
+        user = rng.choice(users)
+        ts = anchor - timedelta(
+            days=rng.randint(0, 30),
+            hours=rng.randint(0, 23),
+            minutes=rng.randint(0, 59),
+        )
+
+        # Anomaly injection: spike users have higher delete probability during some hours
+        is_spike = user in spike_users and ts.hour in (9, 14, 22)
+        if is_spike and rng.random() < 0.15:
+            # Force a delete event during spike
+            destructive = [e for e in events_list if "delete" in e[0].lower() or "Delete" in e[0]]
+            event_name = rng.choice(destructive)[0] if destructive else events_list[-1][0]
+        else:
+            event_name = _weighted_choice(events_list, rng)
+
+        columns["event_time"].append(ts.strftime("%Y-%m-%d %H:%M:%S"))
+        columns["event_name"].append(event_name)
+        columns["event_source"].append(f"{event_source_prefix}.com")
+        columns["username"].append(user)
+        columns["source_ip"].append(f"10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}")
+        columns["instance_id"].append(f"{instance_prefix}{rng.randint(1000, 9999)}")
+
+    return columns
+
+
+def _events_batch(table: str, task: tuple) -> tuple[str, int]:
+    """INSERT for one (spec, chunks) task of cloud events (runs in an ingest worker)."""
+    c = task_columns(_events_chunk, task, TAG_COLUMN)
+    values = [
+        f"('{event_time}', '{_escape(event_name)}', '{event_source}', "
+        f"'{_escape(user)}', '{source_ip}', '{instance_id}', NULL, NULL, '{tag}')"
+        for event_time, event_name, event_source, user, source_ip, instance_id, tag in zip(*c.values())
+    ]
+
+    sql = f"""
+    INSERT INTO {table} (event_time, event_name, event_source, username, source_ip, instance_id, current_state, previous_state, src)
+    VALUES {', '.join(values)}
+    """
+    return sql, len(values)
+
+
 def _generate_events(
     runner: FireboltRunner,
     table: str,
-    events_list: list,
-    users: list,
-    count: int,
-    event_source_prefix: str,
-    instance_prefix: str,
-    spike_users: list,
-):
-    """Generate events for a cloud table with anomaly injection."""
-    print(f"Generating {count:,} events for {table}...")
-
-    batch_size = 5000
-    for batch_start in range(0, count, batch_size):
-        batch_end = min(batch_start + batch_size, count)
-        values = []
-
-        for _ in range(batch_start, batch_end):
-            user = random.choice(users)
-            ts = datetime.now() - timedelta(
-                days=random.randint(0, 30),
-                hours=random.randint(0, 23),
-                minutes=random.randint(0, 59),
-            )
-            event_time = ts.strftime("%Y-%m-%d %H:%M:%S")
-
-            # Anomaly injection: spike users have higher delete probability during some hours
-            is_spike = user in spike_users and ts.hour in (9, 14, 22)
-            if is_spike and random.random() < 0.15:
-                # Force a delete event during spike
-                destructive = [e for e in events_list if "delete" in e[0].lower() or "Delete" in e[0]]
-                event_name = random.choice(destructive)[0] if destructive else events_list[-1][0]
-            else:
-                event_name = _weighted_choice(events_list)
-
-            event_source = f"{event_source_prefix}.com"
-            source_ip = f"10.{random.randint(0, 255)}.{random.randint(0, 255)}.{random.randint(1, 254)}"
-            instance_id = f"{instance_prefix}{random.randint(1000, 9999)}"
-
-            values.append(
-                f"('{event_time}', '{_escape(event_name)}', '{event_source}', "
-                f"'{_escape(user)}', '{source_ip}', '{instance_id}', NULL, NULL, NULL)"
-            )
-
-        sql = f"""
-        INSERT INTO {table} (event_time, event_name, event_source, username, source_ip, instance_id, current_state, previous_state, src)
-        VALUES {', '.join(values)}
-        """
-        runner.execute(sql)
-
-        if batch_end % 25000 == 0:
-            print(f"  {batch_end:,} events inserted")
+    spec: DataSpec,
+    workers: int = DEFAULT_WORKERS,
+    uploaders: int = DEFAULT_UPLOADERS,
+    executor: Optional[Executor] = None,
+    ingest: str = "sql",
+    file_rows: int = DEFAULT_FILE_ROWS,
+    batch_rows: Optional[int] = None,
+    fresh: bool = False,
+) -> Optional[PipelineStats]:
+    """
+    Generate events for a cloud table with anomaly injection.
+
+    Chunks already loaded for this spec are kept, so an interrupted load
+    resumes and a complete one is skipped (returns None); `fresh` reloads
+    everything. INSERT batches are resized to the throughput the engine sustains
+    unless `batch_rows` pins them. With ingest="parquet" or "csv", each `file_rows` events are staged as a
+    file and loaded with COPY instead of INSERT ... VALUES (Core only).
+    """
+    count = spec.rows(SF1_EVENTS_PER_TABLE)
+    plan = resume_plan(runner, table, spec, count, TAG_COLUMN, fresh=fresh)
+    print_resume_plan(plan)
+    if plan.up_to_date:
+        return None
+    print(f"Generating {plan.rows:,} of {count:,} events for {table} ({spec.label})...")
+
+    # Chunks are seeded from (seed, table, chunk index), so worker processes
+    # share no random state and the batch size does not change the data
+    sizer = None
+    if ingest == "sql":
+        build = partial(_events_batch, table)
+        sizer = BatchSizer(batch_rows or BATCH_ROWS, min_rows=CHUNK_ROWS, pinned=batch_rows is not None)
+        tasks = ChunkFeed(spec, table, count, plan.chunks)
+    else:
+        build = partial(stage_batch, partial(task_columns, _events_chunk, tag_column=TAG_COLUMN), table,
+                        check_format(ingest), DEFAULT_ROW_GROUP_ROWS)
+        tasks = chunk_tasks(spec, table, count, file_rows, plan.chunks)
+    stats = run_pipeline(
+        runner, build, tasks, name=table, workers=workers, uploaders=uploaders,
+        executor=executor, progress_rows=25000, sizer=sizer
+    )
+    record_checkpoint(runner, table, spec, TAG_COLUMN)
 
     print(f"  Done: {count:,} events in {table}")
+    return stats
 
 
 def main():
     """Generate all sample data."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="CyberTech sample data generator")
+    parser.add_argument("--parallelism", type=int, default=DEFAULT_PARALLELISM,
+                        help=f"Tables generated at once (default: {DEFAULT_PARALLELISM})")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Processes building INSERT batches (default: {DEFAULT_WORKERS}; 0 = none)")
+    parser.add_argument("--uploaders", type=int, default=DEFAULT_UPLOADERS,
+                        help=f"Concurrent INSERTs per table (default: {DEFAULT_UPLOADERS})")
+    parser.add_argument("--ingest", choices=("sql",) + FILE_FORMATS, default="sql",
+                        help="Load as INSERT ... VALUES (default) or staged files plus COPY (Core)")
+    parser.add_argument("--file-rows", type=int, default=DEFAULT_FILE_ROWS,
+                        help=f"Rows per staged file with --ingest parquet/csv (default: {DEFAULT_FILE_ROWS})")
+    parser.add_argument("--batch-rows", type=parse_batch_rows, default=os.getenv("PLG_BATCH_ROWS", "auto"),
+                        help="Rows per INSERT: auto (tune to throughput, default), N, or table=N,... to pin")
+    parser.add_argument("--fresh", action="store_true",
+                        help="Reload every table, replacing data of another scale factor, seed or as-of date, "
+                             "instead of resuming or skipping what is already loaded")
+    add_scale_arguments(parser)
+    args = parser.parse_args()
+    spec = spec_from_args(args)
+
     print("=" * 60)
     print("CyberTech Vertical Sample Data Generator")
     print("=" * 60)
@@ -144,20 +236,27 @@ def main():
     schema_path = Path(__file__).parent.parent / "schema" / "01_tables.sql"
     runner.execute_file(schema_path)
 
+    # Without --as-of, keep the date the tables were (partly) loaded with
+    if not args.as_of and not args.fresh:
+        spec = resume_spec(runner, spec, list(CLOUDS))
+
     # Generate data
+    # The three event tables are independent, so they load concurrently,
+    # sharing one pool of batch-building processes
     print("\nGenerating sample data (with anomaly injection)...")
-    _generate_events(
-        runner, "events", AWS_EVENTS, AWS_USERS, NUM_EVENTS_PER_TABLE,
-        "ec2.amazonaws", "i-", ["contractor.alex", "service.account.deploy"],
-    )
-    _generate_events(
-        runner, "azure_events", AZURE_EVENTS, AZURE_USERS, NUM_EVENTS_PER_TABLE,
-        "microsoft.compute", "vm-", ["bob.martinez", "carlos.contractor"],
-    )
-    _generate_events(
-        runner, "gcp_events", GCP_EVENTS, GCP_USERS, NUM_EVENTS_PER_TABLE,
-        "compute.googleapis", "gce-", ["eve.developer", "dana.admin"],
-    )
+    pipelines: list[PipelineStats] = []
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        load = partial(_generate_events, workers=args.workers, uploaders=args.uploaders,
+                       executor=pool if args.workers else None, ingest=args.ingest, file_rows=args.file_rows,
+                       fresh=args.fresh)
+        plan = LoadPlan()
+        for table in CLOUDS:
+            plan.add_callable(table, lambda r, t=table: pipelines.append(
+                load(r, t, spec, batch_rows=pinned_batch_rows(args.batch_rows, t))
+            ), writes={table})
+        print_load_report(plan.run(runner, parallelism=args.parallelism, verbose=False))
+    for stats in filter(None, pipelines):
+        print_pipeline_stats(stats)
 
     # Verify
     print("\n" + "=" * 60)
@@ -171,7 +270,7 @@ def main():
     """)
 
     for row in result.data:
-        print(f"  {row['table_name']}: {int(row['row_count']):,} rows")
+        print(f"  {row['table_name']}: {row['row_count']:,} rows")
 
     print("\nSample data generation complete!")
     runner.close()
@@ -5,6 +5,7 @@
 -- OPTION A: Generate sample data via SQL (DEFAULT - works everywhere)
 -- =============================================================================
 -- Creates: 100K customers, 10K products, 1M orders, 5M order items
+-- Sizes are SF1; /*sf*/-marked counts scale with: python -m lib.scale <this file> --scale-factor 0.1
 -- Approximate load time: 10-60 seconds depending on engine size
 
 -- Insert sample customers
@@ -27,7 +28,7 @@ SELECT
     END AS tier,
     (seq % 100) AS total_orders,
     (seq % 10000)::DECIMAL(12,2) AS lifetime_value
-FROM generate_series(1, 100000) AS t(seq);
+FROM generate_series(1, /*sf*/ 100000) AS t(seq);
 
 -- Insert sample categories
 INSERT INTO categories (category_id, category_name, parent_category_id, level)
@@ -51,7 +52,7 @@ SELECT
     CASE seq % 20 WHEN 0 THEN 'out_of_stock' WHEN 1 THEN 'discontinued' ELSE 'active' END AS status,
     TIMESTAMP '2022-01-01 00:00:00' + INTERVAL '1 day' * (seq % 730) AS created_at,
     TIMESTAMP '2022-01-01 00:00:00' + INTERVAL '1 day' * (seq % 730) AS updated_at
-FROM generate_series(1, 10000) AS t(seq);
+FROM generate_series(1, /*sf*/ 10000) AS t(seq);
 
 -- Insert sample warehouses
 INSERT INTO warehouses (warehouse_id, warehouse_name, country, region, address)
@@ -70,7 +71,7 @@ FROM generate_series(1, 20) AS t(seq);
 INSERT INTO orders (order_id, customer_id, order_date, status, total_amount, shipping_cost, tax_amount, discount_amount, payment_method)
 SELECT 
     seq AS order_id,
-    (seq % 100000) + 1 AS customer_id,
+    (seq % /*sf*/ 100000) + 1 AS customer_id,
     TIMESTAMP '2023-01-01 00:00:00' + INTERVAL '1 second' * seq AS order_date,
     CASE seq % 5 
         WHEN 0 THEN 'pending' WHEN 1 THEN 'processing' WHEN 2 THEN 'shipped' 
@@ -84,31 +85,31 @@ SELECT
         WHEN 0 THEN 'credit_card' WHEN 1 THEN 'paypal' WHEN 2 THEN 'debit_card' 
         ELSE 'bank_transfer' 
     END AS payment_method
-FROM generate_series(1, 1000000) AS t(seq);
+FROM generate_series(1, /*sf*/ 1000000) AS t(seq);
 
 -- Insert sample order items (the high-volume table - 5M rows)
 INSERT INTO order_items (order_item_id, order_id, product_id, quantity, unit_price, discount, subtotal, created_at)
 SELECT 
     seq AS order_item_id,
-    (seq % 1000000) + 1 AS order_id,
-    (seq % 10000) + 1 AS product_id,
+    (seq % /*sf*/ 1000000) + 1 AS order_id,
+    (seq % /*sf*/ 10000) + 1 AS product_id,
     (seq % 5) + 1 AS quantity,
     (50 + (seq % 500))::DECIMAL(10,2) AS unit_price,
     (seq % 10)::DECIMAL(10,2) AS discount,
     (quantity * unit_price - discount)::DECIMAL(12,2) AS subtotal,
     TIMESTAMP '2023-01-01 00:00:00' + INTERVAL '1 second' * (seq % 1000000) AS created_at
-FROM generate_series(1, 5000000) AS t(seq);
+FROM generate_series(1, /*sf*/ 5000000) AS t(seq);
 
 -- Insert sample inventory
 INSERT INTO inventory (inventory_id, product_id, warehouse_id, quantity, reserved_quantity, last_updated)
 SELECT 
     seq AS inventory_id,
-    (seq % 10000) + 1 AS product_id,
+    (seq % /*sf*/ 10000) + 1 AS product_id,
     (seq % 20) + 1 AS warehouse_id,
     (seq % 1000) + 10 AS quantity,
     (seq % 50) AS reserved_quantity,
     TIMESTAMP '2024-01-01 00:00:00' + INTERVAL '1 hour' * (seq % 8760) AS last_updated
-FROM generate_series(1, 200000) AS t(seq);
+FROM generate_series(1, /*sf*/ 200000) AS t(seq);
 
 -- =============================================================================
 -- VERIFICATION
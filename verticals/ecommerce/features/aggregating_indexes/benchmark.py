@@ -11,7 +11,10 @@ from pathlib import Path
 # Add repo root to path
 sys.path.insert(0, str(Path(__file__).resolve().parents[4]))
 
-from lib.firebolt import FireboltRunner, BenchmarkResult
+from lib.firebolt import (
+    DEFAULT_QUERY_TIMEOUT_S, DEFAULT_SUITE_BUDGET_S, BenchmarkResult, FireboltRunner, QueryTimeout,
+)
+from lib.results_store import record_benchmark_run
 
 
 QUERIES = {
@@ -125,8 +128,18 @@ DROP AGGREGATING INDEX IF EXISTS order_items_order_agg ON order_items;
 """
 
 
-def run_full_benchmark(runner: FireboltRunner, iterations: int = 3):
-    """Run the complete benchmark suite."""
+def run_full_benchmark(
+    runner: FireboltRunner,
+    iterations: int = 3,
+    query_timeout_s: float = DEFAULT_QUERY_TIMEOUT_S,
+    time_budget_s: float = DEFAULT_SUITE_BUDGET_S
+):
+    """
+    Run the complete benchmark suite.
+
+    Query runs past `query_timeout_s` are cancelled on the server and
+    skipped; the whole suite is bounded by `time_budget_s`.
+    """
     results = []
 
     print("=" * 70)
@@ -134,38 +147,52 @@ def run_full_benchmark(runner: FireboltRunner, iterations: int = 3):
     print("Proving the value of pre-computed aggregations for retail analytics")
     print("=" * 70)
 
-    print("\n[1/4] Preparing clean baseline (dropping any existing indexes)...")
-    for stmt in DROP_INDEXES_SQL.strip().split(";"):
-        stmt = stmt.strip()
-        if stmt:
+    with runner.time_budget(time_budget_s):
+        print("\n[1/4] Preparing clean baseline (dropping any existing indexes)...")
+        for stmt in DROP_INDEXES_SQL.strip().split(";"):
+            stmt = stmt.strip()
+            if stmt:
+                try:
+                    runner.execute(stmt)
+                except Exception:
+                    pass
+
+        print("\n[2/4] Running BASELINE queries (without aggregating indexes)...")
+        baselines = {}
+        for name, query_info in QUERIES.items():
+            print(f"  - {name}...")
+            try:
+                baselines[name] = runner.benchmark(query_info["sql"], iterations=iterations,
+                                                   timeout_s=query_timeout_s)
+            except QueryTimeout as e:
+                print(f"    Skipped: {e}")
+
+        print("\n[3/4] Creating aggregating indexes...")
+        try:
+            for stmt in CREATE_INDEXES_SQL.strip().split(";"):
+                stmt = stmt.strip()
+                if stmt:
+                    runner.execute(stmt)
+            print("  Indexes created successfully")
+        except QueryTimeout as e:
+            print(f"  Stopped: {e}")
+            baselines = {}
+
+        print("\n[4/4] Running OPTIMIZED queries (with aggregating indexes)...")
+        for name in baselines:
+            print(f"  - {name}...")
             try:
-                runner.execute(stmt)
-            except Exception:
-                pass
-
-    print("\n[2/4] Running BASELINE queries (without aggregating indexes)...")
-    baselines = {}
-    for name, query_info in QUERIES.items():
-        print(f"  - {name}...")
-        baselines[name] = runner.benchmark(query_info["sql"], iterations=iterations)
-
-    print("\n[3/4] Creating aggregating indexes...")
-    for stmt in CREATE_INDEXES_SQL.strip().split(";"):
-        stmt = stmt.strip()
-        if stmt:
-            runner.execute(stmt)
-    print("  Indexes created successfully")
-
-    print("\n[4/4] Running OPTIMIZED queries (with aggregating indexes)...")
-    for name, query_info in QUERIES.items():
-        print(f"  - {name}...")
-        optimized = runner.benchmark(query_info["sql"], iterations=iterations)
-        result = BenchmarkResult(
-            name=name,
-            baseline=baselines[name],
-            optimized=optimized
-        )
-        results.append(result)
+                optimized = runner.benchmark(QUERIES[name]["sql"], iterations=iterations,
+                                             timeout_s=query_timeout_s)
+            except QueryTimeout as e:
+                print(f"    Skipped: {e}")
+                continue
+            result = BenchmarkResult(
+                name=name,
+                baseline=baselines[name],
+                optimized=optimized
+            )
+            results.append(result)
 
     print("\n" + "=" * 70)
     print("RESULTS")
@@ -196,6 +223,12 @@ def main():
     parser.add_argument("--query", choices=list(QUERIES.keys()), help="Run single query only")
     parser.add_argument("--iterations", type=int, default=3, help="Iterations per query")
     parser.add_argument("--keep-indexes", action="store_true", help="Don't drop indexes after")
+    parser.add_argument("--record", action="store_true", help="Save results to the benchmark result store")
+    parser.add_argument("--tag", help="Label for the recorded run (e.g. an engine version)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_QUERY_TIMEOUT_S,
+                        help="Cancel any single query run after this many seconds")
+    parser.add_argument("--time-budget", type=float, default=DEFAULT_SUITE_BUDGET_S,
+                        help="Seconds for the whole suite; queries still running are cancelled")
     args = parser.parse_args()
 
     runner = FireboltRunner()
@@ -218,7 +251,11 @@ def main():
             optimized = runner.benchmark(query_info["sql"], iterations=args.iterations)
             BenchmarkResult(name=args.query, baseline=baseline, optimized=optimized).print_comparison()
         else:
-            run_full_benchmark(runner, iterations=args.iterations)
+            results = run_full_benchmark(runner, iterations=args.iterations,
+                                         query_timeout_s=args.timeout, time_budget_s=args.time_budget)
+            if args.record:
+                record_benchmark_run(runner, "ecommerce/aggregating_indexes", results,
+                                     tables=["order_items", "products"], tag=args.tag)
             if not args.keep_indexes:
                 for stmt in DROP_INDEXES_SQL.strip().split(";"):
                     if stmt.strip():
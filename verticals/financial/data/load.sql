@@ -5,6 +5,7 @@
 -- Generate sample data via SQL (works everywhere)
 -- =============================================================================
 -- Creates: 100K customers, 500K accounts, 10M transactions, 10K portfolios
+-- Sizes are SF1; /*sf*/-marked counts scale with: python -m lib.scale <this file> --scale-factor 0.1
 -- Approximate load time: 30-120 seconds depending on engine size
 
 -- Insert sample customers
@@ -27,7 +28,7 @@ SELECT
         WHEN 6 THEN 'Japan' WHEN 7 THEN 'Brazil' WHEN 8 THEN 'India' 
         ELSE 'Spain' 
     END AS country
-FROM generate_series(1, 100000) AS t(seq);
+FROM generate_series(1, /*sf*/ 100000) AS t(seq);
 
 -- Insert sample merchants
 INSERT INTO merchants (merchant_id, merchant_name, category, risk_score)
@@ -39,7 +40,7 @@ SELECT
         WHEN 3 THEN 'online' ELSE 'atm' 
     END AS category,
     (1.0 + (seq % 50) / 10.0)::DECIMAL(5,2) AS risk_score
-FROM generate_series(1, 10000) AS t(seq);
+FROM generate_series(1, /*sf*/ 10000) AS t(seq);
 
 -- Insert sample securities
 INSERT INTO securities (security_id, symbol, name, asset_class, exchange, sector)
@@ -56,13 +57,13 @@ SELECT
         WHEN 3 THEN 'TSE' ELSE 'OTC' 
     END AS exchange,
     'Sector_' || (seq % 10)::TEXT AS sector
-FROM generate_series(1, 10000) AS t(seq);
+FROM generate_series(1, /*sf*/ 10000) AS t(seq);
 
 -- Insert sample accounts
 INSERT INTO accounts (account_id, customer_id, account_type, balance, currency, opened_date, status)
 SELECT 
     seq AS account_id,
-    (seq % 100000) + 1 AS customer_id,
+    (seq % /*sf*/ 100000) + 1 AS customer_id,
     CASE seq % 4 
         WHEN 0 THEN 'checking' WHEN 1 THEN 'savings' WHEN 2 THEN 'investment' 
         ELSE 'credit' 
@@ -76,14 +77,14 @@ SELECT
     CASE seq % 100 
         WHEN 0 THEN 'closed' WHEN 1 THEN 'frozen' ELSE 'active' 
     END AS status
-FROM generate_series(1, 500000) AS t(seq);
+FROM generate_series(1, /*sf*/ 500000) AS t(seq);
 
 -- Insert sample transactions (the high-volume table - 10M rows)
 INSERT INTO transactions (transaction_id, account_id, merchant_id, timestamp, amount, currency, transaction_type, category, risk_score, status, location_country, device_type, fraud_flag)
 SELECT 
     seq AS transaction_id,
-    (seq % 500000) + 1 AS account_id,
-    (seq % 10000) + 1 AS merchant_id,
+    (seq % /*sf*/ 500000) + 1 AS account_id,
+    (seq % /*sf*/ 10000) + 1 AS merchant_id,
     TIMESTAMP '2024-01-01 00:00:00' + INTERVAL '1 second' * seq AS timestamp,
     (10 + (seq % 1000))::DECIMAL(15,2) AS amount,
     CASE seq % 5 
@@ -113,17 +114,17 @@ SELECT
         WHEN 0 THEN 'mobile' WHEN 1 THEN 'desktop' ELSE 'card' 
     END AS device_type,
     (seq % 1000) = 0 AS fraud_flag
-FROM generate_series(1, 10000000) AS t(seq);
+FROM generate_series(1, /*sf*/ 10000000) AS t(seq);
 
 -- Insert sample portfolios
 INSERT INTO portfolios (portfolio_id, customer_id, portfolio_name, total_value, last_updated)
 SELECT 
     seq AS portfolio_id,
-    (seq % 100000) + 1 AS customer_id,
+    (seq % /*sf*/ 100000) + 1 AS customer_id,
     'Portfolio_' || seq::TEXT AS portfolio_name,
     (10000 + (seq % 1000000))::DECIMAL(15,2) AS total_value,
     TIMESTAMP '2024-01-01 00:00:00' + INTERVAL '1 day' * (seq % 365) AS last_updated
-FROM generate_series(1, 10000) AS t(seq);
+FROM generate_series(1, /*sf*/ 10000) AS t(seq);
 
 -- =============================================================================
 -- VERIFICATION
@@ -3,165 +3,257 @@ Sample Data Generator for Gaming Vertical
 
 Generates realistic sample data for Firebolt Core (local development)
 when S3 access is not available. Uses Firebolt.io Ultra Fast Gaming schema.
+
+Sizes follow a scale factor (SF1: 10K players, 1M playstats; games stay
+at 100) and the data is deterministic: every chunk of CHUNK_ROWS rows is
+generated column-wise with NumPy from its own seed (see lib/scale.py), so
+the same --scale-factor, --seed and --as-of always load the same rows.
+Chunks are built in worker processes while earlier batches are being
+inserted (see lib/ingest.py), in INSERTs sized to the throughput the
+engine sustains (pin them with --batch-rows). With --ingest parquet or
+csv, tables are written to staged files and loaded with COPY instead
+(see lib/file_ingest.py); players always use INSERT for their ARRAY
+column.
+
+Every row is tagged with its chunk in source_file_name, so a rerun keeps
+what is already loaded: an interrupted load resumes and a complete one is
+skipped (see lib/checkpoint.py). Use --fresh to reload from scratch.
 """
 
-import random
-from datetime import datetime, timedelta
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+import os
 from pathlib import Path
 import sys
+from typing import Optional
+
+import numpy as np
 
 # Add lib to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
+from lib.compression import print_transfer_stats
+from lib.file_ingest import (
+    DEFAULT_FILE_ROWS, DEFAULT_ROW_GROUP_ROWS, FILE_FORMATS, check_format, stage_batch, text_column
+)
 from lib.firebolt import FireboltRunner
-
-
-# Configuration
-NUM_PLAYERS = 10_000
-NUM_GAMES = 100
-NUM_TOURNAMENTS = 500
-NUM_PLAYSTATS = 1_000_000  # 1M events for meaningful benchmarks
+from lib.checkpoint import print_resume_plan, record_checkpoint, resume_plan, resume_spec
+from lib.ingest import (
+    DEFAULT_UPLOADERS, DEFAULT_WORKERS, BatchSizer, PipelineStats, parse_batch_rows, pinned_batch_rows,
+    print_pipeline_stats, run_pipeline
+)
+from lib.load_scheduler import DEFAULT_PARALLELISM, LoadPlan, print_load_report
+from lib.scale import (
+    CHUNK_ROWS, Chunk, ChunkFeed, DataSpec, add_scale_arguments, chunk_rng, chunk_tasks, spec_from_args, task_columns
+)
+
+
+# Rows per table at scale factor 1
+SF1_ROWS = {
+    "players": 10_000,
+    "games": 100,
+    "tournaments": 500,
+    "playstats": 1_000_000,  # 1M events for meaningful benchmarks
+}
+# Lookup tables that keep their size at every scale factor
+FIXED_TABLES = {"games"}
+
+# Rows per INSERT to start from; tuned while loading unless pinned
+BATCH_ROWS = {"players": 1000, "games": 100, "tournaments": 500, "playstats": 10000}
 
 # Reference data
 PLATFORMS = ["pc", "console", "mobile"]
 AGE_CATEGORIES = ["junior", "adult", "senior", "all"]
 GENRES = ["fps", "moba", "rpg", "sports", "racing", "puzzle", "strategy", "battle_royale"]
 PUBLISHERS = ["Riot Games", "Epic Games", "Valve", "EA Sports", "Ubisoft", "Nintendo", "Activision", "2K Games"]
-
-
-def generate_players(runner: FireboltRunner, count: int = NUM_PLAYERS):
-    """Generate sample player data (Firebolt.io schema)."""
-    print(f"Generating {count:,} players...")
-
-    batch_size = 1000
-    for batch_start in range(0, count, batch_size):
-        batch_end = min(batch_start + batch_size, count)
-
-        values = []
-        for i in range(batch_start, batch_end):
-            playerid = i + 1
-            nickname = f"player_{playerid}"
-            email = f"{nickname}@example.com"
-            agecategory = random.choice(AGE_CATEGORIES)
-            platform = random.choice(PLATFORMS)
-            platforms_arr = f"ARRAY['{platform}']"
-            registeredon = (datetime.now() - timedelta(days=random.randint(1, 1000))).strftime("%Y-%m-%d")
-            issubscribed = "true" if random.random() > 0.5 else "false"
-            internalprobabilitytowin = round(random.random(), 4)
-
-            values.append(f"({playerid}, '{nickname}', '{email}', '{agecategory}', {platforms_arr}, '{registeredon}', {issubscribed}, {internalprobabilitytowin})")
-
-        sql = f"""
-        INSERT INTO players (playerid, nickname, email, agecategory, platforms, registeredon, issubscribedtonewsletter, internalprobabilitytowin)
-        VALUES {', '.join(values)}
-        """
-        runner.execute(sql)
-
-        if (batch_end) % 5000 == 0:
-            print(f"  {batch_end:,} players inserted")
-
-    print(f"  Done: {count:,} players")
-
-
-def generate_games(runner: FireboltRunner, count: int = NUM_GAMES):
-    """Generate sample game data (Firebolt.io schema)."""
-    print(f"Generating {count:,} games...")
-
-    values = []
-    for i in range(count):
-        gameid = i + 1
-        title = f"Game_{gameid}_{random.choice(GENRES).title()}"
-        category = random.choice(GENRES)
-        launchdate = (datetime.now() - timedelta(days=random.randint(30, 2000))).strftime("%Y-%m-%d")
-
-        values.append(f"({gameid}, '{title}', '{category}', '{launchdate}')")
-
-    sql = f"""
-    INSERT INTO games (gameid, title, category, launchdate)
-    VALUES {', '.join(values)}
-    """
-    runner.execute(sql)
-    print(f"  Done: {count:,} games")
-
-
-def generate_tournaments(runner: FireboltRunner, count: int = NUM_TOURNAMENTS, num_games: int = NUM_GAMES):
-    """Generate sample tournament data (Firebolt.io schema)."""
-    print(f"Generating {count:,} tournaments...")
-
-    values = []
-    for i in range(count):
-        tournamentid = i + 1
-        gameid = random.randint(1, num_games)
-        name = f"Tournament_{tournamentid}"
-
-        start_date = datetime.now() - timedelta(days=random.randint(1, 365))
-        end_date = start_date + timedelta(days=random.randint(1, 14))
-
-        totalprizedollars = random.choice([1000, 5000, 10000, 50000, 100000])
-
-        values.append(f"({tournamentid}, '{name}', {gameid}, {totalprizedollars}, '{start_date}', '{end_date}')")
-
+PRIZES = [1000, 5000, 10000, 50000, 100000]
+
+
+def table_rows(spec: DataSpec, table: str) -> int:
+    return spec.rows(SF1_ROWS[table], scales=table not in FIXED_TABLES)
+
+
+def _choice(rng: np.random.Generator, options: list, n: int) -> np.ndarray:
+    """n values drawn uniformly from a list."""
+    return np.asarray(options)[rng.integers(0, len(options), n)]
+
+
+def _days_before(spec: DataSpec, days: np.ndarray) -> np.ndarray:
+    """Calendar dates `days` days before the as-of date, as datetime64[D]."""
+    return spec.anchor.astype("datetime64[D]") - days.astype("timedelta64[D]")
+
+
+def _prefixed(prefix: str, values: np.ndarray, suffix="") -> np.ndarray:
+    return np.char.add(np.char.add(prefix, values.astype(str)), suffix)
+
+
+def _players_chunk(spec: DataSpec, chunk: Chunk) -> dict[str, np.ndarray]:
+    rng = chunk_rng(spec, chunk)
+    n = chunk.rows
+    ids = chunk.ids()
+    nicknames = _prefixed("player_", ids)
+    return {
+        "playerid": ids,
+        "nickname": nicknames,
+        "email": np.char.add(nicknames, "@example.com"),
+        "agecategory": _choice(rng, AGE_CATEGORIES, n),
+        "platforms": _choice(rng, PLATFORMS, n),
+        "registeredon": _days_before(spec, rng.integers(1, 1001, n)),
+        "issubscribedtonewsletter": rng.random(n) > 0.5,
+        "internalprobabilitytowin": np.round(rng.random(n), 4),
+    }
+
+
+def _games_chunk(spec: DataSpec, chunk: Chunk) -> dict[str, np.ndarray]:
+    rng = chunk_rng(spec, chunk)
+    n = chunk.rows
+    ids = chunk.ids()
+    return {
+        "gameid": ids.astype(np.int32),
+        "title": np.char.add(_prefixed("Game_", ids, "_"), _choice(rng, [g.title() for g in GENRES], n)),
+        "category": _choice(rng, GENRES, n),
+        "launchdate": _days_before(spec, rng.integers(30, 2001, n)),
+    }
+
+
+def _tournaments_chunk(spec: DataSpec, chunk: Chunk) -> dict[str, np.ndarray]:
+    rng = chunk_rng(spec, chunk)
+    n = chunk.rows
+    ids = chunk.ids()
+    start_date = spec.anchor - rng.integers(1, 366, n).astype("timedelta64[D]")
+    return {
+        "tournamentid": ids.astype(np.int32),
+        "name": _prefixed("Tournament_", ids),
+        "gameid": rng.integers(1, table_rows(spec, "games") + 1, n).astype(np.int32),
+        "totalprizedollars": _choice(rng, PRIZES, n).astype(np.int32),
+        "startdatetime": start_date,
+        "enddatetime": start_date + rng.integers(1, 15, n).astype("timedelta64[D]"),
+    }
+
+
+def _playstats_chunk(spec: DataSpec, chunk: Chunk) -> dict[str, np.ndarray]:
+    """Playstats events (errorcode is left NULL)."""
+    rng = chunk_rng(spec, chunk)
+    n = chunk.rows
+
+    # Up to 90 days, 23 hours and 59 minutes before the as-of date
+    minutes_ago = rng.integers(0, 91, n) * 1440 + rng.integers(0, 24, n) * 60 + rng.integers(0, 60, n)
+
+    return {
+        "gameid": rng.integers(1, table_rows(spec, "games") + 1, n).astype(np.int32),
+        "playerid": rng.integers(1, table_rows(spec, "players") + 1, n).astype(np.int32),
+        "stattime": spec.anchor - minutes_ago.astype("timedelta64[m]"),
+        "selectedcar": _prefixed("car_", rng.integers(1, 11, n)),
+        "currentlevel": rng.integers(1, 101, n).astype(np.int32),
+        "currentspeed": np.round(rng.uniform(0, 200, n), 1),
+        "currentplaytime": rng.integers(60, 7201, n),
+        "currentscore": rng.integers(0, 10001, n),
+        "event": np.full(n, "play"),
+        "tournamentid": rng.integers(1, table_rows(spec, "tournaments") + 1, n).astype(np.int32),
+    }
+
+
+# Column holding each row's chunk tag, for resumable loads (see lib/checkpoint.py)
+TAG_COLUMN = "source_file_name"
+
+# Chunk generator and VALUES row template (in column order, tag last) per table
+_TABLES = {
+    "players": (_players_chunk, "({0}, '{1}', '{2}', '{3}', ARRAY['{4}'], '{5}', {6}, {7}, '{8}')"),
+    "games": (_games_chunk, "({0}, '{1}', '{2}', '{3}', '{4}')"),
+    "tournaments": (_tournaments_chunk, "({0}, '{1}', {2}, {3}, '{4}', '{5}', '{6}')"),
+    "playstats": (_playstats_chunk, "({0}, {1}, '{2}', '{3}', {4}, {5}, {6}, {7}, '{8}', {9}, '{10}')"),
+}
+
+# Tables that can be staged as files (no ARRAY columns)
+FILE_TABLES = ("games", "tournaments", "playstats")
+
+
+def _insert_batch(table: str, task: tuple) -> tuple[str, int]:
+    """INSERT for one (spec, chunks) task (runs in an ingest worker)."""
+    make_chunk, template = _TABLES[table]
+    columns = task_columns(make_chunk, task, TAG_COLUMN)
+    values = ", ".join(map(template.format, *(text_column(c) for c in columns.values())))
     sql = f"""
-    INSERT INTO tournaments (tournamentid, name, gameid, totalprizedollars, startdatetime, enddatetime)
-    VALUES {', '.join(values)}
+    INSERT INTO {table} ({', '.join(columns)})
+    VALUES {values}
     """
-    runner.execute(sql)
-    print(f"  Done: {count:,} tournaments")
+    return sql, sum(chunk.rows for chunk in task[1])
 
 
-def generate_playstats(
+def generate_table(
     runner: FireboltRunner,
-    count: int = NUM_PLAYSTATS,
-    num_players: int = NUM_PLAYERS,
-    num_games: int = NUM_GAMES,
-    num_tournaments: int = NUM_TOURNAMENTS
-):
-    """Generate sample playstats data (Firebolt.io schema - no stat_id)."""
-    print(f"Generating {count:,} playstats events...")
-
-    batch_size = 10000
-    for batch_start in range(0, count, batch_size):
-        batch_end = min(batch_start + batch_size, count)
-
-        values = []
-        for i in range(batch_start, batch_end):
-            playerid = random.randint(1, num_players)
-            gameid = random.randint(1, num_games)
-            tournamentid = random.randint(1, num_tournaments)
-
-            stattime = datetime.now() - timedelta(
-                days=random.randint(0, 90),
-                hours=random.randint(0, 23),
-                minutes=random.randint(0, 59)
-            )
-
-            selectedcar = f"car_{random.randint(1, 10)}"
-            currentlevel = random.randint(1, 100)
-            currentspeed = round(random.uniform(0, 200), 1)
-            currentplaytime = random.randint(60, 7200)
-            currentscore = random.randint(0, 10000)
-            event = "play"
-
-            values.append(
-                f"({gameid}, {playerid}, '{stattime}', '{selectedcar}', {currentlevel}, {currentspeed}, "
-                f"{currentplaytime}, {currentscore}, '{event}', NULL, {tournamentid})"
-            )
-
-        sql = f"""
-        INSERT INTO playstats (gameid, playerid, stattime, selectedcar, currentlevel, currentspeed,
-                               currentplaytime, currentscore, event, errorcode, tournamentid)
-        VALUES {', '.join(values)}
-        """
-        runner.execute(sql)
-
-        if (batch_end) % 100000 == 0:
-            print(f"  {batch_end:,} playstats inserted")
-
-    print(f"  Done: {count:,} playstats")
+    table: str,
+    spec: Optional[DataSpec] = None,
+    workers: int = DEFAULT_WORKERS,
+    uploaders: int = DEFAULT_UPLOADERS,
+    executor: Optional[Executor] = None,
+    ingest: str = "sql",
+    file_rows: int = DEFAULT_FILE_ROWS,
+    row_group_rows: int = DEFAULT_ROW_GROUP_ROWS,
+    batch_rows: Optional[int] = None,
+    fresh: bool = False
+) -> Optional[PipelineStats]:
+    """
+    Generate one table (Firebolt.io schema) at the spec's scale factor.
+
+    Chunks the table already holds for this spec are kept, so an
+    interrupted load resumes and a complete one is skipped (returns None);
+    `fresh` reloads everything. INSERT batches start at BATCH_ROWS and are
+    resized to the throughput the engine sustains, unless `batch_rows` pins
+    them. With ingest="parquet" or "csv", each `file_rows` rows are staged
+    as a file and loaded with COPY instead of INSERT ... VALUES (Core only).
+    """
+    spec = spec or DataSpec()
+    rows = table_rows(spec, table)
+    plan = resume_plan(runner, table, spec, rows, TAG_COLUMN, fresh=fresh)
+    print_resume_plan(plan)
+    if plan.up_to_date:
+        return None
+    print(f"Generating {plan.rows:,} of {rows:,} {table} ({spec.label})...")
+
+    sizer = None
+    if ingest == "sql" or table not in FILE_TABLES:
+        build = partial(_insert_batch, table)
+        sizer = BatchSizer(batch_rows or BATCH_ROWS[table], min_rows=CHUNK_ROWS, pinned=batch_rows is not None)
+        tasks = ChunkFeed(spec, table, rows, plan.chunks)
+    else:
+        build = partial(stage_batch, partial(task_columns, _TABLES[table][0], tag_column=TAG_COLUMN), table,
+                        check_format(ingest), row_group_rows)
+        tasks = chunk_tasks(spec, table, rows, file_rows, plan.chunks)
+    stats = run_pipeline(
+        runner, build, tasks, name=table, workers=workers, uploaders=uploaders,
+        executor=executor, progress_rows=max(5000, plan.rows // 10), sizer=sizer
+    )
+    record_checkpoint(runner, table, spec, TAG_COLUMN)
+
+    print(f"  Done: {rows:,} {table}")
+    return stats
 
 
 def main():
     """Generate all sample data."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Gaming sample data generator")
+    parser.add_argument("--parallelism", type=int, default=DEFAULT_PARALLELISM,
+                        help=f"Tables generated at once (default: {DEFAULT_PARALLELISM})")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Processes building INSERT batches (default: {DEFAULT_WORKERS}; 0 = none)")
+    parser.add_argument("--uploaders", type=int, default=DEFAULT_UPLOADERS,
+                        help=f"Concurrent INSERTs per table (default: {DEFAULT_UPLOADERS})")
+    parser.add_argument("--ingest", choices=("sql",) + FILE_FORMATS, default="sql",
+                        help="Load as INSERT ... VALUES (default) or staged files plus COPY (Core; not players)")
+    parser.add_argument("--file-rows", type=int, default=DEFAULT_FILE_ROWS,
+                        help=f"Rows per staged file with --ingest parquet/csv (default: {DEFAULT_FILE_ROWS})")
+    parser.add_argument("--batch-rows", type=parse_batch_rows, default=os.getenv("PLG_BATCH_ROWS", "auto"),
+                        help="Rows per INSERT: auto (tune to throughput, default), N, or table=N,... to pin")
+    parser.add_argument("--fresh", action="store_true",
+                        help="Reload every table, replacing data of another scale factor, seed or as-of date, "
+                             "instead of resuming or skipping what is already loaded")
+    add_scale_arguments(parser)
+    args = parser.parse_args()
+    spec = spec_from_args(args)
+
     print("=" * 60)
     print("Gaming Vertical Sample Data Generator (Firebolt.io schema)")
     print("=" * 60)
@@ -176,12 +268,28 @@ def main():
     schema_path = Path(__file__).parent.parent / "schema" / "01_tables.sql"
     runner.execute_file(schema_path)
 
-    # Generate data
-    print("\nGenerating sample data...")
-    generate_games(runner)
-    generate_players(runner)
-    generate_tournaments(runner)
-    generate_playstats(runner)
+    # Without --as-of, keep the date the tables were (partly) loaded with
+    if not args.as_of and not args.fresh:
+        spec = resume_spec(runner, spec, list(SF1_ROWS))
+
+    # Generate data; the tables are independent, so they load concurrently,
+    # sharing one pool of chunk-building processes
+    print(f"\nGenerating sample data ({spec.label})...")
+    pipelines: list[PipelineStats] = []
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        load = partial(generate_table, spec=spec, workers=args.workers, uploaders=args.uploaders,
+                       executor=pool if args.workers else None, ingest=args.ingest, file_rows=args.file_rows,
+                       fresh=args.fresh)
+        plan = LoadPlan()
+        for table in SF1_ROWS:
+            plan.add_callable(table, lambda r, table=table: pipelines.append(
+                load(r, table, batch_rows=pinned_batch_rows(args.batch_rows, table))
+            ), writes={table})
+        print_load_report(plan.run(runner, parallelism=args.parallelism, verbose=False))
+    for stats in filter(None, pipelines):
+        print_pipeline_stats(stats)
+    if runner.runtime == "core":
+        print_transfer_stats(runner.transfer_stats, runner.compression)
 
     # Verify
     print("\n" + "=" * 60)
@@ -196,7 +304,7 @@ def main():
     """)
 
     for row in result.data:
-        print(f"  {row['table_name']}: {int(row['row_count']):,} rows")
+        print(f"  {row['table_name']}: {row['row_count']:,} rows")
 
     print("\nSample data generation complete!")
     runner.close()
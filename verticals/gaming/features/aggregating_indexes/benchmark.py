@@ -11,7 +11,10 @@ from pathlib import Path
 # Add lib to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent))
 
-from lib.firebolt import FireboltRunner, BenchmarkResult
+from lib.firebolt import (
+    DEFAULT_QUERY_TIMEOUT_S, DEFAULT_SUITE_BUDGET_S, BenchmarkResult, FireboltRunner, QueryTimeout,
+)
+from lib.results_store import record_benchmark_run
 
 
 # Benchmark queries
@@ -128,8 +131,19 @@ DROP AGGREGATING INDEX IF EXISTS playstats_tournament_agg ON playstats;
 """
 
 
-def run_full_benchmark(runner: FireboltRunner, iterations: int = 3):
-    """Run the complete benchmark suite."""
+def run_full_benchmark(
+    runner: FireboltRunner,
+    iterations: int = 3,
+    query_timeout_s: float = DEFAULT_QUERY_TIMEOUT_S,
+    time_budget_s: float = DEFAULT_SUITE_BUDGET_S
+):
+    """
+    Run the complete benchmark suite.
+    
+    Each query run is cancelled on the server after `query_timeout_s`, and
+    the whole suite gets `time_budget_s`, so a runaway baseline cannot
+    starve the engine. Queries that time out are skipped in the results.
+    """
     results = []
     
     print("=" * 70)
@@ -137,37 +151,51 @@ def run_full_benchmark(runner: FireboltRunner, iterations: int = 3):
     print("Proving the value of pre-computed aggregations")
     print("=" * 70)
     
-    # Step 1: Ensure no indexes exist (clean baseline)
-    print("\n[1/4] Preparing clean baseline (dropping any existing indexes)...")
-    try:
-        runner.execute(DROP_INDEXES_SQL)
-    except:
-        pass  # Indexes may not exist
-    
-    # Step 2: Run baseline queries
-    print("\n[2/4] Running BASELINE queries (without aggregating indexes)...")
-    baselines = {}
-    for name, query_info in QUERIES.items():
-        print(f"  - {name}...")
-        baselines[name] = runner.benchmark(query_info["sql"], iterations=iterations)
-    
-    # Step 3: Create indexes
-    print("\n[3/4] Creating aggregating indexes...")
-    runner.execute(CREATE_INDEXES_SQL)
-    print("  Indexes created successfully")
-    
-    # Step 4: Run optimized queries
-    print("\n[4/4] Running OPTIMIZED queries (with aggregating indexes)...")
-    for name, query_info in QUERIES.items():
-        print(f"  - {name}...")
-        optimized = runner.benchmark(query_info["sql"], iterations=iterations)
+    with runner.time_budget(time_budget_s):
+        # Step 1: Ensure no indexes exist (clean baseline)
+        print("\n[1/4] Preparing clean baseline (dropping any existing indexes)...")
+        try:
+            runner.execute(DROP_INDEXES_SQL)
+        except:
+            pass  # Indexes may not exist
         
-        result = BenchmarkResult(
-            name=name,
-            baseline=baselines[name],
-            optimized=optimized
-        )
-        results.append(result)
+        # Step 2: Run baseline queries
+        print("\n[2/4] Running BASELINE queries (without aggregating indexes)...")
+        baselines = {}
+        for name, query_info in QUERIES.items():
+            print(f"  - {name}...")
+            try:
+                baselines[name] = runner.benchmark(query_info["sql"], iterations=iterations,
+                                                   timeout_s=query_timeout_s)
+            except QueryTimeout as e:
+                print(f"    Skipped: {e}")
+        
+        # Step 3: Create indexes
+        print("\n[3/4] Creating aggregating indexes...")
+        try:
+            runner.execute(CREATE_INDEXES_SQL)
+            print("  Indexes created successfully")
+        except QueryTimeout as e:
+            print(f"  Stopped: {e}")
+            baselines = {}
+        
+        # Step 4: Run optimized queries
+        print("\n[4/4] Running OPTIMIZED queries (with aggregating indexes)...")
+        for name in baselines:
+            print(f"  - {name}...")
+            try:
+                optimized = runner.benchmark(QUERIES[name]["sql"], iterations=iterations,
+                                             timeout_s=query_timeout_s)
+            except QueryTimeout as e:
+                print(f"    Skipped: {e}")
+                continue
+            
+            result = BenchmarkResult(
+                name=name,
+                baseline=baselines[name],
+                optimized=optimized
+            )
+            results.append(result)
     
     # Print results
     print("\n" + "=" * 70)
@@ -187,7 +215,8 @@ def run_full_benchmark(runner: FireboltRunner, iterations: int = 3):
     
     print(f"\nTotal query time WITHOUT indexes: {total_baseline_time:.0f}ms")
     print(f"Total query time WITH indexes:    {total_optimized_time:.0f}ms")
-    print(f"Overall improvement:              {total_baseline_time/total_optimized_time:.0f}X faster")
+    if total_optimized_time > 0:
+        print(f"Overall improvement:              {total_baseline_time/total_optimized_time:.0f}X faster")
     
     print("\n" + "-" * 70)
     print("KEY TAKEAWAYS:")
@@ -241,6 +270,8 @@ Examples:
   python benchmark.py                    # Run full benchmark
   python benchmark.py --query "Tournament Leaderboard"  # Single query
   python benchmark.py --iterations 5     # More iterations for accuracy
+  python benchmark.py --record --tag 4.20  # Store results for regression checks
+  python benchmark.py --timeout 30 --time-budget 300  # Cap runaway queries
         """
     )
     parser.add_argument(
@@ -259,6 +290,27 @@ Examples:
         action="store_true",
         help="Don't drop indexes after benchmark"
     )
+    parser.add_argument(
+        "--record",
+        action="store_true",
+        help="Save results to the benchmark result store (compare with python -m lib.results_store)"
+    )
+    parser.add_argument(
+        "--tag",
+        help="Label for the recorded run, e.g. an engine version"
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_QUERY_TIMEOUT_S,
+        help=f"Cancel any single query run after this many seconds (default: {DEFAULT_QUERY_TIMEOUT_S:.0f})"
+    )
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        default=DEFAULT_SUITE_BUDGET_S,
+        help=f"Seconds for the whole suite (default: {DEFAULT_SUITE_BUDGET_S:.0f})"
+    )
     
     args = parser.parse_args()
     
@@ -269,7 +321,11 @@ Examples:
         if args.query:
             run_single_query_demo(runner, args.query)
         else:
-            run_full_benchmark(runner, iterations=args.iterations)
+            results = run_full_benchmark(runner, iterations=args.iterations,
+                                         query_timeout_s=args.timeout, time_budget_s=args.time_budget)
+            if args.record:
+                record_benchmark_run(runner, "gaming/aggregating_indexes", results,
+                                     tables=["playstats"], tag=args.tag)
             
             if not args.keep_indexes:
                 print("\nCleaning up (dropping indexes)...")
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Parameter-sweep benchmark for the gaming lookup queries.
+
+The aggregating indexes benchmark times "Player Profile" for playerid 42
+and "Tournament Leaderboard" for tournament 1 only. This runs the same
+queries across many keys drawn from a distribution and reports latency
+per key-popularity bucket, the way an API serving player pages sees them.
+
+Usage:
+  python verticals/gaming/scripts/param_sweep.py --query "Player Profile" --iterations 2000
+  python verticals/gaming/scripts/param_sweep.py --distribution zipf --zipf-s 1.2
+  python verticals/gaming/scripts/param_sweep.py --distribution uniform --disable-cache
+  python verticals/gaming/scripts/param_sweep.py --hedge --hedge-percentile 90
+
+Distributions:
+  sampled   keys drawn from playstats in proportion to their row counts (default)
+  zipf      Zipf popularity over the distinct keys in playstats
+  uniform   every distinct key equally likely
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from lib.firebolt import FireboltRunner
+from lib.hedging import Hedger, print_hedge_stats
+from lib.sweep import (
+    ParameterSweep, QueryTemplate, Sampled, Uniform, Zipf,
+    distinct_values, print_sweep_report,
+)
+
+
+# Same SQL as QUERIES in features/aggregating_indexes/benchmark.py, with the
+# hard-coded keys replaced by placeholders
+TEMPLATES = {
+    "Player Profile": {
+        "keys": ["playerid"],
+        "sql": """
+            SELECT
+                gameid,
+                AVG(currentscore) as avg_score,
+                SUM(currentplaytime) as total_time,
+                MAX(currentlevel) as max_level,
+                COUNT(*) as total_sessions
+            FROM playstats
+            WHERE playerid = {playerid}
+            GROUP BY gameid
+            ORDER BY total_time DESC
+        """,
+    },
+    "Tournament Leaderboard": {
+        # A tournament belongs to one game, so the pair is drawn together
+        "keys": ["tournamentid", "gameid"],
+        "sql": """
+            SELECT
+                playerid,
+                AVG(currentscore) as avg_score,
+                SUM(currentplaytime) as total_time,
+                MAX(currentlevel) as max_level,
+                COUNT(*) as events
+            FROM playstats
+            WHERE tournamentid = {tournamentid} AND gameid = {gameid}
+            GROUP BY playerid
+            ORDER BY avg_score DESC
+            LIMIT 100
+        """,
+    },
+}
+
+
+def build_template(runner: FireboltRunner, name: str, distribution: str, zipf_s: float, seed: int) -> QueryTemplate:
+    info = TEMPLATES[name]
+    keys = info["keys"]
+    if distribution == "sampled":
+        params = Sampled("playstats", keys)
+    else:
+        values = [row[:-1] for row in distinct_values(runner, "playstats", keys)]
+        if distribution == "zipf":
+            params = Zipf(keys, values=values, s=zipf_s, seed=seed)
+        else:
+            params = Uniform(keys, values=values)
+    return QueryTemplate(name, info["sql"], [params])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gaming parameter-sweep benchmark")
+    parser.add_argument("--query", choices=list(TEMPLATES.keys()),
+                        help="Sweep one query only (default: all)")
+    parser.add_argument("--distribution", choices=["sampled", "zipf", "uniform"], default="sampled",
+                        help="How keys are drawn (default: sampled)")
+    parser.add_argument("--iterations", type=int, default=1000,
+                        help="Queries per template (default: 1000)")
+    parser.add_argument("--warmup", type=int, default=20,
+                        help="Discarded queries before timing (default: 20)")
+    parser.add_argument("--zipf-s", type=float, default=1.1,
+                        help="Zipf exponent; higher is more skewed (default: 1.1)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--disable-cache", action="store_true",
+                        help="Disable the engine result cache")
+    parser.add_argument("--hedge", action="store_true",
+                        help="Hedge slow lookups with a duplicate request")
+    parser.add_argument("--hedge-percentile", type=float, default=95.0,
+                        help="Hedge once a lookup is slower than this percentile (default: 95)")
+    args = parser.parse_args()
+
+    names = [args.query] if args.query else list(TEMPLATES.keys())
+    hedger = Hedger(hedge_percentile=args.hedge_percentile) if args.hedge else None
+    runner = FireboltRunner(hedging=hedger or False)
+    try:
+        sweep = ParameterSweep(runner, disable_cache=args.disable_cache)
+        for name in names:
+            print(f"\nSweeping {name} ({args.distribution}, {args.iterations} queries)...")
+            template = build_template(runner, name, args.distribution, args.zipf_s, args.seed)
+            result = sweep.run(template, iterations=args.iterations, seed=args.seed, warmup=args.warmup)
+            print_sweep_report(result)
+        if hedger is not None:
+            print()
+            print_hedge_stats(hedger.stats)
+    finally:
+        runner.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,6 @@
 """Run demo_comparison.sql statement-by-statement and print time for each."""
 from __future__ import annotations
 
-import re
 import sys
 from pathlib import Path
 
@@ -10,18 +9,13 @@ REPO_ROOT = Path(__file__).resolve().parent.parent.parent.parent
 sys.path.insert(0, str(REPO_ROOT))
 
 from lib.firebolt import FireboltRunner
+from lib.sql import split_statements
 
 
-def split_statements(sql: str) -> list[tuple[str, str]]:
+def labeled_statements(sql: str) -> list[tuple[str, str]]:
     """Split SQL into (label, statement) list. Label = first meaningful line."""
     out = []
-    # Remove single-line -- comments for splitting; keep blocks
-    blocks = re.split(r";\s*\n", sql)
-    for raw in blocks:
-        stmt = raw.strip()
-        if not stmt or re.match(r"^\s*$", stmt):
-            continue
-        stmt = stmt + ";"
+    for stmt in split_statements(sql):
         # Label: first line that isn't only comment or blank
         lines = stmt.split("\n")
         label = ""
@@ -45,7 +39,7 @@ def main():
         print(f"Not found: {demo_path}")
         sys.exit(1)
     sql = demo_path.read_text()
-    statements = split_statements(sql)
+    statements = labeled_statements(sql)
     runner = FireboltRunner(runtime="cloud")
     print("Running demo_comparison.sql on Firebolt Cloud (each statement timed):\n")
     times_ms: list[tuple[str, float]] = []
@@ -8,6 +8,9 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent.parent))
 import httpx
 
+from lib.columnar import RowView
+from lib.decoder import CORE_OUTPUT_FORMAT, decode_tsv
+
 BASE = os.getenv("FIREBOLT_CORE_URL", "http://localhost:3473")
 DB = os.getenv("FIREBOLT_DATABASE", "plg_validate")
 
@@ -30,31 +33,28 @@ def main():
     start = time.perf_counter()
     r = httpx.post(
         BASE,
-        params={"database": DB, "advanced_mode": "1"},
+        params={"database": DB, "advanced_mode": "1", "output_format": CORE_OUTPUT_FORMAT},
         content=SQL.strip(),
         headers={"Content-Type": "text/plain"},
         timeout=60.0,
     )
     elapsed_ms = (time.perf_counter() - start) * 1000
     r.raise_for_status()
-    lines = r.text.strip().split("\n")
-    if not lines:
+    cols, _, column_data, row_count = decode_tsv(r.content)
+    if not cols:
         print("No output")
         return
-    cols = lines[0].split("\t")
-    data_start = 2 if len(lines) > 1 and lines[1].split("\t")[0].strip().lower().startswith("text") else 1
-    rows = [lines[i].split("\t") for i in range(data_start, len(lines)) if lines[i].strip()]
+    data = RowView(cols, column_data, row_count)
     print(f"Time: {elapsed_ms:.0f} ms")
-    print(f"Rows: {len(rows)}")
+    print(f"Rows: {row_count}")
     print()
     try:
         from tabulate import tabulate
-        data = [dict(zip(cols, r)) for r in rows]
         print(tabulate(data, headers="keys", tablefmt="rounded_grid"))
     except ImportError:
         print("\t".join(cols))
-        for row in rows:
-            print("\t".join(row))
+        for row in data:
+            print("\t".join(str(v) for v in row.values()))
 
 if __name__ == "__main__":
     main()
@@ -21,7 +21,6 @@ on Cloud with large playstats, consider an aggregating index on
 from __future__ import annotations
 
 import os
-import re
 import sys
 import time
 from pathlib import Path
@@ -30,6 +29,12 @@ import httpx
 
 # Repo root
 REPO_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from lib.columnar import RowView
+from lib.decoder import CORE_OUTPUT_FORMAT, decode_tsv
+from lib.sql import split_statements
+
 CORE_HOST = os.getenv("FIREBOLT_CORE_HOST", "localhost")
 CORE_PORT = os.getenv("FIREBOLT_CORE_PORT", "3473")
 BASE_URL = f"http://{CORE_HOST}:{CORE_PORT}"
@@ -60,7 +65,7 @@ LIMIT 20;
 
 def execute_core(client: httpx.Client, sql: str, database: str | None = DB_NAME):
     """Execute one SQL statement on Firebolt Core. Returns (data, columns, time_ms)."""
-    params = {"advanced_mode": "1"}
+    params = {"advanced_mode": "1", "output_format": CORE_OUTPUT_FORMAT}
     if database:
         params["database"] = database
     start = time.perf_counter()
@@ -72,22 +77,8 @@ def execute_core(client: httpx.Client, sql: str, database: str | None = DB_NAME)
     )
     r.raise_for_status()
     elapsed_ms = (time.perf_counter() - start) * 1000
-    data = []
-    columns = []
-    if r.text.strip():
-        lines = r.text.strip().split("\n")
-        if lines:
-            columns = lines[0].split("\t")
-            # Firebolt Core may return a type line after header (e.g. "text null\tlong\t..."); skip it
-            data_start = 1
-            if len(lines) > 1:
-                first_val = (lines[1].split("\t")[0].strip().lower() if lines[1].strip() else "") or ""
-                if first_val in ("text", "int", "long", "double", "integer", "bigint", "real") or first_val.startswith("text "):
-                    data_start = 2
-            for line in lines[data_start:]:
-                if line.strip():
-                    values = line.split("\t")
-                    data.append(dict(zip(columns, values)))
+    columns, _, column_data, row_count = decode_tsv(r.content)
+    data = RowView(columns, column_data, row_count)
     return data, columns, elapsed_ms
 
 
@@ -104,23 +95,12 @@ def create_database_core():
     print(f"Database '{DB_NAME}' ready.")
 
 
-def split_sql_statements(sql: str):
-    """Split SQL into single statements for Firebolt Core (one query per request)."""
-    sql = re.sub(r"--[^\n]*", "", sql)
-    statements = []
-    for raw in re.split(r";\s*\n", sql):
-        s = raw.strip()
-        if s and not re.match(r"^\s*$", s):
-            statements.append(s + ";")
-    return statements
-
-
 def run_schema(client: httpx.Client, schema_path: Path):
     """Apply schema by executing one statement at a time."""
     text = schema_path.read_text()
     # Firebolt Core does not support CREATE DIMENSION TABLE; use CREATE TABLE
     text = text.replace("CREATE DIMENSION TABLE", "CREATE TABLE")
-    statements = split_sql_statements(text)
+    statements = split_statements(text)
     for i, stmt in enumerate(statements):
         if stmt.strip().upper().startswith("SHOW TABLES"):
             continue
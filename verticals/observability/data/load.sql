@@ -5,6 +5,7 @@
 -- Generate sample data via SQL (works everywhere)
 -- =============================================================================
 -- Creates: 1K services, 10K endpoints, 10M logs, 1M metrics, 5M traces
+-- Sizes are SF1; /*sf*/-marked counts scale with: python -m lib.scale <this file> --scale-factor 0.1
 -- Approximate load time: 30-120 seconds depending on engine size
 
 -- Insert sample services
@@ -34,14 +35,14 @@ SELECT
         ELSE 'DELETE' 
     END AS method,
     '/api/v*/endpoint/*' AS route_pattern
-FROM generate_series(1, 10000) AS t(seq);
+FROM generate_series(1, /*sf*/ 10000) AS t(seq);
 
 -- Insert sample logs (the high-volume table - 10M rows)
 INSERT INTO logs (log_id, service_id, endpoint_id, timestamp, level, message, trace_id, span_id, status_code, duration_ms)
 SELECT 
     seq AS log_id,
     (seq % 1000) + 1 AS service_id,
-    (seq % 10000) + 1 AS endpoint_id,
+    (seq % /*sf*/ 10000) + 1 AS endpoint_id,
     TIMESTAMP '2024-01-01 00:00:00' + INTERVAL '1 millisecond' * seq AS timestamp,
     CASE seq % 100 
         WHEN 0 THEN 'ERROR' WHEN 1 THEN 'WARN' WHEN 2 THEN 'DEBUG' 
@@ -53,7 +54,7 @@ SELECT
         WHEN 2 THEN 'Debug: Processing step ' || seq::TEXT
         ELSE 'Info: Request processed successfully: ' || seq::TEXT
     END AS message,
-    'trace_' || (seq % 100000)::TEXT AS trace_id,
+    'trace_' || (seq % /*sf*/ 100000)::TEXT AS trace_id,
     'span_' || seq::TEXT AS span_id,
     CASE seq % 100 
         WHEN 0 THEN 500
@@ -62,7 +63,7 @@ SELECT
         ELSE 200
     END AS status_code,
     (10 + (seq % 1000)) AS duration_ms
-FROM generate_series(1, 10000000) AS t(seq);
+FROM generate_series(1, /*sf*/ 10000000) AS t(seq);
 
 -- Insert sample metrics (1M rows)
 INSERT INTO metrics (metric_id, service_id, timestamp, metric_name, value, unit)
@@ -91,12 +92,12 @@ SELECT
         WHEN 3 THEN 'percent'
         ELSE 'bytes'
     END AS unit
-FROM generate_series(1, 1000000) AS t(seq);
+FROM generate_series(1, /*sf*/ 1000000) AS t(seq);
 
 -- Insert sample traces (5M rows)
 INSERT INTO traces (trace_id, span_id, service_id, parent_span_id, start_time, end_time, duration_ms, operation_name, status)
 SELECT 
-    'trace_' || (seq % 100000)::TEXT AS trace_id,
+    'trace_' || (seq % /*sf*/ 100000)::TEXT AS trace_id,
     'span_' || seq::TEXT AS span_id,
     (seq % 1000) + 1 AS service_id,
     CASE WHEN seq % 10 = 0 THEN NULL ELSE 'span_' || (seq - 1)::TEXT END AS parent_span_id,
@@ -105,7 +106,7 @@ SELECT
     (10 + (seq % 1000)) AS duration_ms,
     'operation_' || (seq % 100)::TEXT AS operation_name,
     CASE seq % 100 WHEN 0 THEN 'error' ELSE 'ok' END AS status
-FROM generate_series(1, 5000000) AS t(seq);
+FROM generate_series(1, /*sf*/ 5000000) AS t(seq);
 
 -- =============================================================================
 -- VERIFICATION
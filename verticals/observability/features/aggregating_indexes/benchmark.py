@@ -6,7 +6,10 @@ import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[4]))
-from lib.firebolt import FireboltRunner, BenchmarkResult
+from lib.firebolt import (
+    DEFAULT_QUERY_TIMEOUT_S, DEFAULT_SUITE_BUDGET_S, BenchmarkResult, FireboltRunner, QueryTimeout,
+)
+from lib.results_store import record_benchmark_run
 
 QUERIES = {
     "Log Count by Service/Day": {
@@ -43,24 +46,38 @@ DROP AGGREGATING INDEX IF EXISTS logs_service_daily_agg ON logs;
 """
 
 
-def run_full_benchmark(runner, iterations=3):
+def run_full_benchmark(runner, iterations=3, query_timeout_s=DEFAULT_QUERY_TIMEOUT_S,
+                       time_budget_s=DEFAULT_SUITE_BUDGET_S):
     results = []
     print("=" * 70)
     print("AGGREGATING INDEXES BENCHMARK - OBSERVABILITY")
     print("=" * 70)
-    try:
-        runner.execute(DROP_INDEXES_SQL.strip())
-    except Exception:
-        pass
-    baselines = {}
-    for name, info in QUERIES.items():
-        baselines[name] = runner.benchmark(info["sql"], iterations=iterations)
-    for stmt in CREATE_INDEXES_SQL.strip().split(";"):
-        if stmt.strip():
-            runner.execute(stmt.strip())
-    for name, info in QUERIES.items():
-        opt = runner.benchmark(info["sql"], iterations=iterations)
-        results.append(BenchmarkResult(name=name, baseline=baselines[name], optimized=opt))
+    # A runaway baseline is cancelled instead of starving the engine
+    with runner.time_budget(time_budget_s):
+        try:
+            runner.execute(DROP_INDEXES_SQL.strip())
+        except Exception:
+            pass
+        baselines = {}
+        for name, info in QUERIES.items():
+            try:
+                baselines[name] = runner.benchmark(info["sql"], iterations=iterations, timeout_s=query_timeout_s)
+            except QueryTimeout as e:
+                print(f"  {name}: baseline skipped ({e})")
+        try:
+            for stmt in CREATE_INDEXES_SQL.strip().split(";"):
+                if stmt.strip():
+                    runner.execute(stmt.strip())
+        except QueryTimeout as e:
+            print(f"  Index creation stopped ({e})")
+            baselines = {}
+        for name in baselines:
+            try:
+                opt = runner.benchmark(QUERIES[name]["sql"], iterations=iterations, timeout_s=query_timeout_s)
+            except QueryTimeout as e:
+                print(f"  {name}: optimized run skipped ({e})")
+                continue
+            results.append(BenchmarkResult(name=name, baseline=baselines[name], optimized=opt))
     for r in results:
         r.print_comparison()
     return results
@@ -71,10 +88,18 @@ def main():
     p = argparse.ArgumentParser()
     p.add_argument("--iterations", type=int, default=3)
     p.add_argument("--keep-indexes", action="store_true")
+    p.add_argument("--record", action="store_true", help="Save results to the benchmark result store")
+    p.add_argument("--tag", help="Label for the recorded run (e.g. an engine version)")
+    p.add_argument("--timeout", type=float, default=DEFAULT_QUERY_TIMEOUT_S,
+                   help="Cancel any single query run after this many seconds")
+    p.add_argument("--time-budget", type=float, default=DEFAULT_SUITE_BUDGET_S,
+                   help="Seconds for the whole suite; queries still running are cancelled")
     args = p.parse_args()
     runner = FireboltRunner()
     try:
-        run_full_benchmark(runner, args.iterations)
+        results = run_full_benchmark(runner, args.iterations, args.timeout, args.time_budget)
+        if args.record:
+            record_benchmark_run(runner, "observability/aggregating_indexes", results, tables=["logs"], tag=args.tag)
         if not args.keep_indexes:
             try:
                 runner.execute(DROP_INDEXES_SQL.strip())